@@ -0,0 +1,45 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Mapping
+import re
+
+# Content fields a preview delta can carry (see app/mail/delta.py on the server).
+CONTENT_FIELDS = ("subject", "text", "html")
+
+_HTML_SPLIT = re.compile(r"(?<=>)")
+
+
+def _pieces(name: str, value: str) -> List[str]:
+    if name == "html":
+        return [p for p in _HTML_SPLIT.split(value) if p]
+    return value.splitlines(keepends=True)
+
+
+def apply_delta(base: Mapping[str, str], delta: Mapping[str, Any]) -> Dict[str, str]:
+    """Rebuild preview content from the base a `delta` response was computed against.
+
+    A null field was dropped, a string replaces the field, and a list holds
+    `[start, end, [pieces]]` edits over the base's lines (text) or
+    tag-sized fragments (html).
+    """
+    out = dict(base)
+    for name, change in delta.items():
+        if change is None:
+            out.pop(name, None)
+        elif isinstance(change, str):
+            out[name] = change
+        else:
+            pieces = _pieces(name, base[name])
+            merged: List[str] = []
+            pos = 0
+            for start, end, replacement in change:
+                merged.extend(pieces[pos:start])
+                merged.extend(replacement)
+                pos = end
+            merged.extend(pieces[pos:])
+            out[name] = "".join(merged)
+    return out
+"""Client side of the preview delta format, so the ADK tools need no server imports.
+
+Mirrors `apply_delta` in `app/mail/delta.py`; the two are checked against
+each other in `tests/unit/test_preview_delta.py`.
+"""
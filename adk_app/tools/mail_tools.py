@@ -13,6 +13,28 @@ else:
 BASE_URL = os.getenv("MAIL_API_BASE", "http://localhost:8080")
 
 
+def _accept_encoding() -> str:
+    # What httpx decodes here: gzip always, zstd/br only with their optional packages.
+    codecs = []
+    for name, modules in (("zstd", ("zstandard",)), ("br", ("brotli", "brotlicffi"))):
+        for module in modules:
+            try:
+                __import__(module)
+            except ImportError:
+                continue
+            codecs.append(name)
+            break
+    return ", ".join([*codecs, "gzip"])
+
+
+# Previews are mostly inlined HTML; ask for every encoding we can decode.
+HEADERS = {"Accept-Encoding": _accept_encoding()}
+
+
+def _client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(base_url=BASE_URL, timeout=30, headers=HEADERS)
+
+
 def _json_or_error(r: httpx.Response) -> Dict[str, Any]:
     try:
         r.raise_for_status()
@@ -34,12 +56,19 @@ async def preview_mail(
     base: Dict[str, Any],
     updates: Optional[Dict[str, Any]] = None,
     tool_context: Optional["ToolContext"] = None,
+    fields: Optional[str] = None,
 ) -> Dict[str, Any]:
-    async with httpx.AsyncClient(base_url=BASE_URL, timeout=30) as ac:
+    # `fields` (e.g. "subject,text,plan") asks the API for a projection
+    params = {"fields": fields} if fields else None
+    async with _client() as ac:
         if updates:
-            r = await ac.post("/draft/iterate/preview", json={"base": base, "updates": updates})
+            r = await ac.post(
+                "/draft/iterate/preview",
+                json={"base": base, "updates": updates},
+                params=params,
+            )
         else:
-            r = await ac.post("/mail/preview", json=base)
+            r = await ac.post("/mail/preview", json=base, params=params)
         return _json_or_error(r)
 
 
@@ -49,7 +78,7 @@ async def deliver_mail(
     mode: str = "draft",
     tool_context: Optional["ToolContext"] = None,
 ) -> Dict[str, Any]:
-    async with httpx.AsyncClient(base_url=BASE_URL, timeout=30) as ac:
+    async with _client() as ac:
         if updates:
             # mode must be passed as a query parameter for this endpoint
             r = await ac.post(
@@ -64,10 +93,16 @@ async def preview_mail_nl(
     base: Dict[str, Any],
     instructions: str,
     tool_context: Optional["ToolContext"] = None,
+    fields: Optional[str] = None,
+    since: Optional[str] = None,
 ) -> Dict[str, Any]:
-    async with httpx.AsyncClient(base_url=BASE_URL, timeout=30) as ac:
+    # `since` is the previous preview's hash; the API then answers with a delta
+    params = {k: v for k, v in (("fields", fields), ("since", since)) if v}
+    async with _client() as ac:
         r = await ac.post(
-            "/draft/iterate/nl", json={"base": base, "updates": {"instructions": instructions}}
+            "/draft/iterate/nl",
+            json={"base": base, "updates": {"instructions": instructions}},
+            params=params,
         )
         return _json_or_error(r)
 
@@ -78,7 +113,7 @@ async def deliver_mail_nl(
     mode: str = "draft",
     tool_context: Optional["ToolContext"] = None,
 ) -> Dict[str, Any]:
-    async with httpx.AsyncClient(base_url=BASE_URL, timeout=30) as ac:
+    async with _client() as ac:
         # mode must be passed as a query parameter for this endpoint
         r = await ac.post(
             f"/mail/iterate/nl-deliver?mode={mode}",
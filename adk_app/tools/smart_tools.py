@@ -1,6 +1,8 @@
 from __future__ import annotations
 from typing import Any, Dict, Optional, Iterable
 import os
+from app.agents.interpret import normalize_purpose
+from .delta import CONTENT_FIELDS, apply_delta
 from .mail_tools import preview_mail, preview_mail_nl, deliver_mail, deliver_mail_nl
 
 DEFAULT_BY_PURPOSE: dict[str, list[str]] = {
@@ -50,6 +52,8 @@ CTA_BY_PURPOSE: dict[str, str] = {
 # In-process memory of the last request/updates to improve tool UX when the
 # LLM calls deliver without passing the most recent changes explicitly.
 _STATE: Dict[str, Any] = {"base": None, "updates": None, "nl": None}
+# Last preview content and its hash, the base for delta responses on NL iterations
+_LAST_PREVIEW: Dict[str, Any] = {"hash": None, "content": None}
 
 
 def _first_present(d: Dict[str, Any], keys: Iterable[str]) -> Optional[Any]:
@@ -87,30 +91,11 @@ def _maybe_find_email(d: Dict[str, Any]) -> Optional[str]:
     return None
 
 
-def _normalize_purpose(p: str) -> str:
-    pl = (p or "").strip().lower()
-    if not pl:
-        return "welcome"
-    if "welcome" in pl:
-        return "welcome"
-    if any(k in pl for k in ("newsletter", "updates", "digest")):
-        return "newsletter"
-    if any(k in pl for k in ("promo", "promotion", "offer", "sale", "discount")):
-        return "promo"
-    if any(k in pl for k in ("outreach", "intro", "introduction", "reach out", "cold")):
-        return "outreach"
-    if any(k in pl for k in ("notice", "announcement", "policy", "update")):
-        return "notice"
-    if any(k in pl for k in ("maintenance", "downtime", "outage", "window")):
-        return "maintenance"
-    return pl
-
-
 def _ensure_defaults(base: Dict[str, Any]) -> Dict[str, Any]:
     # Normalize into DraftRequest shape; do not mutate caller’s dict
     out: Dict[str, Any] = {
         "recipient": {},
-        "purpose": _normalize_purpose(str(_first_present(base, ("purpose", "email_purpose", "type", "category")) or "welcome")),
+        "purpose": normalize_purpose(str(_first_present(base, ("purpose", "email_purpose", "type", "category")) or "welcome")),
         "brand_id": str(_first_present(base, ("brand_id", "brandId", "brand", "sender_brand")) or "default"),
         "context": dict(base.get("context") or {}),
     }
@@ -150,55 +135,61 @@ def _ensure_defaults(base: Dict[str, Any]) -> Dict[str, Any]:
     return out
 
 
-async def smart_preview(base: Dict[str, Any]) -> Dict[str, Any]:
-    seeded = _ensure_defaults(base)
-    _STATE.update({"base": seeded, "updates": None, "nl": None})
-    data = await preview_mail(seeded)
-    # If the backend surfaced an HTTP error payload, return it directly
-    if isinstance(data, dict) and data.get("ok") is False:
-        return data
-    subject = data.get("subject", "")
+def _preview_fields() -> str:
+    # Only ask for the HTML itself when it will be surfaced; html_len is always
+    # computed server-side without sending the document.
+    if os.getenv("INCLUDE_HTML_IN_PREVIEW"):
+        return "subject,text,plan,word_count,html_len,hash,html"
+    return "subject,text,plan,word_count,html_len,hash"
+
+
+def _resolve_delta(data: Dict[str, Any]) -> Dict[str, Any]:
+    # Rebuild full content from a delta response and remember it for the next one
+    if "delta" in data and data.get("base") == _LAST_PREVIEW["hash"]:
+        data = {**data, **apply_delta(_LAST_PREVIEW["content"], data["delta"])}
+    _LAST_PREVIEW["hash"] = data.get("hash")
+    _LAST_PREVIEW["content"] = {f: data[f] for f in CONTENT_FIELDS if f in data}
+    return data
+
+
+def _preview_summary(data: Dict[str, Any]) -> Dict[str, Any]:
+    data = _resolve_delta(data)
     text = data.get("text", "")
-    plan = data.get("plan", {})
-    html = data.get("html", "")
     out: Dict[str, Any] = {
         "ok": True,
-        "subject": subject,
+        "subject": data.get("subject", ""),
         "text": text,
-        "plan": plan,
-        "word_count": len(str(text).split()),
-        "html_len": len(str(html)),
+        "plan": data.get("plan", {}),
+        "word_count": data.get("word_count", len(str(text).split())),
+        "html_len": data.get("html_len", len(data.get("html") or "")),
         "html_included": bool(os.getenv("INCLUDE_HTML_IN_PREVIEW")),
     }
     # Only include full HTML if explicitly requested via env
     if os.getenv("INCLUDE_HTML_IN_PREVIEW"):
-        out["html"] = html
+        out["html"] = data.get("html", "")
     return out
 
 
+async def smart_preview(base: Dict[str, Any]) -> Dict[str, Any]:
+    seeded = _ensure_defaults(base)
+    _STATE.update({"base": seeded, "updates": None, "nl": None})
+    data = await preview_mail(seeded, fields=_preview_fields())
+    # If the backend surfaced an HTTP error payload, return it directly
+    if isinstance(data, dict) and data.get("ok") is False:
+        return data
+    return _preview_summary(data)
+
+
 async def smart_preview_nl(base: Dict[str, Any], instructions: str) -> Dict[str, Any]:
     # still ensure sensible defaults before NL iteration
     seeded = _ensure_defaults(base)
     _STATE.update({"base": seeded, "updates": None, "nl": instructions})
-    data = await preview_mail_nl(seeded, instructions)
+    data = await preview_mail_nl(
+        seeded, instructions, fields=_preview_fields(), since=_LAST_PREVIEW["hash"]
+    )
     if isinstance(data, dict) and data.get("ok") is False:
         return data
-    subject = data.get("subject", "")
-    text = data.get("text", "")
-    plan = data.get("plan", {})
-    html = data.get("html", "")
-    out: Dict[str, Any] = {
-        "ok": True,
-        "subject": subject,
-        "text": text,
-        "plan": plan,
-        "word_count": len(str(text).split()),
-        "html_len": len(str(html)),
-        "html_included": bool(os.getenv("INCLUDE_HTML_IN_PREVIEW")),
-    }
-    if os.getenv("INCLUDE_HTML_IN_PREVIEW"):
-        out["html"] = html
-    return out
+    return _preview_summary(data)
 
 
 async def smart_deliver(
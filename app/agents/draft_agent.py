@@ -1,14 +1,17 @@
 from __future__ import annotations
+from app.agents.providers.provider_base import BlockingProviderMixin
 from app.agents.types import DraftRequest, DraftResponse
-from app.tools.brand_loader import load_brand
+from app.metrics import metrics
+from app.templating.brand_bundle import load_brand_bundle
 
 
-class DraftAgent:
+class DraftAgent(BlockingProviderMixin):
     MAX_BULLETS = 5
 
+    @metrics.timed("draft")
     def draft(self, req: DraftRequest) -> DraftResponse:
         name = req.recipient.name or req.recipient.email
-        brand = load_brand(req.brand_id)
+        brand = load_brand_bundle(req.brand_id).config
 
         # Subject: if company present, "<Purpose Title>: <Company>", else "Welcome: For <name>"
         subject = (
@@ -38,6 +41,10 @@ class DraftAgent:
         body_text = "\n".join(lines)
 
         return DraftResponse(subject=subject, body_text=body_text)
+
+    def generate(self, req: DraftRequest) -> DraftResponse:
+        """Provider-style alias, so the agent can serve as a provider or chain fallback."""
+        return self.draft(req)
 """Deterministic first-pass drafting agent.
 
 `DraftAgent` creates a quick subject + plaintext body using light heuristics,
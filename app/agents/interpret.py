@@ -1,6 +1,11 @@
 from __future__ import annotations
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping
 import re
-from typing import Any, Dict, List
+import threading
+
+from app.config.settings import settings
 
 # Heuristics-based parser that turns natural-language instructions
 # into the DraftUpdate fields we already support.
@@ -50,6 +55,63 @@ QA_RESPONSIBILITIES: List[str] = [
 ]
 
 
+_I = re.I
+
+# Each rule's regex, compiled once. They only run when the scanner below has
+# seen one of the keywords the rule cannot match without.
+_REPLACE_BULLETS = re.compile(r"(?:replace|set)\s+bullets(?:\s+with)?\s*:\s*(.+)", _I)
+_ADD_BULLETS = re.compile(r"(?:add|append)\s+bullets?\s*:\s*(.+)", _I)
+_CLEAR_BULLETS = re.compile(r"\b(clear|remove|drop)\s+bullets?\b", _I)
+_CTA_TEXT = re.compile(r"(?:set\s+)?cta\s*text\s*(?:to)?\s*[:=]\s*['\"]?(.+?)['\"]?(?:\s|$)", _I)
+_CTA_URL = re.compile(r"(?:set\s+)?cta\s*url\s*(?:to)?\s*[:=]\s*['\"]?(\S+)['\"]?", _I)
+_REMOVE_CTA = re.compile(r"\b(remove|clear|drop|no)\s+(cta|button)\b", _I)
+_SUBJECT = re.compile(r"(?:set\s+)?subject\s*(?:to)?\s*[:=]\s*['\"]?(.+?)['\"]?(?:\s|$)", _I)
+_TONE = re.compile(r"(?:set\s+)?tone\s*(?:to)?\s*[:=]\s*['\"]?([A-Za-z ]+)['\"]?", _I)
+_FRIENDLIER = re.compile(
+    r"\b(a\s+little\s+(bit\s+)?more\s+friendly|more\s+friendly|friendlier)\b", _I
+)
+_FRIENDLY = re.compile(r"\b(friendly|welcom(ing|e))\b", _I)
+_WARM = re.compile(
+    r"\b(warm|warmer|more\s+warm|more\s+welcoming|more\s+personal|softer|kinder|less\s+formal)\b",
+    _I,
+)
+_EXCITED = re.compile(
+    r"\b(excit(ed|ing)|more\s+excited|enthusiastic|more\s+enthusiastic)\b", _I
+)
+_FORMAL = re.compile(r"\b(formal|more\s+formal|professional|more\s+professional)\b", _I)
+_CASUAL = re.compile(r"\b(casual|more\s+casual)\b", _I)
+_SHORTER = re.compile(r"\b(short(en)?|more\s+concise|tighter)\b", _I)
+_PURPOSE = re.compile(
+    r"(?:set\s+)?purpose\s*(?:to)?\s*[:=]\s*['\"]?([A-Za-z][A-Za-z -]+)['\"]?", _I
+)
+_MORE_DETAIL = re.compile(
+    r"\b(more\s+(helpful|detailed|useful|informative)|make.*longer|expand|add\s+detail"
+    r"|>\s*50\s*words)\b",
+    _I,
+)
+_QA_ROLE = re.compile(r"\b(QA|AQ|quality\s*assurance)\s+engineer\b", _I)
+
+# Literal keywords that every match of the gated rules contains. No keyword
+# is a prefix of another, so the overlapping lookahead reports each one at
+# every position it occurs; the scan is a single pass over the instruction.
+_KEYWORDS = (
+    "bullet", "cta", "button", "subject", "tone", "friend", "welcom", "warm",
+    "personal", "softer", "kinder", "formal", "excit", "enthusiastic",
+    "professional", "casual", "short", "concise", "tighter", "purpose", "helpful",
+    "detail", "useful", "informative", "longer", "expand", "words", "engineer",
+)  # fmt: skip
+_SCANNER = re.compile("(?=(" + "|".join(_KEYWORDS) + "))")
+_ALL_KEYWORDS = frozenset(_KEYWORDS)
+
+
+def _keywords(instr: str) -> frozenset[str]:
+    if not instr.isascii():
+        # re.I folds some non-ASCII letters onto ASCII ones (e.g. U+017F onto
+        # "s"), which str.lower() does not; let every rule run instead.
+        return _ALL_KEYWORDS
+    return frozenset(_SCANNER.findall(instr.lower()))
+
+
 def _extract_list(text: str) -> List[str]:
     parts = _BULLET_SPLIT.split(text.strip())
     return [p.strip() for p in parts if p.strip()]
@@ -57,68 +119,66 @@ def _extract_list(text: str) -> List[str]:
 
 def interpret_instructions(instructions: str) -> Dict[str, Any]:
     instr = instructions.strip()
+    return _interpret(instr, _keywords(instr))
+
+
+def _interpret(instr: str, kw: frozenset[str]) -> Dict[str, Any]:
     up: Dict[str, Any] = {}
 
-    # Replace bullets
-    m = re.search(r"(?:replace|set)\s+bullets(?:\s+with)?\s*:\s*(.+)", instr, flags=re.I)
-    if m:
-        up["bullets_replace"] = _extract_list(m.group(1))
+    if "bullet" in kw:
+        # Replace bullets
+        m = _REPLACE_BULLETS.search(instr)
+        if m:
+            up["bullets_replace"] = _extract_list(m.group(1))
 
-    # Add bullets
-    m = re.search(r"(?:add|append)\s+bullets?\s*:\s*(.+)", instr, flags=re.I)
-    if m:
-        up["bullets_add"] = _extract_list(m.group(1))
+        # Add bullets
+        m = _ADD_BULLETS.search(instr)
+        if m:
+            up["bullets_add"] = _extract_list(m.group(1))
 
-    # Clear/remove bullets entirely
-    if re.search(r"\b(clear|remove|drop)\s+bullets?\b", instr, flags=re.I):
-        up["bullets_replace"] = []
+        # Clear/remove bullets entirely
+        if _CLEAR_BULLETS.search(instr):
+            up["bullets_replace"] = []
 
-    # CTA text
-    m = re.search(
-        r"(?:set\s+)?cta\s*text\s*(?:to)?\s*[:=]\s*['\"]?(.+?)['\"]?(?:\s|$)", instr, flags=re.I
-    )
-    if m:
-        up["cta_text"] = m.group(1).strip()
+    if "cta" in kw:
+        # CTA text
+        m = _CTA_TEXT.search(instr)
+        if m:
+            up["cta_text"] = m.group(1).strip()
 
-    # CTA url
-    m = re.search(r"(?:set\s+)?cta\s*url\s*(?:to)?\s*[:=]\s*['\"]?(\S+)['\"]?", instr, flags=re.I)
-    if m:
-        up["cta_url"] = m.group(1).strip()
+        # CTA url
+        m = _CTA_URL.search(instr)
+        if m:
+            up["cta_url"] = m.group(1).strip()
 
     # Remove CTA entirely
-    if re.search(r"\b(remove|clear|drop|no)\s+(cta|button)\b", instr, flags=re.I):
+    if ("cta" in kw or "button" in kw) and _REMOVE_CTA.search(instr):
         up["cta_text"] = ""
         up["cta_url"] = ""
 
     # Subject override
-    m = re.search(
-        r"(?:set\s+)?subject\s*(?:to)?\s*[:=]\s*['\"]?(.+?)['\"]?(?:\s|$)", instr, flags=re.I
-    )
+    m = _SUBJECT.search(instr) if "subject" in kw else None
     if m:
         up["subject"] = m.group(1).strip()
 
     # Tone setting (explicit)
-    m = re.search(
-        r"(?:set\s+)?tone\s*(?:to)?\s*[:=]\s*['\"]?([A-Za-z ]+)['\"]?",
-        instr,
-        flags=re.I,
-    )
+    m = _TONE.search(instr) if "tone" in kw else None
     if m:
         up["tone"] = m.group(1).strip().lower()
 
     # Tone heuristics via keywords
     # Prefer mapping "more friendly / friendlier" to "warm" so the change is visible.
-    if re.search(r"\b(a\s+little\s+(bit\s+)?more\s+friendly|more\s+friendly|friendlier)\b", instr, flags=re.I):
+    if "friend" in kw and _FRIENDLIER.search(instr):
         up["tone"] = "warm"
-    elif re.search(r"\b(friendly|welcom(ing|e))\b", instr, flags=re.I):
+    elif kw & {"friend", "welcom"} and _FRIENDLY.search(instr):
         up.setdefault("tone", "friendly")
-    if re.search(r"\b(warm|warmer|more\s+warm|more\s+welcoming|more\s+personal|softer|kinder|less\s+formal)\b", instr, flags=re.I):
+    if kw & {"warm", "welcom", "personal", "softer", "kinder", "formal"} and _WARM.search(instr):
         up.setdefault("tone", "warm")
-    if re.search(r"\b(excit(ed|ing)|more\s+excited|enthusiastic|more\s+enthusiastic)\b", instr, flags=re.I):
+    if kw & {"excit", "enthusiastic"} and _EXCITED.search(instr):
         up.setdefault("tone", "enthusiastic")
-    if re.search(r"\b(formal|more\s+formal|professional|more\s+professional)\b", instr, flags=re.I):
+    if kw & {"formal", "professional"} and _FORMAL.search(instr):
         up.setdefault("tone", "professional")
-    if re.search(r"\b(casual|more\s+casual)\b", instr, flags=re.I):
+    if "casual" in kw and _CASUAL.search(instr):
         up.setdefault("tone", "casual")
 
     # If tone was requested and long_form not specified, enable long_form to
@@ -127,24 +187,17 @@ def interpret_instructions(instructions: str) -> Dict[str, Any]:
         up["long_form"] = True
 
     # Length / detail hints
-    if re.search(r"\b(short(en)?|more\s+concise|tighter)\b", instr, flags=re.I):
+    if kw & {"short", "concise", "tighter"} and _SHORTER.search(instr):
         up["long_form"] = False
 
     # Purpose
-    m = re.search(
-        r"(?:set\s+)?purpose\s*(?:to)?\s*[:=]\s*['\"]?([A-Za-z][A-Za-z -]+)['\"]?",
-        instr,
-        flags=re.I,
-    )
+    m = _PURPOSE.search(instr) if "purpose" in kw else None
     if m:
         up["purpose"] = m.group(1).strip().lower()
 
     # ---------- Heuristics for vague asks / length ----------
-    if re.search(
-        r"\b(more (helpful|detailed|useful|informative)|make.*longer|expand|add\s+detail|>\s*50\s*words)\b",
-        instr,
-        flags=re.I,
-    ):
+    detail_kw = {"helpful", "detail", "useful", "informative", "longer", "expand", "words"}
+    if kw & detail_kw and _MORE_DETAIL.search(instr):
         if "bullets_add" not in up and "bullets_replace" not in up:
             purpose = up.get("purpose", "welcome")
             up["bullets_add"] = DEFAULT_BY_PURPOSE.get(purpose, DEFAULT_BY_PURPOSE["welcome"])
@@ -153,17 +206,146 @@ def interpret_instructions(instructions: str) -> Dict[str, Any]:
         up.setdefault("long_form", True)
 
     # ---------- Role responsibilities (e.g., QA/AQ engineer) ----------
-    if re.search(r"\b(QA|AQ|quality\s*assurance)\s+engineer\b", instr, flags=re.I):
+    if "engineer" in kw and _QA_ROLE.search(instr):
         if "bullets_replace" not in up and "bullets_add" not in up:
             up["bullets_replace"] = QA_RESPONSIBILITIES
         elif "bullets_add" not in up:
             up["bullets_add"] = QA_RESPONSIBILITIES
 
     return up
+
+
+# Rules that copy text out of the instruction. Everything else only tests for
+# keywords and `\s`-separated phrases, so it answers the same for any spelling
+# that differs only in letter case or in the width of whitespace runs.
+_VERBATIM_KEYWORDS = frozenset({"bullet", "cta", "subject", "tone", "purpose"})
+
+# Whitespace runs fold to one space, or to one newline when they span lines:
+# `.` in the rules does not cross newlines, so that distinction is kept.
+_FOLD_NEWLINE = re.compile(r"\s*\n\s*")
+_FOLD_SPACE = re.compile(r"[^\S\n]+")
+
+
+def _fold(instr: str) -> str:
+    return _FOLD_SPACE.sub(" ", _FOLD_NEWLINE.sub("\n", instr.lower()))
+
+
+def _freeze(up: Dict[str, Any]) -> Mapping[str, Any]:
+    return MappingProxyType({k: tuple(v) if isinstance(v, list) else v for k, v in up.items()})
+
+
+class InterpretCache:
+    """Bounded LRU of parsed instructions shared by every caller.
+
+    Instructions that can only trigger the keyword rules (tone and length
+    hints, "more detail", ...) are keyed by their case/whitespace-folded form,
+    so "Make it  WARMER" reuses "make it warmer". Anything that may copy text
+    into the result (subject, bullets, CTA, explicit tone/purpose) is only
+    keyed by the stripped instruction as given, which is also checked first so
+    a verbatim replay skips the keyword scan. Cached values are read-only
+    mappings (lists become tuples) and are shared between callers.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[str, Mapping[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Mapping[str, Any] | None:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def _put(self, key: str, value: Mapping[str, Any]) -> None:
+        self._data[key] = value
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get_or_interpret(self, instructions: str) -> Mapping[str, Any]:
+        instr = instructions.strip()
+        exact = "=" + instr
+        with self._lock:
+            value = self._get(exact)
+            if value is not None:
+                self.hits += 1
+                return value
+        kw = _keywords(instr)
+        # Non-ASCII text sees every keyword (see `_keywords`), so it is never folded.
+        folded = None if kw & _VERBATIM_KEYWORDS else "~" + _fold(instr)
+        with self._lock:
+            value = self._get(folded) if folded is not None else None
+            if value is not None:
+                self.hits += 1
+                self._put(exact, value)
+                return value
+            self.misses += 1
+        value = _freeze(_interpret(instr, kw))
+        if self.maxsize <= 0:
+            return value
+        with self._lock:
+            self._put(exact, value)
+            if folded is not None:
+                self._put(folded, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+interpret_cache = InterpretCache(maxsize=settings.MAIL_AGENT_INTERPRET_CACHE_ENTRIES)
+
+
+def interpret_cached(instructions: str) -> Mapping[str, Any]:
+    """`interpret_instructions` through the shared memo; the result is read-only."""
+    return interpret_cache.get_or_interpret(instructions)
+
+
+# Purpose keywords by priority: the first category with any keyword present
+# wins. "updates" precedes "update" so the longer match claims its position.
+_PURPOSE_KEYWORDS = (
+    ("welcome", ("welcome",)),
+    ("newsletter", ("newsletter", "updates", "digest")),
+    ("promo", ("promo", "promotion", "offer", "sale", "discount")),
+    ("outreach", ("outreach", "intro", "introduction", "reach out", "cold")),
+    ("notice", ("notice", "announcement", "policy", "update")),
+    ("maintenance", ("maintenance", "downtime", "outage", "window")),
+)
+_PURPOSE_RANK = {k: rank for rank, (_, kws) in enumerate(_PURPOSE_KEYWORDS) for k in kws}
+_PURPOSE_SCANNER = re.compile(
+    "(?=("
+    + "|".join(re.escape(k) for k in sorted(_PURPOSE_RANK, key=lambda k: (-len(k), k)))
+    + "))"
+)
+
+
+def normalize_purpose(purpose: str) -> str:
+    """Map a free-form purpose onto a known one (e.g. "weekly digest" -> "newsletter").
+
+    Unrecognized purposes come back lower-cased; empty ones default to "welcome".
+    """
+    pl = (purpose or "").strip().lower()
+    if not pl:
+        return "welcome"
+    ranks = [_PURPOSE_RANK[m.group(1)] for m in _PURPOSE_SCANNER.finditer(pl)]
+    return _PURPOSE_KEYWORDS[min(ranks)][0] if ranks else pl
 """Natural-language instruction interpreter.
 
 Turns short user instructions (e.g., "make it more excited", "replace bullets:")
 into the structured `DraftUpdate` fields consumed by the iteration endpoints.
 This keeps the web API compact and allows the ADK agent to provide a friendly
 editing experience without requiring the user to craft JSON.
+
+A single keyword scan decides which rules can possibly match, so only those
+regexes run. `normalize_purpose` (shared with the ADK smart tools) uses the
+same one-pass approach. The API parses through `interpret_cached`, because
+agents replay the same instructions (LLM retries, `smart_deliver` re-sending
+the last NL edit); `interpret_cache.stats()` shows how often that happens.
 """
@@ -0,0 +1,157 @@
+from __future__ import annotations
+from typing import Dict, List, Literal, NamedTuple, Protocol, Sequence, Tuple
+import asyncio
+import importlib
+import threading
+import time
+
+from app.agents.providers.provider_base import DraftProvider
+from app.agents.providers.seed_provider import SeedProvider
+from app.agents.types import DraftRequest, DraftResponse
+from app.config.settings import settings
+
+ServedPath = Literal["primary", "hedge", "fallback"]
+
+
+class FallbackProvider(Protocol):
+    """Anything with a fast, deterministic blocking `generate` (SeedProvider, DraftAgent)."""
+
+    def generate(self, req: DraftRequest) -> DraftResponse: ...
+
+
+class ServedBy(NamedTuple):
+    path: ServedPath
+    latency_s: float
+    reason: str | None = None  # why the fallback served: "deadline" or provider errors
+
+
+class HedgedProviderChain:
+    """Bounded-latency drafting on top of a slow or flaky provider.
+
+    The primary provider gets the request first. If it has not answered
+    after `hedge_after_s`, or fails before that, the same request is sent to
+    `hedge` (the primary again by default) and the first success wins. When
+    neither succeeds within `deadline_s`, outstanding calls are cancelled and
+    `fallback` (SeedProvider by default) drafts the message, so a preview
+    never waits much longer than the deadline. Set `hedge_after_s=None` to
+    disable hedging. `agenerate_traced` reports which path served a request;
+    `stats()` counts them.
+    """
+
+    def __init__(
+        self,
+        primary: DraftProvider,
+        *,
+        fallback: FallbackProvider | None = None,
+        hedge: DraftProvider | None = None,
+        deadline_s: float = 2.0,
+        hedge_after_s: float | None = 0.5,
+    ) -> None:
+        self.primary = primary
+        self.hedge = hedge or primary
+        self.fallback: FallbackProvider = fallback or SeedProvider()
+        self.deadline_s = deadline_s
+        self.hedge_after_s = hedge_after_s
+        self._counts: Dict[ServedPath, int] = {"primary": 0, "hedge": 0, "fallback": 0}
+        self._lock = threading.Lock()
+
+    def _served(self, path: ServedPath, started: float, reason: str | None = None) -> ServedBy:
+        with self._lock:
+            self._counts[path] += 1
+        return ServedBy(path, time.perf_counter() - started, reason)
+
+    async def agenerate_traced(self, req: DraftRequest) -> Tuple[DraftResponse, ServedBy]:
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline_s
+        hedge_at = deadline if self.hedge_after_s is None else loop.time() + self.hedge_after_s
+        hedged = self.hedge_after_s is None
+        tasks: Dict[asyncio.Task[DraftResponse], ServedPath] = {
+            asyncio.ensure_future(self.primary.agenerate(req)): "primary"
+        }
+        errors: List[str] = []
+        try:
+            while True:
+                now = loop.time()
+                if now >= deadline:
+                    break
+                if not hedged and (now >= hedge_at or not tasks):
+                    tasks[asyncio.ensure_future(self.hedge.agenerate(req))] = "hedge"
+                    hedged = True
+                if not tasks:
+                    break
+                wake = deadline if hedged else min(deadline, hedge_at)
+                done, _ = await asyncio.wait(
+                    tasks, timeout=wake - now, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    path = tasks.pop(task)
+                    exc = task.exception()
+                    if exc is None:
+                        return task.result(), self._served(path, started)
+                    errors.append(f"{path}: {exc!r}")
+        finally:
+            for task in tasks:
+                task.cancel()
+        reason = "; ".join(errors) if errors and not tasks else "deadline"
+        # Off the loop: a DraftAgent fallback loads the brand and may touch disk.
+        draft = await asyncio.to_thread(self.fallback.generate, req)
+        return draft, self._served("fallback", started, reason)
+
+    async def agenerate(self, req: DraftRequest) -> DraftResponse:
+        return (await self.agenerate_traced(req))[0]
+
+    async def agenerate_many(self, reqs: Sequence[DraftRequest]) -> List[DraftResponse]:
+        # Each request gets its own deadline; one slow draft never drags the rest.
+        return list(await asyncio.gather(*(self.agenerate(r) for r in reqs)))
+
+    def generate(self, req: DraftRequest) -> DraftResponse:
+        """Blocking entry point for sync callers (not from inside a running event loop)."""
+        return asyncio.run(self.agenerate(req))
+
+    def generate_traced(self, req: DraftRequest) -> Tuple[DraftResponse, ServedBy]:
+        """Blocking `agenerate_traced`, for worker threads."""
+        return asyncio.run(self.agenerate_traced(req))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+_chain: HedgedProviderChain | None = None
+_chain_lock = threading.Lock()
+
+
+def get_draft_chain() -> HedgedProviderChain | None:
+    """Process-wide chain over `MAIL_AGENT_DRAFT_PROVIDER`, or None when none is set.
+
+    The provider is a "module:Class" path instantiated without arguments;
+    `DraftAgent` is the fallback, so a deadline miss still drafts like the
+    default path does.
+    """
+    global _chain
+    spec = settings.MAIL_AGENT_DRAFT_PROVIDER
+    if not spec:
+        return None
+    if _chain is None:
+        with _chain_lock:
+            if _chain is None:
+                from app.agents.draft_agent import DraftAgent
+
+                module, _, name = spec.partition(":")
+                provider = getattr(importlib.import_module(module), name)()
+                hedge_after = settings.MAIL_AGENT_DRAFT_HEDGE_AFTER_S
+                _chain = HedgedProviderChain(
+                    provider,
+                    fallback=DraftAgent(),
+                    deadline_s=settings.MAIL_AGENT_DRAFT_DEADLINE_S,
+                    hedge_after_s=hedge_after if hedge_after > 0 else None,
+                )
+    return _chain
+"""Hedged, deadline-bounded provider chain with a deterministic fallback.
+
+With `MAIL_AGENT_DRAFT_PROVIDER` set, previews and deliveries draft through
+`get_draft_chain()`: the configured provider, hedged, with `DraftAgent` as
+the fallback once `MAIL_AGENT_DRAFT_DEADLINE_S` passes. Unset, they call
+`DraftAgent` directly as before.
+"""
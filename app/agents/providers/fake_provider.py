@@ -0,0 +1,53 @@
+from __future__ import annotations
+from typing import List, Sequence
+import asyncio
+import random
+import time
+
+from app.agents.providers.seed_provider import SeedProvider
+from app.agents.types import DraftRequest, DraftResponse
+
+
+class SlowFakeProvider:
+    """Stand-in for a model-backed provider: SeedProvider output after a delay.
+
+    Each call costs `latency_s` (request round trip) plus `per_item_s` per
+    draft, so batching amortizes the fixed latency the way a real batched
+    model API would. With probability `tail_p` a call takes an extra `tail_s`
+    (long-tail stalls). For benchmarks and tests only.
+    """
+
+    def __init__(
+        self,
+        latency_s: float = 0.05,
+        per_item_s: float = 0.002,
+        *,
+        tail_s: float = 0.0,
+        tail_p: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.latency_s = latency_s
+        self.per_item_s = per_item_s
+        self.tail_s = tail_s
+        self.tail_p = tail_p
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._seed = SeedProvider()
+
+    def _delay(self, items: int) -> float:
+        tail = self.tail_s if self._rng.random() < self.tail_p else 0.0
+        return self.latency_s + self.per_item_s * items + tail
+
+    def generate(self, req: DraftRequest) -> DraftResponse:
+        self.calls += 1
+        time.sleep(self._delay(1))
+        return self._seed.generate(req)
+
+    async def agenerate(self, req: DraftRequest) -> DraftResponse:
+        return (await self.agenerate_many([req]))[0]
+
+    async def agenerate_many(self, reqs: Sequence[DraftRequest]) -> List[DraftResponse]:
+        self.calls += 1
+        await asyncio.sleep(self._delay(len(reqs)))
+        return [self._seed.generate(r) for r in reqs]
+"""Latency-simulating fake draft provider for benchmarks."""
@@ -1,7 +1,40 @@
 from __future__ import annotations
-from typing import Protocol
+from typing import TYPE_CHECKING, List, Protocol, Sequence
+import asyncio
 from app.agents.types import DraftRequest, DraftResponse
 
 
 class DraftProvider(Protocol):
     def generate(self, req: DraftRequest) -> DraftResponse: ...
+
+    async def agenerate(self, req: DraftRequest) -> DraftResponse: ...
+
+    async def agenerate_many(self, reqs: Sequence[DraftRequest]) -> List[DraftResponse]:
+        """Draft several requests in one provider call; results in input order."""
+        ...
+
+
+class BlockingProviderMixin:
+    """Async methods for a provider that only implements blocking `generate`.
+
+    Calls run in worker threads so the event loop stays free; providers with
+    a native async or batch API should override both methods. `DraftAgent`
+    uses it.
+    """
+
+    if TYPE_CHECKING:
+
+        def generate(self, req: DraftRequest) -> DraftResponse: ...
+
+    async def agenerate(self, req: DraftRequest) -> DraftResponse:
+        return await asyncio.to_thread(self.generate, req)
+
+    async def agenerate_many(self, reqs: Sequence[DraftRequest]) -> List[DraftResponse]:
+        return list(await asyncio.gather(*(self.agenerate(r) for r in reqs)))
+"""Draft provider protocol.
+
+Providers turn a `DraftRequest` into a subject + body. Besides the blocking
+`generate`, they expose `agenerate` and a batched `agenerate_many` so bulk
+generation can overlap model calls; `ProviderRunner` (see `runner.py`)
+bounds concurrency and coalesces nearby requests into batches.
+"""
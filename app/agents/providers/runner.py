@@ -0,0 +1,97 @@
+from __future__ import annotations
+from typing import List, Sequence, Set, Tuple
+import asyncio
+
+from app.agents.providers.provider_base import DraftProvider
+from app.agents.types import DraftRequest, DraftResponse
+
+_Pending = Tuple[DraftRequest, "asyncio.Future[DraftResponse]"]
+
+
+class ProviderRunner:
+    """Drives a `DraftProvider` with bounded concurrency and micro-batching.
+
+    Requests that arrive within `batch_window_s` of the first pending one
+    (or until `max_batch` have queued) go to the provider as a single
+    `agenerate_many` call. At most `max_in_flight` provider calls run at
+    once; further batches wait for a free slot. A failing batch fails every
+    request in it with the provider's exception.
+    """
+
+    def __init__(
+        self,
+        provider: DraftProvider,
+        *,
+        max_in_flight: int = 8,
+        max_batch: int = 16,
+        batch_window_s: float = 0.002,
+    ) -> None:
+        self.provider = provider
+        self.max_in_flight = max_in_flight
+        self.max_batch = max(1, max_batch)
+        self.batch_window_s = batch_window_s
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._pending: List[_Pending] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: Set[asyncio.Task[None]] = set()
+        self.requests = 0
+        self.batches = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def generate(self, req: DraftRequest) -> DraftResponse:
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future[DraftResponse] = loop.create_future()
+        self._pending.append((req, fut))
+        self.requests += 1
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.batch_window_s, self._flush)
+        return await fut
+
+    async def generate_many(self, reqs: Sequence[DraftRequest]) -> List[DraftResponse]:
+        """Results in input order; batched and throttled like single calls."""
+        return list(await asyncio.gather(*(self.generate(r) for r in reqs)))
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[_Pending]) -> None:
+        async with self._slots:
+            self.batches += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                results = await self.provider.agenerate_many([req for req, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"provider returned {len(results)} drafts for {len(batch)} requests"
+                    )
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                return
+            finally:
+                self.in_flight -= 1
+        for (_, fut), res in zip(batch, results, strict=True):
+            if not fut.done():  # the caller may have been cancelled meanwhile
+                fut.set_result(res)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "pending": len(self._pending),
+        }
+"""Concurrency-limited, micro-batching runner for draft providers."""
@@ -12,6 +12,63 @@ class Settings(BaseSettings):
     MAIL_AGENT_GMAIL_LABEL_PREFIX: str = "Agent-Sent"
     MAIL_AGENT_BRAND_ID: str = "default"
 
+    # Brands: packed index from `cli.py brands-index` (used when present) and the
+    # memory bound for compiled brand bundles
+    MAIL_AGENT_BRAND_INDEX: str = "build/brands.idx"
+    MAIL_AGENT_BRAND_CACHE_BYTES: int = 64 * 1024 * 1024
+
+    # Drafting: "module:Class" of a DraftProvider to draft previews with, behind a
+    # HedgedProviderChain that falls back to DraftAgent; empty drafts with DraftAgent only
+    MAIL_AGENT_DRAFT_PROVIDER: str = ""
+    MAIL_AGENT_DRAFT_DEADLINE_S: float = 2.0
+    MAIL_AGENT_DRAFT_HEDGE_AFTER_S: float = 0.5  # <=0 disables hedging
+
+    # Rendering
+    MAIL_AGENT_JINJA_BYTECODE_DIR: str = ""  # empty disables the on-disk bytecode cache
+    # Precompiled templates from `cli.py templates-compile`; used when the file exists
+    MAIL_AGENT_TEMPLATES_COMPILED: str = "build/templates.zip"
+    MAIL_AGENT_WARMUP: bool = True  # warm templates, default brand and render stack at start-up
+    MAIL_AGENT_ASSET_POLL_S: float = 0.0  # >0: hot-reload brands/ and templates at this interval
+    # skeleton: inline brand chrome once and splice messages in; full: Premailer per message
+    MAIL_AGENT_INLINE_MODE: Literal["skeleton", "full"] = "skeleton"
+
+    # Preview cache (0 entries disables it)
+    MAIL_AGENT_PREVIEW_CACHE_ENTRIES: int = 1024
+    MAIL_AGENT_PREVIEW_CACHE_BYTES: int = 32 * 1024 * 1024
+    # Previews kept by content hash as bases for iteration deltas (shares the byte bound)
+    MAIL_AGENT_DELTA_BASE_ENTRIES: int = 256
+    # Memoized NL instruction parses (0 disables the memo)
+    MAIL_AGENT_INTERPRET_CACHE_ENTRIES: int = 4096
+
+    # Server-side iteration sessions (/sessions); an empty DB path keeps them in memory only
+    MAIL_AGENT_SESSION_MAX: int = 1024
+    MAIL_AGENT_SESSION_TTL_S: float = 3600.0  # idle time after the last revision
+    MAIL_AGENT_SESSION_MAX_REVISIONS: int = 64
+    MAIL_AGENT_SESSION_DB: str = ""
+
+    # Render process pool (0 renders in the API process)
+    MAIL_AGENT_RENDER_PROCESSES: int = 0
+    MAIL_AGENT_RENDER_QUEUE: int = 64  # renders waiting beyond the busy workers (0: none)
+    MAIL_AGENT_RENDER_QUEUE_TIMEOUT_S: float = 5.0
+
+    # Async API: drafting/rendering executor; requests beyond workers + queue get 429
+    MAIL_AGENT_CPU_WORKERS: int = 4
+    MAIL_AGENT_CPU_QUEUE: int = 64
+    # JSON responses at least this large are compressed when the client accepts it (0 disables)
+    MAIL_AGENT_COMPRESS_MIN_BYTES: int = 1024
+    # Stage histograms and counters served at GET /metrics (off: no recording, 404)
+    MAIL_AGENT_METRICS: bool = True
+    # POST /mail/preview/batch: items per render job, jobs in flight per batch, max item size
+    MAIL_AGENT_BATCH_CHUNK: int = 16
+    MAIL_AGENT_BATCH_PARALLEL: int = 4
+    MAIL_AGENT_BATCH_MAX_ITEM_BYTES: int = 256 * 1024
+    # POST /mail/deliver/jobs: delivery threads (= concurrent Gmail calls), jobs kept,
+    # requests per job, and how long a finished job stays readable
+    MAIL_AGENT_DELIVERY_WORKERS: int = 4
+    MAIL_AGENT_DELIVERY_MAX_JOBS: int = 64
+    MAIL_AGENT_DELIVERY_JOB_MAX_ITEMS: int = 10000
+    MAIL_AGENT_DELIVERY_JOB_TTL_S: float = 3600.0
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 
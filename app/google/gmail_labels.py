@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Any, Optional, Sequence
 from googleapiclient.discovery import Resource  # type: ignore[import-untyped]
+from app.metrics import metrics
 
 
 def _list_labels(svc: Resource) -> list[dict[str, Any]]:
@@ -29,6 +30,7 @@ def ensure_label(svc: Resource, name: str) -> str:
     return str(created["id"])
 
 
+@metrics.timed("ensure_hierarchy")
 def ensure_hierarchy(svc: Resource, parent: str, leaf: str) -> list[str]:
     parent_id = ensure_label(svc, parent)
     leaf_id = ensure_label(svc, f"{parent}/{leaf}")
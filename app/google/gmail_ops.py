@@ -1,12 +1,43 @@
 from __future__ import annotations
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 import logging
+import threading
 
 from app.config.settings import settings
 from app.google.oauth import ensure_user_credentials
 from app.google.gmail_service import build_gmail_service
 from app.google.gmail_labels import ensure_hierarchy
 from app.google.mime import compose_email, to_gmail_raw
+from app.metrics import metrics
+
+
+class GmailReuse:
+    """Gmail client and label ids shared by many deliveries, e.g. one bulk job.
+
+    Without it every message pays for credentials, a service build and two
+    label listings. The client is not thread-safe, so each thread builds its
+    own once; label ids are looked up once per brand.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._labels: Dict[Tuple[str, str], List[str]] = {}
+        self._lock = threading.Lock()
+
+    def service(self) -> Any:
+        svc = getattr(self._local, "svc", None)
+        if svc is None:
+            svc = self._local.svc = build_gmail_service(ensure_user_credentials(interactive=False))
+        return svc
+
+    def labels(self, svc: Any, prefix: str, brand_id: str) -> List[str]:
+        with self._lock:
+            found = self._labels.get((prefix, brand_id))
+        if found is None:
+            found = ensure_hierarchy(svc, prefix, brand_id)
+            with self._lock:
+                found = self._labels.setdefault((prefix, brand_id), found)
+        return found
 
 
 def draft_or_send_message(
@@ -21,11 +52,14 @@ def draft_or_send_message(
     reply_to: str | None = None,
     attachments: list[str] | None = None,
     force_action: str | None = None,
+    reuse: GmailReuse | None = None,
 ) -> Dict[str, Any]:
     """Create a Gmail draft (default) or send immediately, then apply labels."""
     logger = logging.getLogger("mail.delivery")
-    creds = ensure_user_credentials(interactive=False)
-    svc = build_gmail_service(creds)
+    if reuse is not None:
+        svc = reuse.service()
+    else:
+        svc = build_gmail_service(ensure_user_credentials(interactive=False))
 
     # Build MIME + raw
     msg = compose_email(
@@ -43,25 +77,31 @@ def draft_or_send_message(
 
     # Ensure labels exist
     label_prefix = settings.MAIL_AGENT_GMAIL_LABEL_PREFIX
-    label_ids = ensure_hierarchy(svc, label_prefix, brand_id)
+    if reuse is not None:
+        label_ids = reuse.labels(svc, label_prefix, brand_id)
+    else:
+        label_ids = ensure_hierarchy(svc, label_prefix, brand_id)
 
     action = (force_action or settings.MAIL_AGENT_DEFAULT_ACTION).strip().lower()
     if action == "send":
-        res = svc.users().messages().send(userId="me", body={"raw": raw}).execute()
+        with metrics.timer("gmail_send"):
+            res = svc.users().messages().send(userId="me", body={"raw": raw}).execute()
         msg_id = res.get("id")
         logger.info("gmail.send id=%s to=%s subject=%r", msg_id, to, subject)
     else:
         # create draft, then label the underlying message
-        d = svc.users().drafts().create(userId="me", body={"message": {"raw": raw}}).execute()
+        with metrics.timer("gmail_create"):
+            d = svc.users().drafts().create(userId="me", body={"message": {"raw": raw}}).execute()
         msg_id = d.get("message", {}).get("id")
         logger.info("gmail.draft id=%s to=%s subject=%r", msg_id, to, subject)
 
     # Apply labels to the message
-    svc.users().messages().modify(
-        userId="me",
-        id=msg_id,
-        body={"addLabelIds": label_ids, "removeLabelIds": []},
-    ).execute()
+    with metrics.timer("gmail_modify"):
+        svc.users().messages().modify(
+            userId="me",
+            id=msg_id,
+            body={"addLabelIds": label_ids, "removeLabelIds": []},
+        ).execute()
 
     return {"status": action, "id": str(msg_id), "labels_applied": label_ids}
 """Gmail delivery operations (draft/send + labeling)."""
@@ -6,9 +6,11 @@ from typing import Sequence
 import base64
 import mimetypes
 
-from app.tools.brand_loader import load_brand
+from app.metrics import metrics
+from app.templating.brand_bundle import load_brand_bundle
 
 
+@metrics.timed("compose_email")
 def compose_email(
     *,
     to: str,
@@ -26,7 +28,7 @@ def compose_email(
     Build a multipart/alternative email with optional attachments.
     Uses brand defaults (from_name/from_email/reply_to if provided in brand).
     """
-    brand = load_brand(brand_id)
+    brand = load_brand_bundle(brand_id).config
     msg = EmailMessage()
 
     # From
@@ -68,6 +70,7 @@ def compose_email(
     return msg
 
 
+@metrics.timed("to_gmail_raw")
 def to_gmail_raw(msg: EmailMessage) -> str:
     """Base64url for Gmail 'raw' field."""
     return base64.urlsafe_b64encode(msg.as_bytes()).decode("ascii")
@@ -0,0 +1,182 @@
+from __future__ import annotations
+from typing import Any, AsyncIterator, Dict, List, Sequence, Set, Tuple
+import asyncio
+import codecs
+import json
+
+from pydantic import ValidationError
+
+from app.agents.types import DraftRequest
+from app.mail.executor import Overloaded, get_cpu_executor
+from app.mail.workflow import preview_many
+from app.tools.brand_loader import BrandNotFound
+
+_WS = " \t\r\n"
+# (input index, request or the error that replaces its result)
+Item = Tuple[int, DraftRequest | Dict[str, Any]]
+
+
+class BatchInputError(ValueError):
+    """The request body cannot be parsed further; items already read still complete."""
+
+
+def _error(status: int, detail: Any) -> Dict[str, Any]:
+    return {"status": status, "detail": detail}
+
+
+async def iter_json_items(
+    chunks: AsyncIterator[bytes], max_item_bytes: int
+) -> AsyncIterator[Dict[str, Any] | BatchInputError]:
+    """JSON objects from a streamed NDJSON body or JSON array, one at a time.
+
+    Only the item being parsed is buffered (up to about `max_item_bytes`). A
+    syntax error ends the stream with a `BatchInputError`, since there is no
+    reliable place to resume after it.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buf = ""
+    array: bool | None = None
+    done = False
+    source = chunks.__aiter__()
+
+    while True:
+        buf = buf.lstrip(_WS + ",") if array else buf.lstrip(_WS)
+        if array is None and buf:
+            array = buf.startswith("[")
+            buf = buf[1:] if array else buf
+            continue
+        if array and buf.startswith("]"):
+            return
+        if buf and (done or "\n" in buf or buf[-1] in "}]"):
+            try:
+                obj, end = decoder.raw_decode(buf)
+            except json.JSONDecodeError as e:
+                # NDJSON items end at a newline; array items may span lines. No
+                # JSON token spans a raw newline, so one after the error is final.
+                ended = "\n" in buf[e.pos :] or (not array and "\n" in buf[: e.pos])
+                if done or ended or len(buf) > max_item_bytes:
+                    yield BatchInputError(f"invalid JSON: {e.msg}")
+                    return
+            else:
+                if not isinstance(obj, dict):
+                    yield BatchInputError("each item must be a JSON object")
+                    return
+                yield obj
+                buf = buf[end:]
+                continue
+        if done:
+            if buf or array:
+                yield BatchInputError("unexpected end of input")
+            return
+        if len(buf) > max_item_bytes:
+            yield BatchInputError(f"item larger than {max_item_bytes} bytes")
+            return
+        try:
+            buf += utf8.decode(await source.__anext__())
+        except StopAsyncIteration:
+            buf += utf8.decode(b"", final=True)
+            done = True
+
+
+async def _preview_chunk(
+    chunk: Sequence[Item], fields: Sequence[str] | None
+) -> List[Dict[str, Any]]:
+    reqs = [(i, r) for i, r in chunk if isinstance(r, DraftRequest)]
+    executor = get_cpu_executor()
+    results: List[Dict[str, Any] | Exception] = []
+    while reqs:
+        try:
+            results = await executor.run(preview_many, [r for _, r in reqs], fields)
+            break
+        except Overloaded as e:
+            # A batch waits its turn instead of failing; single requests get the 429.
+            await asyncio.sleep(min(e.retry_after, 1))
+    by_index: Dict[int, Dict[str, Any]] = {}
+    for (i, _), res in zip(reqs, results, strict=True):
+        if isinstance(res, BrandNotFound):
+            by_index[i] = {"index": i, "error": _error(404, str(res))}
+        elif isinstance(res, ValueError):
+            by_index[i] = {"index": i, "error": _error(422, str(res))}
+        elif isinstance(res, Exception):
+            by_index[i] = {"index": i, "error": _error(500, f"{type(res).__name__}: {res}")}
+        else:
+            by_index[i] = {"index": i, "preview": res}
+    return [
+        by_index[i] if isinstance(r, DraftRequest) else {"index": i, "error": r}
+        for i, r in chunk
+    ]
+
+
+def _line(obj: Dict[str, Any]) -> bytes:
+    return (json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+async def preview_batch(
+    body: AsyncIterator[bytes],
+    fields: Sequence[str] | None = None,
+    *,
+    chunk_size: int = 16,
+    parallel: int = 4,
+    max_item_bytes: int = 256 * 1024,
+) -> AsyncIterator[bytes]:
+    """NDJSON result lines for a streamed batch of `DraftRequest`s.
+
+    Items are grouped into chunks of `chunk_size`, each rendered by one
+    `preview_many` call on the CPU executor; at most `parallel` chunks are in
+    flight, and the body is not read further until one finishes. Lines are
+    `{"index": i, "preview": {...}}` or `{"index": i, "error": {"status",
+    "detail"}}` and appear as chunks complete, so not in input order.
+    """
+    pending: Set[asyncio.Task[List[Dict[str, Any]]]] = set()
+    chunk: List[Item] = []
+    index = 0
+
+    async def drain(limit: int) -> AsyncIterator[bytes]:
+        # Emit whatever has finished; wait only while more than `limit` are in flight.
+        while pending:
+            done = {t for t in pending if t.done()}
+            if not done:
+                if len(pending) <= limit:
+                    return
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending.difference_update(done)
+            for task in done:
+                for obj in task.result():
+                    yield _line(obj)
+
+    def submit() -> None:
+        nonlocal chunk
+        pending.add(asyncio.create_task(_preview_chunk(chunk, fields)))
+        chunk = []
+
+    try:
+        async for raw in iter_json_items(body, max_item_bytes):
+            if isinstance(raw, BatchInputError):
+                chunk.append((index, _error(400, str(raw))))
+                break
+            try:
+                chunk.append((index, DraftRequest.model_validate(raw)))
+            except ValidationError as e:
+                detail = e.errors(include_url=False, include_context=False, include_input=False)
+                chunk.append((index, _error(422, detail)))
+            index += 1
+            if len(chunk) >= chunk_size:
+                submit()
+                async for line in drain(max(parallel, 1) - 1):
+                    yield line
+        if chunk:
+            submit()
+        async for line in drain(0):
+            yield line
+    finally:
+        for task in pending:
+            task.cancel()
+"""Streaming batch previews (`POST /mail/preview/batch`).
+
+The request body is read incrementally (NDJSON or a JSON array of
+`DraftRequest`s) and result lines are streamed back as soon as their chunk
+is rendered, so memory stays bounded by `parallel` x `chunk_size` items no
+matter how large the campaign. Invalid items are reported inline with their
+input index; the rest of the batch carries on.
+"""
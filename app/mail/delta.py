@@ -0,0 +1,150 @@
+from __future__ import annotations
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Mapping
+import hashlib
+import re
+import threading
+
+# Content fields a delta can carry; everything else is always sent in full.
+CONTENT_FIELDS = ("subject", "text", "html")
+
+# HTML is diffed as tag-sized fragments (split after every '>'), text by line.
+_HTML_SPLIT = re.compile(r"(?<=>)")
+
+
+def content_hash(content: Mapping[str, str]) -> str:
+    """Stable hash of exactly the content fields a client holds."""
+    h = hashlib.sha256()
+    for name in CONTENT_FIELDS:
+        if name in content:
+            value = content[name].encode("utf-8")
+            h.update(f"{name}:{len(value)}:".encode("ascii"))
+            h.update(value)
+    return h.hexdigest()[:32]
+
+
+def _pieces(name: str, value: str) -> List[str]:
+    if name == "html":
+        return [p for p in _HTML_SPLIT.split(value) if p]
+    return value.splitlines(keepends=True)
+
+
+def diff_content(base: Mapping[str, str], new: Mapping[str, str]) -> Dict[str, Any]:
+    """Compact delta turning `base` into `new`.
+
+    Unchanged fields are omitted and fields `new` no longer has are null.
+    `subject`, and any field missing from the base, is sent as a string.
+    `text` and `html` are lists of `[start, end, [pieces]]` edits over the
+    base's lines/fragments, applied in order against the base.
+    """
+    delta: Dict[str, Any] = {}
+    for name in CONTENT_FIELDS:
+        if name in base and name not in new:
+            delta[name] = None
+            continue
+        if name not in new or base.get(name) == new[name]:
+            continue
+        if name == "subject" or name not in base:
+            delta[name] = new[name]
+            continue
+        a, b = _pieces(name, base[name]), _pieces(name, new[name])
+        sm = SequenceMatcher(None, a, b, autojunk=False)
+        delta[name] = [
+            [i1, i2, b[j1:j2]] for op, i1, i2, j1, j2 in sm.get_opcodes() if op != "equal"
+        ]
+    return delta
+
+
+def apply_delta(base: Mapping[str, str], delta: Mapping[str, Any]) -> Dict[str, str]:
+    """Reconstruct the new content from the base a delta was computed against.
+
+    Mirrored client-side in `adk_app/tools/delta.py`; keep the two in step.
+    """
+    out = dict(base)
+    for name, change in delta.items():
+        if change is None:
+            out.pop(name, None)
+        elif isinstance(change, str):
+            out[name] = change
+        else:
+            out[name] = _patch(_pieces(name, base[name]), change)
+    return out
+
+
+def _patch(pieces: List[str], change: List[Any]) -> str:
+    merged: List[str] = []
+    pos = 0
+    for start, end, replacement in change:
+        merged.extend(pieces[pos:start])
+        merged.extend(replacement)
+        pos = end
+    merged.extend(pieces[pos:])
+    return "".join(merged)
+
+
+class DeltaBases:
+    """Recently served preview contents by hash, bounded by entries and size."""
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[str, Dict[str, str]] = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Dict[str, str] | None:
+        with self._lock:
+            content = self._data.get(key)
+            if content is None:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+            return content
+
+    def __contains__(self, key: object) -> bool:
+        # A peek: neither counts as a hit nor refreshes the entry.
+        with self._lock:
+            return key in self._data
+
+    def put(self, key: str, content: Dict[str, str]) -> None:
+        size = sum(len(v) for v in content.values())
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return
+            self._data[key] = content
+            self._sizes[key] = size
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                old, _ = self._data.popitem(last=False)
+                self._bytes -= self._sizes.pop(old)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+"""Delta encoding for iteration previews.
+
+Each preview carries a `hash` of the content fields it returned. A client
+that sends that hash back as `since=` gets only what changed: the subject if
+it differs, and line/fragment edits for text and HTML. When the base is
+unknown (evicted, or from another process) the full fields are returned
+instead. `apply_delta` rebuilds the new content on the client side.
+"""
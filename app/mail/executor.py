@@ -0,0 +1,126 @@
+from __future__ import annotations
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+import asyncio
+import math
+import threading
+import time
+
+from app.config.settings import settings
+
+T = TypeVar("T")
+
+
+class Overloaded(RuntimeError):
+    """Admission refused: every CPU worker is busy and the queue is full."""
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CpuExecutor:
+    """Bounded thread pool for the CPU stages of async requests.
+
+    At most `workers` jobs run at once and at most `max_queue` more wait for
+    a worker; `run` refuses anything beyond that with `Overloaded` right away
+    instead of letting latency grow for everyone. `retry_after` is estimated
+    from the queue depth and the recent mean job time.
+    """
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.capacity = self.workers + self.max_queue
+        self.admitted = 0  # queued + running
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self._mean_s = 0.01  # EWMA of job wall time
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cpu")
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self.admitted >= self.capacity:
+                self.rejected += 1
+                raise Overloaded(
+                    f"CPU queue full ({self.admitted} admitted)", self._retry_after()
+                )
+            self.admitted += 1
+        try:
+            fut = self._pool.submit(self._call, fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        # Also fires when a queued job is cancelled because its caller went away.
+        fut.add_done_callback(self._release)
+        return await asyncio.wrap_future(fut)
+
+    def _call(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            self.running += 1
+        t0 = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - t0
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self._mean_s += 0.1 * (elapsed - self._mean_s)
+
+    def _release(self, _fut: Future[Any] | None) -> None:
+        with self._lock:
+            self.admitted -= 1
+
+    def _retry_after(self) -> int:
+        # Time for the current backlog to drain across all workers, in whole seconds.
+        return max(1, math.ceil(self.admitted * self._mean_s / self.workers))
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "in_flight": self.running,
+                "queued": self.admitted - self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+_executor: CpuExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_cpu_executor() -> CpuExecutor:
+    """Process-wide executor sized by `MAIL_AGENT_CPU_WORKERS`/`MAIL_AGENT_CPU_QUEUE`."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = CpuExecutor(
+                    workers=settings.MAIL_AGENT_CPU_WORKERS,
+                    max_queue=settings.MAIL_AGENT_CPU_QUEUE,
+                )
+    return _executor
+
+
+def shutdown_cpu_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+"""Admission-controlled executor for CPU-bound request stages.
+
+Async endpoints run drafting and rendering here rather than in Starlette's
+unbounded default threadpool. When the executor is saturated, callers get
+`Overloaded` (HTTP 429 with `Retry-After`) immediately, so a burst is shed
+at the door instead of queueing until every request times out. `stats()`
+reports in-flight and queued work for capacity planning.
+"""
@@ -0,0 +1,274 @@
+from __future__ import annotations
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Literal, Sequence, Tuple
+import asyncio
+import secrets
+import threading
+import time
+
+from app.agents.types import DraftRequest
+from app.config.settings import settings
+from app.mail.executor import Overloaded
+
+ItemStatus = Literal["queued", "running", "done", "failed"]
+_ITEM_STATUSES: Tuple[ItemStatus, ...] = ("queued", "running", "done", "failed")
+
+
+class DeliveryJob:
+    """One bulk delivery: per-item status and results, plus change notification.
+
+    Worker threads update items through `_start`/`_finish`; readers take
+    `snapshot()` or follow `events()` from the event loop.
+    """
+
+    def __init__(self, job_id: str, reqs: Sequence[DraftRequest], mode: str | None) -> None:
+        self.job_id = job_id
+        self.mode = mode
+        self.created = time.time()
+        self.finished: float | None = None
+        self.total = len(reqs)
+        self._reqs: List[DraftRequest | None] = list(reqs)  # dropped once delivered
+        self._items: List[Dict[str, Any]] = [
+            {"index": i, "status": "queued"} for i in range(self.total)
+        ]
+        self._counts: Dict[str, int] = dict.fromkeys(_ITEM_STATUSES, 0)
+        self._counts["queued"] = self.total
+        self._completed: List[int] = []  # item indices in completion order
+        self._gmail: Any = None
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+        self._done = threading.Event()
+        if not self.total:
+            self.finished = self.created
+            self._done.set()
+
+    def _status(self) -> str:
+        if self.finished is not None:
+            return "done"
+        return "queued" if self._counts["queued"] == self.total else "running"
+
+    def snapshot(self, items: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = {
+                "job_id": self.job_id,
+                "status": self._status(),
+                "mode": self.mode,
+                "total": self.total,
+                "counts": dict(self._counts),
+                "created": self.created,
+                "finished": self.finished,
+            }
+            if items:
+                out["items"] = [dict(item) for item in self._items]
+            return out
+
+    async def events(self) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """(event, data) pairs: `item` per completed item, then `progress` with the counts.
+
+        Changes that land while the consumer is busy are coalesced into the
+        next round; the stream ends with a `done` event once every item is.
+        """
+        loop = asyncio.get_running_loop()
+        waiter = (loop, asyncio.Event())
+        with self._lock:
+            self._waiters.append(waiter)
+        sent = 0
+        try:
+            while True:
+                waiter[1].clear()
+                with self._lock:
+                    fresh = [dict(self._items[i]) for i in self._completed[sent:]]
+                    sent += len(fresh)
+                    counts = dict(self._counts)
+                    done = self.finished is not None
+                for item in fresh:
+                    yield "item", item
+                yield "progress", {"job_id": self.job_id, "total": self.total, "counts": counts}
+                if done:
+                    yield "done", self.snapshot(items=False)
+                    return
+                await waiter[1].wait()
+        finally:
+            with self._lock:
+                self._waiters.remove(waiter)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until every item is delivered or failed; False on timeout."""
+        return self._done.wait(timeout)
+
+    def gmail(self) -> Any:
+        """The job's `GmailReuse`, created on first delivery (keeps Google imports lazy)."""
+        with self._lock:
+            if self._gmail is None:
+                from app.google.gmail_ops import GmailReuse
+
+                self._gmail = GmailReuse()
+            return self._gmail
+
+    def _start(self, index: int) -> DraftRequest:
+        with self._lock:
+            self._move(index, "running")
+            req = self._reqs[index]
+        self._notify()
+        assert req is not None
+        return req
+
+    def _finish(self, index: int, result: Dict[str, Any] | None, error: str | None) -> None:
+        with self._lock:
+            self._complete(index, result, error)
+        self._notify()
+
+    def _abandon(self, reason: str) -> None:
+        """Fail every item still queued, so `events()` and `wait()` end."""
+        with self._lock:
+            for item in self._items:
+                if item["status"] == "queued":
+                    self._complete(item["index"], None, reason)
+        self._notify()
+
+    # Callers hold self._lock.
+    def _complete(self, index: int, result: Dict[str, Any] | None, error: str | None) -> None:
+        item = self._move(index, "failed" if error is not None else "done")
+        if error is not None:
+            item["error"] = error
+        else:
+            item["result"] = result
+        self._reqs[index] = None
+        self._completed.append(index)
+        if len(self._completed) == self.total:
+            self.finished = time.time()
+            self._done.set()
+
+    def _move(self, index: int, status: ItemStatus) -> Dict[str, Any]:
+        item = self._items[index]
+        self._counts[item["status"]] -= 1
+        self._counts[status] += 1
+        item["status"] = status
+        return item
+
+    def _notify(self) -> None:
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:  # that loop is closed; its reader is gone
+                pass
+
+
+class DeliveryJobs:
+    """Bulk delivery jobs on a fixed pool of `workers` threads.
+
+    `submit` returns at once; items are delivered in submission order, at
+    most `workers` at a time across all jobs, which also caps concurrent
+    Gmail calls. Up to `max_jobs` jobs are kept; finished ones are forgotten
+    `ttl_s` after they finish, or earlier (oldest first) to make room. A new
+    job is refused with `Overloaded` when every slot holds an unfinished job.
+    """
+
+    def __init__(self, *, workers: int, max_jobs: int, max_items: int, ttl_s: float) -> None:
+        self.max_jobs = max(1, max_jobs)
+        self.max_items = max_items
+        self.ttl_s = ttl_s
+        self._jobs: OrderedDict[str, DeliveryJob] = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="delivery")
+
+    def submit(self, reqs: Sequence[DraftRequest], mode: str | None = None) -> DeliveryJob:
+        if len(reqs) > self.max_items:
+            raise ValueError(f"at most {self.max_items} requests per job, got {len(reqs)}")
+        with self._lock:
+            self._purge(time.time())
+            if len(self._jobs) >= self.max_jobs:
+                raise Overloaded(f"{len(self._jobs)} delivery jobs still running", 5)
+            job = DeliveryJob(secrets.token_urlsafe(16), reqs, mode)
+            self._jobs[job.job_id] = job
+        for i in range(job.total):
+            self._pool.submit(self._run, job, i)
+        return job
+
+    def get(self, job_id: str) -> DeliveryJob:
+        """Raises KeyError for unknown or expired jobs."""
+        with self._lock:
+            self._purge(time.time())
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"unknown or expired delivery job {job_id}")
+        return job
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        running = [j for j in jobs if j.finished is None]
+        return {
+            "jobs": len(jobs),
+            "running": len(running),
+            "items_pending": sum(j.snapshot(items=False)["counts"]["queued"] for j in running),
+        }
+
+    def shutdown(self) -> None:
+        # Running items finish; items not started yet fail (the jobs live in memory only).
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job._abandon("cancelled: delivery service shut down")
+
+    def _run(self, job: DeliveryJob, index: int) -> None:
+        req = job._start(index)
+        try:
+            from app.mail.workflow import deliver
+
+            result = deliver(req, job.mode, reuse=job.gmail())
+        except Exception as e:
+            job._finish(index, None, f"{type(e).__name__}: {e}")
+        else:
+            job._finish(index, result, None)
+
+    # Callers hold self._lock.
+    def _purge(self, now: float) -> None:
+        finished = [j for j in self._jobs.values() if j.finished is not None]
+        for job in finished:
+            assert job.finished is not None
+            if now - job.finished > self.ttl_s or len(self._jobs) >= self.max_jobs:
+                del self._jobs[job.job_id]
+
+
+_jobs: DeliveryJobs | None = None
+_jobs_lock = threading.Lock()
+
+
+def get_delivery_jobs() -> DeliveryJobs:
+    """Process-wide job runner configured from the `MAIL_AGENT_DELIVERY_*` settings."""
+    global _jobs
+    if _jobs is None:
+        with _jobs_lock:
+            if _jobs is None:
+                _jobs = DeliveryJobs(
+                    workers=settings.MAIL_AGENT_DELIVERY_WORKERS,
+                    max_jobs=settings.MAIL_AGENT_DELIVERY_MAX_JOBS,
+                    max_items=settings.MAIL_AGENT_DELIVERY_JOB_MAX_ITEMS,
+                    ttl_s=settings.MAIL_AGENT_DELIVERY_JOB_TTL_S,
+                )
+    return _jobs
+
+
+def shutdown_delivery_jobs() -> None:
+    global _jobs
+    with _jobs_lock:
+        if _jobs is not None:
+            _jobs.shutdown()
+            _jobs = None
+"""Asynchronous bulk delivery (`POST /mail/deliver/jobs`).
+
+`/mail/deliver` keeps the HTTP request open for the whole Gmail round trip,
+which does not scale to a campaign. A job acknowledges the whole list at
+once and delivers it in the background on a fixed worker pool, so the
+server, not the client, decides how many Gmail calls run concurrently.
+Each job reuses one Gmail client per worker thread and looks up its labels
+once per brand (`GmailReuse`) instead of once per message.
+
+Progress is available as a snapshot (per-item status and result, counts) or
+as a stream of events for Server-Sent Events. Jobs live in memory only.
+"""
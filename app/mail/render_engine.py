@@ -0,0 +1,124 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple
+import math
+import multiprocessing
+import threading
+
+from app.agents.types import DraftRequest, DraftResponse
+from app.config.settings import settings
+from app.mail.executor import Overloaded
+from app.templating.assets import asset_version
+
+
+class RenderQueueFull(Overloaded):
+    """All render slots are busy and none freed up within the queue timeout.
+
+    An `Overloaded`, so the API answers 429 with Retry-After like a full CPU queue.
+    """
+
+
+# asset_version() of the parent that this worker's templates/brands match
+_worker_assets = 0
+
+
+def _warm_worker(brands_dir: str, assets: int = 0) -> None:
+    # Runs once per worker process so the first real render is not slower.
+    from app.templating.render import warm_up
+
+    global _worker_assets
+    _worker_assets = assets
+    warm_up(brands_dir)
+
+
+def _render_in_worker(req: DraftRequest, draft: DraftResponse, assets: int) -> Tuple[str, str]:
+    global _worker_assets
+    from app.mail.workflow import render_local
+
+    if assets != _worker_assets:
+        # The parent hot-reloaded brands/templates; drop this worker's copies too.
+        from app.templating.brand_bundle import invalidate_brand_bundles
+        from app.templating.env import invalidate_templates
+
+        invalidate_templates()
+        invalidate_brand_bundles()
+        _worker_assets = assets
+    return render_local(req, draft)
+
+
+class RenderEngine:
+    """Runs `workflow.render` in a warm process pool to use more than one core.
+
+    Like `CpuExecutor`, `max_queue` counts renders waiting beyond the ones
+    the `processes` workers are running, so 0 means no queue (the workers
+    still run). Callers beyond that wait up to `queue_timeout` seconds and
+    then get `RenderQueueFull`.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        max_queue: int,
+        queue_timeout: float = 5.0,
+        brands_dir: str = "brands",
+    ) -> None:
+        self.processes = processes
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max(1, processes) + max(0, max_queue))
+        # spawn: forking a threaded server (uvicorn/Starlette threadpool) is unsafe
+        self._pool = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+            initargs=(brands_dir, asset_version()),
+        )
+
+    def render(self, req: DraftRequest, draft: DraftResponse) -> Tuple[str, str]:
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise RenderQueueFull(
+                f"render queue full ({self.processes} running, {self.max_queue} queued)",
+                max(1, math.ceil(self.queue_timeout)),
+            )
+        try:
+            return self._pool.submit(_render_in_worker, req, draft, asset_version()).result()
+        finally:
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+_engine: RenderEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_render_engine() -> RenderEngine | None:
+    """Process-wide engine, or None when `MAIL_AGENT_RENDER_PROCESSES` is 0."""
+    global _engine
+    if settings.MAIL_AGENT_RENDER_PROCESSES <= 0:
+        return None
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RenderEngine(
+                    processes=settings.MAIL_AGENT_RENDER_PROCESSES,
+                    max_queue=settings.MAIL_AGENT_RENDER_QUEUE,
+                    queue_timeout=settings.MAIL_AGENT_RENDER_QUEUE_TIMEOUT_S,
+                )
+    return _engine
+
+
+def shutdown_render_engine() -> None:
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.shutdown()
+            _engine = None
+"""Optional process-pool rendering engine.
+
+Jinja, Premailer and BeautifulSoup are CPU-bound pure Python, so renders in
+one API process are serialized by the GIL. When `MAIL_AGENT_RENDER_PROCESSES`
+is set, `workflow.render` hands work to a pool of warm worker processes
+(templates compiled and brands loaded at start-up) behind a bounded queue.
+"""
@@ -0,0 +1,268 @@
+from __future__ import annotations
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Tuple
+import secrets
+import sqlite3
+import threading
+import time
+
+from app.agents.types import DraftRequest
+from app.config.settings import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, updated REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated);
+CREATE TABLE IF NOT EXISTS revisions (
+    session_id TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    request TEXT NOT NULL,
+    PRIMARY KEY (session_id, number)
+);
+"""
+
+
+class SessionInfo(NamedTuple):
+    session_id: str
+    first: int  # oldest revision still held
+    latest: int
+
+
+class _Session:
+    __slots__ = ("first", "revisions", "updated")
+
+    def __init__(self, first: int, revisions: List[DraftRequest], updated: float) -> None:
+        self.first = first
+        self.revisions = revisions
+        self.updated = updated
+
+    @property
+    def latest(self) -> int:
+        return self.first + len(self.revisions) - 1
+
+
+class SessionStore:
+    """Iteration sessions: a revision history of `DraftRequest`s per session id.
+
+    Sessions expire `ttl_s` after their last revision; at most `max_sessions`
+    are kept in memory (least recently used first out) and each keeps its
+    newest `max_revisions`. With `path`, sessions are also written to SQLite,
+    so they survive restarts and memory eviction until their TTL runs out.
+
+    Stored requests are never handed out directly: `get` returns a copy the
+    caller may modify.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_sessions: int,
+        ttl_s: float,
+        max_revisions: int,
+        path: str = "",
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_sessions = max_sessions
+        self.ttl_s = ttl_s
+        self.max_revisions = max(1, max_revisions)
+        self.evictions = 0
+        self.expirations = 0
+        self._clock = clock
+        self._data: OrderedDict[str, _Session] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL: commits do not fsync, so async endpoints are not held up.
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+
+    def create(self, req: DraftRequest) -> SessionInfo:
+        session_id = secrets.token_urlsafe(16)
+        now = self._clock()
+        with self._lock:
+            self._purge(now)
+            session = _Session(1, [req.model_copy(deep=True)], now)
+            self._remember(session_id, session)
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("BEGIN")
+                    self._db.execute("INSERT INTO sessions VALUES (?, ?)", (session_id, now))
+                    self._db.execute(
+                        "INSERT INTO revisions VALUES (?, 1, ?)",
+                        (session_id, req.model_dump_json()),
+                    )
+            return SessionInfo(session_id, 1, 1)
+
+    def get(self, session_id: str, revision: int | None = None) -> Tuple[int, DraftRequest]:
+        """(revision number, copy of its request); the latest revision by default.
+
+        Raises KeyError for unknown or expired sessions and revisions no longer held.
+        """
+        with self._lock:
+            session = self._session(session_id)
+            number = session.latest if revision is None else revision
+            if not session.first <= number <= session.latest:
+                raise KeyError(f"revision {number} of session {session_id} is not available")
+            req = session.revisions[number - session.first]
+        return number, req.model_copy(deep=True)
+
+    def append(self, session_id: str, req: DraftRequest) -> int:
+        """Record `req` as the session's next revision and return its number."""
+        now = self._clock()
+        with self._lock:
+            session = self._session(session_id)
+            session.revisions.append(req.model_copy(deep=True))
+            session.updated = now
+            dropped = len(session.revisions) - self.max_revisions
+            if dropped > 0:
+                del session.revisions[:dropped]
+                session.first += dropped
+            number = session.latest
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("BEGIN")
+                    self._db.execute(
+                        "INSERT INTO revisions VALUES (?, ?, ?)",
+                        (session_id, number, req.model_dump_json()),
+                    )
+                    self._db.execute(
+                        "UPDATE sessions SET updated = ? WHERE id = ?", (now, session_id)
+                    )
+                    self._db.execute(
+                        "DELETE FROM revisions WHERE session_id = ? AND number < ?",
+                        (session_id, session.first),
+                    )
+            return number
+
+    def info(self, session_id: str) -> SessionInfo:
+        with self._lock:
+            session = self._session(session_id)
+            return SessionInfo(session_id, session.first, session.latest)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            found = self._data.pop(session_id, None) is not None
+            if self._db is not None:
+                found = self._delete_rows([session_id]) > 0 or found
+            return found
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": len(self._data),
+                "revisions": sum(len(s.revisions) for s in self._data.values()),
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._data.clear()
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # Callers hold self._lock for everything below.
+    def _remember(self, session_id: str, session: _Session) -> None:
+        self._data[session_id] = session
+        self._data.move_to_end(session_id)
+        while len(self._data) > self.max_sessions:
+            # Still in SQLite (when configured); reloaded on the next access.
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def _session(self, session_id: str) -> _Session:
+        now = self._clock()
+        session = self._data.get(session_id)
+        if session is None:
+            session = self._load(session_id)
+        if session is None or now - session.updated > self.ttl_s:
+            if session is not None:
+                self._data.pop(session_id, None)
+                if self._db is not None:
+                    self._delete_rows([session_id])
+                self.expirations += 1
+            raise KeyError(f"unknown or expired session {session_id}")
+        self._remember(session_id, session)
+        return session
+
+    def _load(self, session_id: str) -> _Session | None:
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT updated FROM sessions WHERE id = ?", (session_id,))
+        found = row.fetchone()
+        if found is None:
+            return None
+        rows = self._db.execute(
+            "SELECT number, request FROM revisions WHERE session_id = ? ORDER BY number",
+            (session_id,),
+        ).fetchall()
+        if not rows:
+            return None
+        revisions = [DraftRequest.model_validate_json(r[1]) for r in rows]
+        return _Session(rows[0][0], revisions, found[0])
+
+    def _purge(self, now: float) -> None:
+        expired = [sid for sid, s in self._data.items() if now - s.updated > self.ttl_s]
+        for sid in expired:
+            del self._data[sid]
+        self.expirations += len(expired)
+        if self._db is not None:
+            stale = self._db.execute(
+                "SELECT id FROM sessions WHERE updated < ?", (now - self.ttl_s,)
+            ).fetchall()
+            self._delete_rows([r[0] for r in stale])
+
+    def _delete_rows(self, session_ids: List[str]) -> int:
+        assert self._db is not None
+        if not session_ids:
+            return 0
+        marks = ",".join("?" * len(session_ids))
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.execute(f"DELETE FROM revisions WHERE session_id IN ({marks})", session_ids)
+            cur = self._db.execute(f"DELETE FROM sessions WHERE id IN ({marks})", session_ids)
+        return cur.rowcount
+
+
+_store: SessionStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Process-wide store configured from the `MAIL_AGENT_SESSION_*` settings."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SessionStore(
+                    max_sessions=settings.MAIL_AGENT_SESSION_MAX,
+                    ttl_s=settings.MAIL_AGENT_SESSION_TTL_S,
+                    max_revisions=settings.MAIL_AGENT_SESSION_MAX_REVISIONS,
+                    path=settings.MAIL_AGENT_SESSION_DB,
+                )
+    return _store
+
+
+def close_session_store() -> None:
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
+"""Server-side iteration sessions.
+
+The stateless iteration endpoints make the client resend the whole base
+`DraftRequest` with every change. A session keeps that state on the server:
+each update or NL instruction is applied to a stored revision and recorded as
+the next one, so clients send only the change plus `session_id`, can preview
+or deliver any revision still held, and can branch from an older one.
+
+Rendered output is not duplicated per revision: previews and deliveries of a
+revision go through `preview_cache`, which is keyed by the request content,
+so revisiting a revision (or delivering the one just previewed) skips
+drafting and rendering.
+"""
@@ -4,10 +4,30 @@ from pydantic import BaseModel, EmailStr
 
 
 class PreviewResponse(BaseModel):
-    subject: str
-    html: str
-    text: str
-    plan: dict[str, Any]
+    # Every field is present by default; with `fields=` only the requested
+    # ones are set and the rest are dropped from the response.
+    subject: str | None = None
+    html: str | None = None
+    text: str | None = None
+    plan: dict[str, Any] | None = None
+    html_len: int | None = None
+    word_count: int | None = None
+    # Content hash; send it back as `since=` on the next iteration for a delta
+    hash: str | None = None
+    # Set instead of subject/text/html when `since` matched a known preview
+    base: str | None = None
+    delta: dict[str, Any] | None = None
+
+
+class SessionState(BaseModel):
+    session_id: str
+    revision: int  # latest revision
+    first_revision: int  # oldest revision still held
+
+
+class SessionPreview(PreviewResponse):
+    session_id: str
+    revision: int  # the revision this preview renders
 
 
 class SendResult(BaseModel):
@@ -16,4 +36,23 @@ class SendResult(BaseModel):
     labels_applied: list[str]
     to: EmailStr
     subject: str
-"""Response models returned by preview and deliver endpoints."""
+
+
+class DeliveryItem(BaseModel):
+    index: int  # position in the submitted list
+    status: Literal["queued", "running", "done", "failed"]
+    result: dict[str, Any] | None = None  # `SendResult` fields once done
+    error: str | None = None
+
+
+class DeliveryJobState(BaseModel):
+    job_id: str
+    status: Literal["queued", "running", "done"]
+    mode: str | None = None
+    total: int
+    counts: dict[str, int]  # items per status
+    created: float
+    finished: float | None = None
+    # Omitted from the submit acknowledgement
+    items: list[DeliveryItem] | None = None
+"""Response models returned by preview, session, deliver and delivery job endpoints."""
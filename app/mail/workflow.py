@@ -1,21 +1,73 @@
 from __future__ import annotations
-from typing import Any, Dict, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+import asyncio
+import copy
+import hashlib
+import json
+import threading
 
 from app.agents.draft_agent import DraftAgent
+from app.agents.providers.chain import ServedBy, get_draft_chain
 from app.agents.types import DraftRequest, DraftResponse
-from app.templating.render import render_generic_email
+from app.config.settings import settings
+from app.mail.delta import CONTENT_FIELDS, DeltaBases, content_hash, diff_content
+from app.mail.executor import get_cpu_executor
+from app.mail.render_engine import get_render_engine
+from app.metrics import metrics
+from app.templating.brand_bundle import bundle_loaded, load_brand_bundle
+from app.templating.env import templates_version
 from app.google.gmail_actions import dry_run_plan_send
-from app.google.gmail_ops import draft_or_send_message
+
+
+def draft_or_send_message(**kwargs: Any) -> Dict[str, Any]:
+    """Gmail delivery; the Google client and OAuth stack load on first delivery only."""
+    from app.google.gmail_ops import draft_or_send_message as _draft_or_send
+
+    return _draft_or_send(**kwargs)
 
 
 def generate(req: DraftRequest) -> DraftResponse:
     return DraftAgent().draft(req)
 
 
+# (draft, whether its preview may be cached)
+Drafted = Tuple[DraftResponse, bool]
+
+
+def _model_drafted(draft: DraftResponse, served: ServedBy) -> Drafted:
+    metrics.inc("drafts", path=served.path)
+    # A fallback draft stands in for a late model answer; caching it would
+    # keep serving it after the provider recovers.
+    return draft, served.path != "fallback"
+
+
+def _draft(req: DraftRequest) -> Drafted:
+    """Draft `req` through the provider chain when one is configured, else `DraftAgent`."""
+    chain = get_draft_chain()
+    if chain is None:
+        return generate(req), True
+    return _model_drafted(*chain.generate_traced(req))
+
+
+def _rendered(html: str | None, text: str) -> None:
+    if html is not None:
+        metrics.inc("rendered_bytes", len(html.encode("utf-8")), part="html")
+    metrics.inc("rendered_bytes", len(text.encode("utf-8")), part="text")
+
+
+@metrics.timed("render")
 def render(req: DraftRequest, draft: DraftResponse) -> Tuple[str, str]:
-    """Render HTML+text using brand and context.
+    """Render HTML+text, in the render process pool when one is configured."""
+    engine = get_render_engine()
+    html, text = engine.render(req, draft) if engine is not None else render_local(req, draft)
+    _rendered(html, text)
+    return html, text
+
+
+def _template_vars(req: DraftRequest) -> dict[str, Any]:
+    """Enrich template variables with recipient metadata for personalization.
 
-    Enrich template variables with recipient metadata for personalization.
     Default long_form for welcome emails unless the caller explicitly sets it.
     """
     vars: dict[str, Any] = dict(req.context or {})
@@ -25,40 +77,375 @@ def render(req: DraftRequest, draft: DraftResponse) -> Tuple[str, str]:
     # Make welcome emails long-form by default to improve first impression
     if "long_form" not in vars and str(req.purpose).lower() == "welcome":
         vars["long_form"] = True
+    return vars
+
+
+def render_local(req: DraftRequest, draft: DraftResponse) -> Tuple[str, str]:
+    """Render HTML+text using brand and context."""
+    from app.templating.render import render_generic_email
 
     html, text = render_generic_email(
         subject=draft.subject,
         body_text=draft.body_text,
         brand_id=req.brand_id,
         purpose=req.purpose,
-        variables=vars,
+        variables=_template_vars(req),
     )
     return html, text
 
 
-def preview(req: DraftRequest) -> Dict[str, Any]:
-    draft = generate(req)
-    html, text = render(req, draft)
+def render_text(req: DraftRequest, draft: DraftResponse) -> str:
+    """Render only the plaintext part; cheap enough to always run in-process."""
+    from app.templating.render import render_generic_text
+
+    text = render_generic_text(
+        subject=draft.subject,
+        body_text=draft.body_text,
+        brand_id=req.brand_id,
+        purpose=req.purpose,
+        variables=_template_vars(req),
+    )
+    _rendered(None, text)
+    return text
+
+
+# ---------- Preview cache ----------
+class CachedPreview(NamedTuple):
+    subject: str
+    html: str | None  # None until a caller asks for the HTML
+    text: str
+    plan: dict[str, Any]
+
+    @property
+    def size(self) -> int:
+        return len(self.subject) + len(self.html or "") + len(self.text)
+
+
+class PreviewCache:
+    """Content-addressed LRU of rendered previews, bounded by entries and size."""
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._data: OrderedDict[str, CachedPreview] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedPreview | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: CachedPreview) -> None:
+        if self.max_entries <= 0 or entry.size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._data[key] = entry
+            self._bytes += entry.size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+preview_cache = PreviewCache(
+    max_entries=settings.MAIL_AGENT_PREVIEW_CACHE_ENTRIES,
+    max_bytes=settings.MAIL_AGENT_PREVIEW_CACHE_BYTES,
+)
+
+
+def preview_key(req: DraftRequest) -> str:
+    """Canonical hash of the request plus every version its preview depends on.
+
+    Editing a brand or invalidating templates changes the key, so stale
+    entries are never served and simply age out of the LRU.
+    """
+    payload = {
+        "req": req.model_dump(mode="json"),
+        "brand": load_brand_bundle(req.brand_id).version,
+        "templates": templates_version(),
+        "label_prefix": settings.MAIL_AGENT_GMAIL_LABEL_PREFIX,
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+async def apreview_key(req: DraftRequest) -> str:
+    """`preview_key` for async callers: a brand not compiled yet loads off the event loop."""
+    if bundle_loaded(req.brand_id):
+        return preview_key(req)
+    return await asyncio.to_thread(preview_key, req)
+
+
+def preview_etag(
+    key: str,
+    fields: Iterable[str] | None = None,
+    since: str | None = None,
+    scope: str = "",
+    delta: bool | None = None,
+) -> str:
+    """Strong ETag of a preview response: `preview_key` plus projection and delta base.
+
+    `delta` tells whether the response is a delta against `since`; by default
+    it is whether `since` is currently held in `delta_bases`. A full answer to
+    an unknown `since` therefore never shares a tag with a delta response.
+    `scope` distinguishes responses that embed more than the preview (e.g. a
+    session revision). Field order does not matter, as in the response.
+    """
+    want, _ = _wanted(fields)
+    if delta is None:
+        delta = since is not None and since in delta_bases
+    tag = f"{key}|{','.join(sorted(want))}|{since or ''}|{'delta' if delta else ''}|{scope}"
+    return '"' + hashlib.sha256(tag.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+# Content previously returned to clients, by hash, so iterations can send deltas
+delta_bases = DeltaBases(
+    max_entries=settings.MAIL_AGENT_DELTA_BASE_ENTRIES,
+    max_bytes=settings.MAIL_AGENT_PREVIEW_CACHE_BYTES,
+)
+
+PREVIEW_FIELDS = ("subject", "html", "text", "plan", "html_len", "word_count", "hash")
+_DEFAULT_FIELDS = ("subject", "html", "text", "plan", "hash")
+
+
+def preview_fields(fields: Iterable[str] | None) -> Tuple[str, ...]:
+    """The projection `fields` selects (defaults when None); ValueError for unknown names."""
+    return _wanted(fields)[0]
+
+
+def _wanted(fields: Iterable[str] | None) -> Tuple[Tuple[str, ...], bool]:
+    want = _DEFAULT_FIELDS if fields is None else tuple(dict.fromkeys(fields))
+    unknown = set(want).difference(PREVIEW_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown preview fields: {', '.join(sorted(unknown))}")
+    return want, "html" in want or "html_len" in want
+
+
+def _complete(
+    req: DraftRequest,
+    key: str,
+    hit: CachedPreview | None,
+    need_html: bool,
+    drafted: Drafted | None = None,
+) -> CachedPreview:
+    """`hit`, or a freshly drafted and rendered preview when it is missing or lacks HTML."""
+    if hit is not None and (hit.html is not None or not need_html):
+        return hit
+    d, cacheable = drafted or _draft(req)
+    html: str | None = None
+    if need_html:
+        html, text = render(req, d)
+    else:
+        text = render_text(req, d)
+    return _store(req, key, d, html, text, cacheable)
+
+
+def _store(
+    req: DraftRequest,
+    key: str,
+    draft: DraftResponse,
+    html: str | None,
+    text: str,
+    cacheable: bool = True,
+) -> CachedPreview:
     plan = dry_run_plan_send(to=req.recipient.email, subject=draft.subject)
-    return {"subject": draft.subject, "html": html, "text": text, "plan": plan}
+    hit = CachedPreview(draft.subject, html, text, plan)
+    if cacheable:
+        preview_cache.put(key, hit)
+    return hit
+
+
+def _remembers(fields: Iterable[str] | None, want: Tuple[str, ...], since: str | None) -> bool:
+    # Only clients that iterate keep a delta base: they ask for `hash` or send `since`.
+    return since is not None or (fields is not None and "hash" in want)
+
+
+def _project(
+    hit: CachedPreview, want: Tuple[str, ...], since: str | None, remember: bool
+) -> Dict[str, Any]:
+    values: Dict[str, Any] = {
+        "subject": hit.subject,
+        "html": hit.html,
+        "text": hit.text,
+        "plan": copy.deepcopy(hit.plan) if "plan" in want else None,
+        "html_len": len(hit.html or ""),
+        "word_count": len(hit.text.split()),
+    }
+    out = {f: values[f] for f in want if f != "hash"}
+    if "hash" not in want and since is None:
+        return out
+
+    content = {f: values[f] for f in CONTENT_FIELDS if f in want}
+    base = delta_bases.get(since) if since is not None else None
+    out["hash"] = content_hash(content)
+    if remember:
+        delta_bases.put(out["hash"], content)
+    if base is not None:
+        for f in content:
+            del out[f]
+        out["base"] = since
+        out["delta"] = diff_content(base, content)
+    return out
+
+
+def preview(
+    req: DraftRequest, fields: Iterable[str] | None = None, since: str | None = None
+) -> Dict[str, Any]:
+    """Subject, HTML, text and dry-run plan for `req`, plus a content `hash`.
+
+    `fields` projects the result onto a subset of `PREVIEW_FIELDS`. The HTML
+    stage (skeleton inlining, serialization) only runs when `html` or
+    `html_len` is requested; text-only entries are completed in the cache
+    the first time a caller needs the HTML.
+
+    `since` is the `hash` of a preview the caller already holds. When that
+    content is still known, subject/text/html are replaced by `base` and a
+    `delta` against it (see `app.mail.delta`); otherwise they are sent in full.
+    Content is only kept as a future base when the caller opts in, by listing
+    `hash` in `fields` or by sending `since`.
+    """
+    want, need_html = _wanted(fields)
+    key = preview_key(req)
+    hit = _complete(req, key, preview_cache.get(key), need_html)
+    return _project(hit, want, since, _remembers(fields, want, since))
+
 
+def _preview_stages(
+    req: DraftRequest,
+    key: str,
+    hit: CachedPreview | None,
+    want: Tuple[str, ...],
+    need_html: bool,
+    since: str | None,
+    remember: bool,
+    drafted: Drafted | None = None,
+) -> Dict[str, Any]:
+    return _project(_complete(req, key, hit, need_html, drafted), want, since, remember)
 
-def deliver(req: DraftRequest, force_action: str | None = None) -> Dict[str, Any]:
-    draft = generate(req)
-    html, text = render(req, draft)
+
+async def apreview(
+    req: DraftRequest,
+    fields: Iterable[str] | None = None,
+    since: str | None = None,
+    *,
+    key: str | None = None,
+) -> Dict[str, Any]:
+    """`preview` for async callers; `key` is `preview_key(req)` if already computed.
+
+    A cache hit that needs no delta is answered on the event loop; drafting,
+    rendering and diffing run on the bounded CPU executor, which raises
+    `Overloaded` when it is saturated. A configured provider chain drafts on
+    the event loop instead, so waiting on the model holds no executor slot.
+    """
+    want, need_html = _wanted(fields)
+    remember = _remembers(fields, want, since)
+    key = key or await apreview_key(req)
+    hit = preview_cache.get(key)
+    usable = hit is not None and (hit.html is not None or not need_html)
+    if since is None and hit is not None and usable:
+        return _project(hit, want, None, remember)
+    drafted: Drafted | None = None
+    chain = get_draft_chain()
+    if chain is not None and not usable:
+        drafted = _model_drafted(*await chain.agenerate_traced(req))
+    return await get_cpu_executor().run(
+        _preview_stages, req, key, hit, want, need_html, since, remember, drafted
+    )
+
+
+def preview_many(
+    reqs: Sequence[DraftRequest], fields: Iterable[str] | None = None
+) -> List[Dict[str, Any] | Exception]:
+    """`preview` for a batch, in input order; a failing item yields its exception instead.
+
+    Cache hits are served as usual; misses are drafted and rendered one by
+    one (through the render engine when configured), sharing the bundle,
+    skeleton and snippet caches like single previews do.
+    """
+    want, need_html = _wanted(fields)
+    out: List[Dict[str, Any] | Exception] = []
+    for req in reqs:
+        try:
+            key = preview_key(req)  # unknown or invalid brands fail here, per item
+            hit = _complete(req, key, preview_cache.get(key), need_html)
+        except Exception as e:
+            out.append(e)
+            continue
+        # Batch results are not iterated on; keep them out of the delta bases.
+        out.append(_project(hit, want, None, remember=False))
+    return out
+
+
+def _message(req: DraftRequest) -> Tuple[str, str, str]:
+    # Delivering what was just previewed reuses the rendered preview.
+    hit = preview_cache.get(preview_key(req))
+    if hit is not None and hit.html is not None:
+        return hit.subject, hit.html, hit.text
+    d, _ = _draft(req)
+    html, text = render(req, d)
+    return d.subject, html, text
+
+
+def _send(
+    req: DraftRequest, message: Tuple[str, str, str], force_action: str | None, **gmail: Any
+) -> Dict[str, Any]:
+    subject, html, text = message
     res = draft_or_send_message(
         to=req.recipient.email,
-        subject=draft.subject,
+        subject=subject,
         html_body=html,
         text_body=text,
         brand_id=req.brand_id,
         force_action=force_action,
+        **gmail,
     )
     res["to"] = req.recipient.email
-    res["subject"] = draft.subject
+    res["subject"] = subject
     return res
 
 
+def deliver(req: DraftRequest, force_action: str | None = None, **gmail: Any) -> Dict[str, Any]:
+    """Draft or send `req`; `gmail` goes to `draft_or_send_message` (e.g. `reuse=`)."""
+    return _send(req, _message(req), force_action, **gmail)
+
+
+async def adeliver(req: DraftRequest, force_action: str | None = None) -> Dict[str, Any]:
+    """`deliver` for async callers: rendering on the CPU executor, Gmail on a plain thread.
+
+    The Gmail client is blocking I/O, so it waits in the event loop's default
+    thread pool rather than holding a CPU slot.
+    """
+    message = await get_cpu_executor().run(_message, req)
+    return await asyncio.to_thread(_send, req, message, force_action)
+
+
 def _apply_subject_and_tone(data: dict[str, Any], ctx: dict[str, Any]) -> dict[str, Any]:
     # Subject override
     subj = str(ctx.get("subject") or "").strip()
@@ -100,4 +487,11 @@ def _apply_subject_and_tone(data: dict[str, Any], ctx: dict[str, Any]) -> dict[s
 This module wires the simple `DraftAgent` to the template renderer and Gmail
 operations. The functions here remain small on purpose so they can be reused
 directly by CLIs, APIs, or other agents.
+
+Previews are memoized in `preview_cache`, keyed by `preview_key` (request hash
+plus brand and template versions), so identical requests skip drafting and
+rendering entirely.
+
+`apreview`/`adeliver` are the async variants used by the API: CPU stages run
+on the bounded executor in `app.mail.executor`, Gmail calls on a thread.
 """
@@ -0,0 +1,231 @@
+from __future__ import annotations
+from bisect import bisect_left
+from functools import wraps
+from types import TracebackType
+from typing import Any, Callable, Dict, Iterable, List, Tuple, TypeVar
+import threading
+import time
+
+from app.config.settings import settings
+
+F = TypeVar("F", bound=Callable[..., Any])
+Labels = Tuple[Tuple[str, str], ...]
+
+# Upper bounds in seconds: sub-millisecond template work up to slow Gmail round trips
+BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)  # fmt: skip
+# Counters from the caches' `stats()`; every other stats field is exported as a gauge
+_MONOTONIC = {"hits", "misses", "evictions", "expirations", "completed", "rejected"}
+
+
+class _Shard:
+    """One thread's metrics; only that thread ever writes to it."""
+
+    __slots__ = ("hist", "counters")
+
+    def __init__(self) -> None:
+        # stage -> per-bucket counts (last slot is +Inf), then the sum of seconds
+        self.hist: Dict[str, List[float]] = {}
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+
+
+class Registry:
+    """Stage histograms and labelled counters, sharded per thread.
+
+    Recording touches only the calling thread's shard, so the hot path takes
+    no lock and threads never contend; a scrape sums every shard. The only
+    lock is taken once per thread, when its shard is created. Shards of
+    finished threads are kept so counters never go backwards.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard  # type: ignore[no-any-return]
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def observe(self, stage: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        hist = self._shard().hist
+        h = hist.get(stage)
+        if h is None:
+            h = hist[stage] = [0.0] * (len(BUCKETS) + 2)
+        h[bisect_left(BUCKETS, seconds)] += 1
+        h[-1] += seconds
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        if not self.enabled:
+            return
+        counters = self._shard().counters
+        key = (name, tuple(sorted(labels.items())))
+        counters[key] = counters.get(key, 0) + value
+
+    def timer(self, stage: str) -> "_Timer":
+        """Context manager recording the block's wall time (and errors) under `stage`."""
+        return _Timer(self, stage)
+
+    def timed(self, stage: str) -> Callable[[F], F]:
+        """Decorator form of `timer`; a no-op when metrics are disabled at import time."""
+
+        def decorate(fn: F) -> F:
+            if not self.enabled:
+                return fn
+
+            @wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                except Exception as e:
+                    self.inc("errors", stage=stage, type=type(e).__name__)
+                    raise
+                finally:
+                    self.observe(stage, time.perf_counter() - t0)
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorate
+
+    def snapshot(self) -> Tuple[Dict[str, List[float]], Dict[Tuple[str, Labels], float]]:
+        """Histograms and counters summed over all shards."""
+        with self._lock:
+            shards = list(self._shards)
+        hist: Dict[str, List[float]] = {}
+        counters: Dict[Tuple[str, Labels], float] = {}
+        for shard in shards:
+            # Copies are atomic under the GIL; a histogram may lag its sum by one sample.
+            for stage, h in list(shard.hist.items()):
+                total = hist.setdefault(stage, [0.0] * len(h))
+                for i, v in enumerate(list(h)):
+                    total[i] += v
+            for key, v in list(shard.counters.items()):
+                counters[key] = counters.get(key, 0) + v
+        return hist, counters
+
+    def reset(self) -> None:
+        with self._lock:
+            for shard in self._shards:
+                shard.hist.clear()
+                shard.counters.clear()
+
+
+class _Timer:
+    __slots__ = ("registry", "stage", "t0")
+
+    def __init__(self, registry: Registry, stage: str) -> None:
+        self.registry = registry
+        self.stage = stage
+        self.t0 = 0.0
+
+    def __enter__(self) -> None:
+        self.t0 = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.registry.observe(self.stage, time.perf_counter() - self.t0)
+        if exc_type is not None and issubclass(exc_type, Exception):
+            self.registry.inc("errors", stage=self.stage, type=exc_type.__name__)
+
+
+metrics = Registry(enabled=settings.MAIL_AGENT_METRICS)
+
+
+def _num(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}" if body else ""
+
+
+def _component_stats() -> Dict[str, Dict[str, int]]:
+    """`stats()` of the caches and pools, skipping singletons not created yet."""
+    from app.agents.interpret import interpret_cache
+    from app.mail import executor, jobs, sessions
+    from app.mail.workflow import delta_bases, preview_cache
+    from app.templating.brand_bundle import bundle_cache
+    from app.templating.render import snippet_cache
+
+    out = {
+        "cache_preview": preview_cache.stats(),
+        "cache_delta_bases": delta_bases.stats(),
+        "cache_interpret": interpret_cache.stats(),
+        "cache_snippet": snippet_cache.stats(),
+        "cache_brand_bundle": bundle_cache.stats(),
+    }
+    if executor._executor is not None:
+        out["cpu_executor"] = executor._executor.stats()
+    if sessions._store is not None:
+        out["sessions"] = sessions._store.stats()
+    if jobs._jobs is not None:
+        out["delivery_jobs"] = jobs._jobs.stats()
+    return out
+
+
+def render_prometheus(registry: Registry = metrics) -> str:
+    """Prometheus text exposition (format 0.0.4) of `registry` plus component stats."""
+    hist, counters = registry.snapshot()
+    lines: List[str] = []
+    if hist:
+        name = "mail_agent_stage_seconds"
+        lines += [f"# HELP {name} Wall time per pipeline stage.", f"# TYPE {name} histogram"]
+        for stage in sorted(hist):
+            h = hist[stage]
+            cumulative = 0.0
+            for bound, count in zip((*map(repr, BUCKETS), "+Inf"), h[:-1], strict=True):
+                cumulative += count
+                le = _labels((("stage", stage), ("le", bound)))
+                lines.append(f"{name}_bucket{le} {_num(cumulative)}")
+            lines.append(f"{name}_sum{_labels([('stage', stage)])} {_num(h[-1])}")
+            lines.append(f"{name}_count{_labels([('stage', stage)])} {_num(cumulative)}")
+
+    by_name: Dict[str, List[Tuple[Labels, float]]] = {}
+    for (cname, labels), v in counters.items():
+        by_name.setdefault(cname, []).append((labels, v))
+    for cname in sorted(by_name):
+        name = f"mail_agent_{cname}_total"
+        lines.append(f"# TYPE {name} counter")
+        for labels, v in sorted(by_name[cname]):
+            lines.append(f"{name}{_labels(labels)} {_num(v)}")
+
+    for component, stats in _component_stats().items():
+        for key in sorted(stats):
+            monotonic = key in _MONOTONIC
+            name = f"mail_agent_{component}_{key}" + ("_total" if monotonic else "")
+            lines.append(f"# TYPE {name} {'counter' if monotonic else 'gauge'}")
+            lines.append(f"{name} {_num(stats[key])}")
+    return "\n".join(lines) + "\n"
+"""Low-overhead metrics for the preview and delivery pipeline (`GET /metrics`).
+
+Each stage (`DraftAgent.draft`, Jinja render, `inline_css`, `to_plain_text`,
+MIME composition, label lookup and the Gmail calls) records its wall time in
+a histogram via `metrics.timed(...)`/`metrics.timer(...)`, plus an error
+counter by exception type. The workflow adds rendered bytes. Cache, executor,
+session and job counters are read from their existing `stats()` at scrape
+time rather than counted again on the hot path.
+
+`MAIL_AGENT_METRICS=false` turns recording off: decorated functions are left
+unwrapped and `/metrics` answers 404. Stages that run inside render-engine
+worker processes are not visible here; `render` covers them as a whole.
+"""
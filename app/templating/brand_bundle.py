@@ -0,0 +1,207 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Collection, Iterable, Optional, Tuple
+import hashlib
+import os
+import threading
+
+from jinja2 import Environment, Template, meta
+from pydantic import BaseModel
+
+from app.config.settings import settings
+from app.tools.brand_index import BrandIndex, open_brand_index
+from app.tools.brand_loader import BrandConfig, load_brand
+from app.templating.env import shared_env
+
+
+class BrandAttrs(SimpleNamespace):
+    """Read-only attribute snapshot of a brand, cheap for Jinja to traverse."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("brand snapshot is read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("brand snapshot is read-only")
+
+
+def _snapshot(model: BaseModel) -> BrandAttrs:
+    # Nested models become nested snapshots; dict fields (e.g. links) stay dicts
+    # so templates can keep using either `links.website` or `links['website']`.
+    fields: dict[str, Any] = {}
+    for name in type(model).model_fields:
+        v = getattr(model, name)
+        fields[name] = _snapshot(v) if isinstance(v, BaseModel) else v
+    return BrandAttrs(**fields)
+
+
+@dataclass(frozen=True)
+class BrandBundle:
+    """Render-ready view of a brand: snippets compiled, defaults resolved."""
+
+    brand_id: str
+    config: BrandConfig
+    attrs: BrandAttrs
+    version: str
+    default_cta_url: str
+    footer: Optional[Template]
+    signature: Optional[Template]
+    # Variables each snippet reads, so renders can be memoized on just those
+    footer_vars: frozenset[str] = frozenset()
+    signature_vars: frozenset[str] = frozenset()
+
+
+def brand_version(cfg: BrandConfig) -> str:
+    """Content hash of the validated config; changes whenever the brand does."""
+    return hashlib.sha256(cfg.model_dump_json().encode("utf-8")).hexdigest()[:16]
+
+
+def _snippet_vars(env: Environment, source: str | None) -> frozenset[str]:
+    if not source:
+        return frozenset()
+    return frozenset(meta.find_undeclared_variables(env.parse(source)))
+
+
+def build_brand_bundle(brand_id: str, cfg: BrandConfig) -> BrandBundle:
+    env = shared_env()
+    return BrandBundle(
+        brand_id=brand_id,
+        config=cfg,
+        attrs=_snapshot(cfg),
+        version=brand_version(cfg),
+        default_cta_url=cfg.links.get("website") or "#",
+        footer=env.from_string(cfg.footer_html) if cfg.footer_html else None,
+        signature=env.from_string(cfg.signature_html) if cfg.signature_html else None,
+        footer_vars=_snippet_vars(env, cfg.footer_html),
+        signature_vars=_snippet_vars(env, cfg.signature_html),
+    )
+
+
+def _bundle_cost(bundle: BrandBundle) -> int:
+    # Rough resident size: measured ~10KB for a typical brand with two snippets.
+    snippets = (bundle.footer is not None) + (bundle.signature is not None)
+    return 4096 + 3072 * snippets + 4 * len(bundle.config.model_dump_json())
+
+
+class BundleCache:
+    """LRU of compiled bundles bounded by approximate memory, with counters."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._data: OrderedDict[Tuple[str, str], Tuple[BrandBundle, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key: Tuple[str, str], load: Callable[[], BrandBundle]) -> BrandBundle:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        bundle = load()
+        cost = _bundle_cost(bundle)
+        with self._lock:
+            if key in self._data:  # loaded concurrently; keep the first one
+                return self._data[key][0]
+            self._data[key] = (bundle, cost)
+            self._bytes += cost
+            while self._bytes > self.max_bytes and len(self._data) > 1:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+        return bundle
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __contains__(self, key: object) -> bool:
+        # A peek: neither counts as a hit nor refreshes the entry.
+        with self._lock:
+            return key in self._data
+
+    def discard(self, brand_ids: Collection[str]) -> None:
+        """Drop the bundles of `brand_ids` (from any base dir), keeping the rest."""
+        with self._lock:
+            for key in [k for k in self._data if k[0] in brand_ids]:
+                self._bytes -= self._data.pop(key)[1]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+bundle_cache = BundleCache(max_bytes=settings.MAIL_AGENT_BRAND_CACHE_BYTES)
+
+
+def _index_is_current(index: BrandIndex, brand_file: Path) -> bool:
+    # brand.json edited (or re-initialized) since the build wins over the index;
+    # a deleted one is gone. Without any brands/ tree (an index-only
+    # deployment) the index is authoritative.
+    try:
+        return os.stat(brand_file).st_mtime_ns <= index.mtime_ns
+    except FileNotFoundError:
+        return not brand_file.parent.parent.is_dir()
+
+
+def _load_config(brand_id: str, base_dir: str | Path) -> BrandConfig:
+    # The packed index covers the default brands tree; anything it does not
+    # hold (e.g. a brand added since the last build) loads from its folder.
+    if str(base_dir) == "brands":
+        index = open_brand_index()
+        if index is not None and _index_is_current(index, Path(base_dir) / brand_id / "brand.json"):
+            cfg = index.get(brand_id)
+            if cfg is not None:
+                return cfg
+    return load_brand(brand_id, base_dir)
+
+
+def load_brand_bundle(brand_id: str, base_dir: str | Path = "brands") -> BrandBundle:
+    return bundle_cache.get_or_load(
+        (brand_id, str(base_dir)),
+        lambda: build_brand_bundle(brand_id, _load_config(brand_id, base_dir)),
+    )
+
+
+def bundle_loaded(brand_id: str, base_dir: str | Path = "brands") -> bool:
+    """Whether `load_brand_bundle` would answer from memory (no disk, parse or compile)."""
+    return (brand_id, str(base_dir)) in bundle_cache
+
+
+def invalidate_brand_bundles(brand_ids: Iterable[str] | None = None) -> None:
+    """Forget loaded brands and their compiled bundles (e.g. after editing brand.json).
+
+    With `brand_ids`, only those bundles are dropped. `load_brand` cannot
+    evict single entries, so its parsed configs are always cleared; that only
+    costs a re-read for brands whose bundle is gone too.
+    """
+    load_brand.cache_clear()
+    if brand_ids is None:
+        bundle_cache.clear()
+    else:
+        bundle_cache.discard(frozenset(brand_ids))
+"""Precompiled per-brand render bundles.
+
+`load_brand_bundle` wraps `load_brand` (or the packed brand index, when one
+has been built) and compiles the brand's footer and signature snippets once,
+resolves the default CTA URL from `brand.links`, and exposes a read-only
+attribute snapshot for templates, so the render path only calls precompiled
+templates. Bundles live in `bundle_cache`, bounded by approximate memory
+(`MAIL_AGENT_BRAND_CACHE_BYTES`) rather than a fixed count.
+"""
@@ -1,7 +1,25 @@
 from __future__ import annotations
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import (
+    BaseLoader,
+    BytecodeCache,
+    ChoiceLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    ModuleLoader,
+    select_autoescape,
+)
+
+from app.config.settings import settings
+from app.metrics import metrics
+
+TEMPLATES_ROOT = "templates/jinja"
+
+# Bumped on every explicit invalidation so downstream caches can key on it.
+_templates_version = 0
 
 
 def _paragraphize(text: str) -> str:
@@ -10,24 +28,118 @@ def _paragraphize(text: str) -> str:
     return "".join(f"<p>{p.replace('\n', '<br/>')}</p>" for p in parts) or ""
 
 
-def jinja_env(templates_root: str | Path = "templates/jinja") -> Environment:
+@lru_cache(maxsize=256)
+def _html_text(html: str) -> str:
+    """Text of an HTML fragment, one text node per line (BeautifulSoup semantics)."""
+    if "<" not in html and "&" not in html:
+        return str(html)
+    from bs4 import BeautifulSoup
+
+    txt: str = BeautifulSoup(html, "lxml").get_text(separator="\n", strip=True)
+    return txt
+
+
+def jinja_env(
+    templates_root: str | Path = TEMPLATES_ROOT,
+    *,
+    bytecode_cache: BytecodeCache | None = None,
+    auto_reload: bool = True,
+    compiled: str | Path | None = None,
+) -> Environment:
+    loader: BaseLoader = FileSystemLoader(str(templates_root))
+    if compiled is not None:
+        # Precompiled modules first; anything missing from the artifact still
+        # loads (and compiles) from source.
+        loader = ChoiceLoader([ModuleLoader(str(compiled)), loader])
     env = Environment(
-        loader=FileSystemLoader(str(templates_root)),
+        loader=loader,
         autoescape=select_autoescape(enabled_extensions=("html", "xml")),
         trim_blocks=True,
         lstrip_blocks=True,
+        bytecode_cache=bytecode_cache,
+        auto_reload=auto_reload,
+        # Never evict: the template set is small and fixed per deployment.
+        cache_size=-1,
     )
     env.filters["paragraphize"] = _paragraphize
+    env.filters["html_text"] = _html_text
     return env
 
 
+@lru_cache(maxsize=8)
+def shared_env(templates_root: str = TEMPLATES_ROOT) -> Environment:
+    """Process-wide production environment.
+
+    Compiled templates stay in memory until `invalidate_templates()` is called
+    (no per-render mtime checks). When `MAIL_AGENT_JINJA_BYTECODE_DIR` is set,
+    compiled bytecode is also persisted there so new processes skip compilation.
+    When an up-to-date ahead-of-time artifact exists at
+    `MAIL_AGENT_TEMPLATES_COMPILED` (see `cli.py templates-compile`), templates
+    are imported from it instead of being compiled.
+    """
+    bcc: BytecodeCache | None = None
+    if settings.MAIL_AGENT_JINJA_BYTECODE_DIR:
+        cache_dir = Path(settings.MAIL_AGENT_JINJA_BYTECODE_DIR)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        bcc = FileSystemBytecodeCache(str(cache_dir))
+    compiled = _compiled_artifact(templates_root)
+    return jinja_env(templates_root, bytecode_cache=bcc, auto_reload=False, compiled=compiled)
+
+
+def _compiled_artifact(templates_root: str | Path) -> Path | None:
+    # The artifact only covers the default tree, and is ignored once any source
+    # template is newer than it so an edited template never renders stale.
+    if not settings.MAIL_AGENT_TEMPLATES_COMPILED or str(templates_root) != TEMPLATES_ROOT:
+        return None
+    artifact = Path(settings.MAIL_AGENT_TEMPLATES_COMPILED)
+    if not artifact.exists():
+        return None
+    built = artifact.stat().st_mtime
+    if any(p.stat().st_mtime > built for p in Path(templates_root).rglob("*") if p.is_file()):
+        return None
+    return artifact
+
+
+def compile_templates(
+    target: str | Path, templates_root: str | Path = TEMPLATES_ROOT, *, zip: bool = True
+) -> list[str]:
+    """Compile every template under `templates_root` to importable Python modules.
+
+    Writes a deflated zip (or a directory when `zip=False`) loadable by
+    `jinja2.ModuleLoader`; returns the template names compiled.
+    """
+    env = jinja_env(templates_root)
+    Path(target).parent.mkdir(parents=True, exist_ok=True)
+    env.compile_templates(str(target), zip="deflated" if zip else None, ignore_errors=False)
+    return env.list_templates()
+
+
+def templates_version() -> int:
+    return _templates_version
+
+
+def invalidate_templates(*, clear_bytecode: bool = False) -> None:
+    """Drop compiled templates so the next render re-reads them from disk."""
+    global _templates_version
+    if clear_bytecode and settings.MAIL_AGENT_JINJA_BYTECODE_DIR:
+        FileSystemBytecodeCache(settings.MAIL_AGENT_JINJA_BYTECODE_DIR).clear()
+    shared_env.cache_clear()
+    _templates_version += 1
+
+
+@metrics.timed("jinja_render")
 def render_template(template_path: str, context: Dict[str, Any]) -> str:
-    env = jinja_env()
-    tpl = env.get_template(template_path)
+    tpl = shared_env().get_template(template_path)
     return tpl.render(**context)
 """Jinja2 environment helpers.
 
 Provides a small set of helpers for rendering HTML emails using Jinja2,
 including a `paragraphize` filter that turns newline-separated text into
-HTML paragraphs and <br/> line breaks.
+HTML paragraphs and <br/> line breaks, and an `html_text` filter used by the
+plaintext templates to reduce HTML snippets (e.g. brand footers) to text.
+
+`shared_env()` is the process-wide environment used on the render path; it
+keeps compiled templates (and optionally on-disk bytecode) until
+`invalidate_templates()` is called. `compile_templates()` builds the
+ahead-of-time artifact that `shared_env()` prefers when it is present.
 """
@@ -2,19 +2,33 @@
 
 Renders a purpose-aware, brand-themed email using Jinja templates, then:
 - Inlines CSS for better client compatibility.
-- Derives a readable plaintext version for previews.
+- Derives a readable plaintext version for previews, rendered directly from the
+  same context via a parallel text template (HTML parsing is only a fallback).
 The renderer also supports a long-form intro that adapts to the requested tone.
 """
 # mypy: disable-error-code=import-untyped
 from __future__ import annotations
-from typing import Any
-from typing import Dict, Tuple, cast
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Hashable, Iterable, TypeVar
+from typing import Dict, Iterator, NamedTuple, Tuple, cast
+import json
+import re
+import threading
 
-from bs4 import BeautifulSoup
-from premailer import transform
+from jinja2 import Template
 
-from app.tools.brand_loader import load_brand
-from app.templating.env import render_template, jinja_env
+from app.config.settings import settings
+from app.metrics import metrics
+from app.templating.brand_bundle import BrandBundle, load_brand_bundle
+from app.templating.env import render_template, shared_env, templates_version
+from app.tools.brand_loader import BrandNotFound
+
+GENERIC_TEMPLATE = "families/generic/generic_v1.html.j2"
+GENERIC_TEXT_TEMPLATE = "families/generic/generic_v1.txt.j2"
+# Fields holding markup/entities only an HTML parse can reduce to text
+_NEEDS_PARSE = re.compile(r"[<&\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
 
 
 def _clean_context_for_render(ctx: dict[str, Any] | None) -> dict[str, Any]:
@@ -30,43 +44,270 @@ def derive_preheader(plain_text: str, limit: int = 90) -> str:
     return s[:limit]
 
 
+@metrics.timed("to_plain_text")
 def to_plain_text(html: str) -> str:
     """Extract a readable plaintext version preserving paragraphs.
 
     Uses a newline separator so lists and paragraphs are easier to read
     in chat UIs and plain-text previews.
     """
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, "lxml")
     txt: str = soup.get_text(separator="\n", strip=True)
+    return _collapse_lines(txt)
+
+
+def _collapse_lines(txt: str) -> str:
     # Collapse multiple blank lines and trim whitespace
     lines = [line.strip() for line in txt.splitlines() if line.strip()]
     return "\n".join(lines)
 
 
+def render_plain_text(context: Dict[str, Any]) -> str | None:
+    """Render the plaintext part straight from the render context.
+
+    Produces the same output as `to_plain_text` over the rendered HTML without
+    parsing the document. Returns None when a field carries markup or entities,
+    in which case callers should fall back to `to_plain_text`.
+    """
+    brand = context["brand"]
+    fields = (
+        context["subject"],
+        context["body_text"],
+        context["cta_text"] or "",
+        "" if brand.logo_url else brand.name,
+    )
+    if any(_NEEDS_PARSE.search(str(f)) for f in fields):
+        return None
+    # The preheader sits in a <meta> attribute; a quote or bracket can break
+    # out of it and put text into the parsed document.
+    if not _ATTR_SAFE.match(str(context["preheader"])):
+        return None
+    return _collapse_lines(render_template(GENERIC_TEXT_TEMPLATE, context))
+
+
+@metrics.timed("inline_css")
 def inline_css(html: str) -> str:
+    # Imported on first use: premailer (with lxml/cssutils) dominates import time.
+    from premailer import transform
+
     # premailer returns Any to mypy; cast to str for our contract
     return cast(str, transform(html, disable_validation=True))
 
 
-def render_generic_email(
+# ---------- Pre-inlined skeletons and fragments ----------
+# Premailer re-parses and re-serializes the whole document with lxml. The
+# chrome (header, card, button) only depends on the brand, so it is inlined
+# once with slot markers in place of per-message values; messages are then
+# spliced into the inlined skeleton. The document is treated as fragments,
+# each cached on its own inputs so an iteration only recomputes what changed:
+#   header/chrome  brand + template version + purpose + CTA presence
+#   body           body text
+#   button         CTA text/url (spliced verbatim)
+#   footer         rendered footer snippet (inlined once per distinct footer)
+# Values are only spliced when lxml would serialize them unchanged; anything
+# else takes the full Premailer path.
+_SLOT = "__mail_agent_slot_{}__"
+_SLOT_RE = re.compile(r"__mail_agent_slot_(\w+?)__")
+_TEXT_SAFE = re.compile(r"[^<>&\r\x00-\x08\x0b\x0c\x0e-\x1f\x7f]*\Z")
+_ATTR_SAFE = re.compile(r"[^<>&\"\r\n\t\x00-\x1f\x7f]*\Z")
+# Characters libxml2 never URI-escapes when serializing href attributes
+_URL_SAFE = re.compile(r"[A-Za-z0-9\-_.!~*'()@/:=?;#%,+]*\Z")
+_BLANK_LINE = re.compile(r"\n[ \t]+(?=\n)")
+
+T = TypeVar("T")
+
+
+class FragmentCache:
+    """Small thread-safe LRU for rendered fragments, with hit/miss counters."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key: Hashable, render: Callable[[], T]) -> T:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return cast(T, self._data[key])
+            self.misses += 1
+        value = render()
+        with self._lock:
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+snippet_cache = FragmentCache(maxsize=1024)
+
+
+def _render_snippet(
+    bundle: BrandBundle,
+    name: str,
+    tpl: Template,
+    used: frozenset[str],
+    kwargs: Dict[str, Any],
+) -> str:
+    """Render a brand snippet, memoized on the variables it actually reads."""
+    inputs = {k: kwargs[k] for k in sorted(used) if k in kwargs and k != "brand"}
+    key = (bundle.brand_id, bundle.version, name, json.dumps(inputs, default=repr))
+    return snippet_cache.get_or_render(key, lambda: tpl.render(**kwargs))
+
+
+@lru_cache(maxsize=1024)
+def _body_html(body_text: str) -> str | None:
+    """`paragraphize` output as lxml serializes it, or None when not predictable."""
+    if not _TEXT_SAFE.match(body_text) or _BLANK_LINE.search(body_text):
+        return None
+    parts = [p.strip() for p in body_text.split("\n\n") if p.strip()]
+    return "".join(f"<p>{p.replace('\n', '<br>')}</p>" for p in parts)
+
+
+def _slot_values(context: Dict[str, Any]) -> Dict[str, str] | None:
+    subject = str(context["subject"])
+    preheader = str(context["preheader"])
+    cta_text = str(context["cta_text"] or "")
+    cta_url = str(context["cta_url"] or "")
+    body = _body_html(str(context["body_text"]))
+    if (
+        body is None
+        or not _TEXT_SAFE.match(subject)
+        or not _TEXT_SAFE.match(cta_text)
+        or not _ATTR_SAFE.match(preheader)
+        or not _URL_SAFE.match(cta_url)
+    ):
+        return None
+    return {
+        "subject": subject,
+        "preheader": preheader,
+        "body": body,
+        "cta_text": cta_text,
+        "cta_url": cta_url,
+    }
+
+
+def _skeleton_html(
+    brand_id: str,
+    purpose: str,
+    has_cta: bool,
+    footer_html: str | None,
+    signature_html: str | None,
+) -> str:
+    bundle = load_brand_bundle(brand_id)
+    context = {
+        "brand": bundle.attrs,
+        "subject": _SLOT.format("subject"),
+        "preheader": _SLOT.format("preheader"),
+        "body_text": _SLOT.format("body"),
+        "cta_text": _SLOT.format("cta_text") if has_cta else "",
+        "cta_url": _SLOT.format("cta_url") if has_cta else "",
+        "purpose": purpose,
+        "footer_html": footer_html,
+        "signature_html": signature_html,
+    }
+    html = inline_css(render_template(GENERIC_TEMPLATE, context))
+    body = _SLOT.format("body")
+    return html.replace(f"<p>{body}</p>", body)
+
+
+@lru_cache(maxsize=256)
+def _inlined_skeleton(
+    brand_id: str,
+    brand_version: str,
+    tpl_version: int,
+    purpose: str,
+    has_cta: bool,
+    signature_html: str | None,
+) -> Tuple[str, ...]:
+    """Inline the template chrome once; returns literals interleaved with slot names."""
+    html = _skeleton_html(brand_id, purpose, has_cta, _SLOT.format("footer"), signature_html)
+    return tuple(_SLOT_RE.split(html))
+
+
+@lru_cache(maxsize=512)
+def _inlined_footer(
+    brand_id: str,
+    brand_version: str,
+    tpl_version: int,
+    purpose: str,
+    footer_html: str | None,
+    signature_html: str | None,
+) -> str | None:
+    """The footer fragment exactly as it appears in the inlined document.
+
+    Inlines a document holding the real footer and cuts out the region between
+    the skeleton literals around the footer slot. Returns None when the footer
+    markup spills outside its slot (e.g. unclosed tags), forcing the full path.
+    """
+    parts = _inlined_skeleton(brand_id, brand_version, tpl_version, purpose, False, signature_html)
+    idx = parts.index("footer", 1)
+    marked = [p if i % 2 == 0 else _SLOT.format(p) for i, p in enumerate(parts)]
+    prefix, suffix = "".join(marked[:idx]), "".join(marked[idx + 1 :])
+    html = _skeleton_html(brand_id, purpose, False, footer_html, signature_html)
+    if not (html.startswith(prefix) and html.endswith(suffix)):
+        return None
+    return html[len(prefix) : len(html) - len(suffix)]
+
+
+def _render_inlined(bundle: BrandBundle, context: Dict[str, Any], tpl_version: int) -> str:
+    values = _slot_values(context) if settings.MAIL_AGENT_INLINE_MODE == "skeleton" else None
+    footer = None
+    if values is not None:
+        footer = _inlined_footer(
+            bundle.brand_id,
+            bundle.version,
+            tpl_version,
+            str(context["purpose"]),
+            context["footer_html"],
+            context["signature_html"],
+        )
+    if values is None or footer is None:
+        return inline_css(render_template(GENERIC_TEMPLATE, context))
+    values["footer"] = footer
+    parts = list(
+        _inlined_skeleton(
+            bundle.brand_id,
+            bundle.version,
+            tpl_version,
+            str(context["purpose"]),
+            bool(context["cta_text"] and context["cta_url"]),
+            context["signature_html"],
+        )
+    )
+    for i in range(1, len(parts), 2):
+        parts[i] = values[parts[i]]
+    return "".join(parts)
+
+
+def build_render_context(
+    bundle: BrandBundle,
     *,
     subject: str,
     body_text: str,
-    brand_id: str = "default",
     purpose: str = "generic",
     variables: Dict[str, Any] | None = None,
-) -> Tuple[str, str]:
-    """
-    Render the generic_v1 Jinja template with a brand and content variables.
-    Returns (html_inlined, plaintext).
-    """
-    brand = load_brand(brand_id)
+) -> Dict[str, Any]:
+    """Resolve subject, preheader, CTA, long-form intro and brand snippets for one message."""
+    brand = bundle.attrs
     vars = variables or {}
     if vars.get("subject"):
         subject = str(vars["subject"])
     preheader = vars.get("preheader") or derive_preheader(body_text)
     cta_text = vars.get("cta_text") or "Learn more"
-    cta_url = vars.get("cta_url") or brand.links.get("website") or "#"
+    cta_url = vars.get("cta_url") or bundle.default_cta_url
 
     # Optional long-form intro
     if vars.get("long_form") or vars.get("tone"):
@@ -107,18 +348,21 @@ def render_generic_email(
         # Use the long-form intro as the body to avoid duplicating the baseline content.
         body_text = intro
 
-    # Re-render dynamic footer/signature strings as Jinja templates
-    env = jinja_env()
+    # Footer/signature are brand snippets precompiled once per brand and
+    # re-rendered only when a variable they read changes
     footer_html = brand.footer_html
     signature_html = brand.signature_html
     cleaned_vars = {k: v for k, v in (vars or {}).items() if k != "subject"}
-    if footer_html:
-        footer_html = env.from_string(footer_html).render(
-            brand=brand, subject=subject, body_text=body_text, purpose=purpose, **cleaned_vars
+    snippet_vars = dict(
+        cleaned_vars, brand=brand, subject=subject, body_text=body_text, purpose=purpose
+    )
+    if bundle.footer is not None:
+        footer_html = _render_snippet(
+            bundle, "footer", bundle.footer, bundle.footer_vars, snippet_vars
         )
-    if signature_html:
-        signature_html = env.from_string(signature_html).render(
-            brand=brand, subject=subject, body_text=body_text, purpose=purpose, **cleaned_vars
+    if bundle.signature is not None:
+        signature_html = _render_snippet(
+            bundle, "signature", bundle.signature, bundle.signature_vars, snippet_vars
         )
 
     context = {
@@ -132,7 +376,118 @@ def render_generic_email(
         "footer_html": footer_html,
         "signature_html": signature_html,
     }
-    raw_html = render_template("families/generic/generic_v1.html.j2", context)
-    html = inline_css(raw_html)
-    text = to_plain_text(html)
+    return context
+
+
+def _render_context(
+    bundle: BrandBundle, context: Dict[str, Any], tpl_version: int
+) -> Tuple[str, str]:
+    html = _render_inlined(bundle, context, tpl_version)
+    text = render_plain_text(context)
+    if text is None:
+        text = to_plain_text(html)
     return html, text
+
+
+def render_generic_email(
+    *,
+    subject: str,
+    body_text: str,
+    brand_id: str = "default",
+    purpose: str = "generic",
+    variables: Dict[str, Any] | None = None,
+) -> Tuple[str, str]:
+    """
+    Render the generic_v1 Jinja template with a brand and content variables.
+    Returns (html_inlined, plaintext).
+    """
+    bundle = load_brand_bundle(brand_id)
+    context = build_render_context(
+        bundle, subject=subject, body_text=body_text, purpose=purpose, variables=variables
+    )
+    return _render_context(bundle, context, templates_version())
+
+
+def render_generic_text(
+    *,
+    subject: str,
+    body_text: str,
+    brand_id: str = "default",
+    purpose: str = "generic",
+    variables: Dict[str, Any] | None = None,
+) -> str:
+    """
+    Plaintext part only, identical to the text returned by `render_generic_email`.
+    The HTML document is only rendered when the text cannot be produced without it.
+    """
+    bundle = load_brand_bundle(brand_id)
+    context = build_render_context(
+        bundle, subject=subject, body_text=body_text, purpose=purpose, variables=variables
+    )
+    text = render_plain_text(context)
+    if text is None:
+        text = to_plain_text(_render_inlined(bundle, context, templates_version()))
+    return text
+
+
+class RenderItem(NamedTuple):
+    """One message for `render_generic_email_many`; None fields use the call defaults."""
+
+    subject: str
+    body_text: str
+    variables: Dict[str, Any] | None = None
+    brand_id: str | None = None
+    purpose: str | None = None
+
+
+def render_generic_email_many(
+    items: Iterable[RenderItem | Tuple[str, str, Dict[str, Any] | None]],
+    *,
+    brand_id: str = "default",
+    purpose: str = "generic",
+) -> Iterator[Tuple[str, str]]:
+    """
+    Render many messages, yielding (html_inlined, plaintext) lazily in input order.
+
+    Items are pulled one at a time, so memory stays flat however large the
+    campaign. Each message renders exactly as `render_generic_email` would;
+    the batch only skips the per-call brand and template-version lookups.
+    """
+    bundles: Dict[str, BrandBundle] = {}
+    tpl_version = templates_version()
+    for raw in items:
+        item = raw if isinstance(raw, RenderItem) else RenderItem(*raw)
+        bid = item.brand_id or brand_id
+        bundle = bundles.get(bid)
+        if bundle is None:
+            bundle = bundles[bid] = load_brand_bundle(bid)
+        context = build_render_context(
+            bundle,
+            subject=item.subject,
+            body_text=item.body_text,
+            purpose=item.purpose or purpose,
+            variables=item.variables,
+        )
+        yield _render_context(bundle, context, tpl_version)
+
+
+def warm_brands(brand_ids: Iterable[str], brands_dir: str | Path = "brands") -> None:
+    """Compile the bundles of `brand_ids`; invalid or deleted brands are skipped."""
+    for brand_id in brand_ids:
+        try:
+            load_brand_bundle(brand_id, brands_dir)
+        except (ValueError, BrandNotFound):
+            continue  # invalid or removed brands fail on use, exactly as without warm-up
+
+
+def warm_up(brands_dir: str | Path = "brands") -> None:
+    """Load templates, the default brand and the inliner ahead of the first request.
+
+    Other brands compile on first use: start-up stays constant however many
+    tenants `brands/` holds.
+    """
+    env = shared_env()
+    env.get_template(GENERIC_TEMPLATE)
+    env.get_template(GENERIC_TEXT_TEMPLATE)
+    warm_brands([settings.MAIL_AGENT_BRAND_ID], brands_dir)
+    inline_css("<html><body><p>warm</p></body></html>")
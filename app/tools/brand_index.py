@@ -0,0 +1,175 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Iterator, List, Tuple
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+
+from app.config.settings import settings
+from app.tools.brand_loader import BrandConfig, load_brand
+
+MAGIC = b"MABIDX01"
+_HEADER = struct.Struct("<8sII")  # magic, slot count (power of two), brand count
+_SLOT = struct.Struct("<QQI")  # key hash, record offset, record length (0 = empty)
+_KEYLEN = struct.Struct("<H")
+
+
+def _key_hash(brand_id: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(brand_id.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+def build_brand_index(
+    target: str | Path, brands_dir: str | Path = "brands"
+) -> Tuple[int, List[str]]:
+    """Validate every brand under `brands_dir` and pack them into one index file.
+
+    Returns (brands written, errors for brands that failed validation and were
+    left out). The file is written next to `target` and renamed into place, so
+    readers with the old index mapped are never affected.
+    """
+    started = time.time_ns()
+    records: List[Tuple[str, bytes]] = []
+    errors: List[str] = []
+    for brand_file in sorted(Path(brands_dir).glob("*/brand.json")):
+        brand_id = brand_file.parent.name
+        try:
+            cfg = load_brand.__wrapped__(brand_id, brands_dir)
+        except ValueError as e:
+            errors.append(str(e))
+            continue
+        records.append((brand_id, cfg.model_dump_json().encode("utf-8")))
+
+    n_slots = 8
+    while n_slots < 2 * len(records):
+        n_slots *= 2
+    slots = [(0, 0, 0)] * n_slots
+    offset = _HEADER.size + n_slots * _SLOT.size
+    blobs: List[bytes] = []
+    for brand_id, payload in records:
+        key = brand_id.encode("utf-8")
+        record = _KEYLEN.pack(len(key)) + key + payload
+        h = _key_hash(brand_id)
+        i = h & (n_slots - 1)
+        while slots[i][2]:
+            i = (i + 1) & (n_slots - 1)
+        slots[i] = (h, offset, len(record))
+        blobs.append(record)
+        offset += len(record)
+
+    target = Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, n_slots, len(records)))
+        f.write(b"".join(_SLOT.pack(*s) for s in slots))
+        f.write(b"".join(blobs))
+    # Stamp the build start: a brand.json edited while building is still newer.
+    os.utime(tmp, ns=(started, started))
+    os.replace(tmp, target)
+    return len(records), errors
+
+
+class BrandIndex:
+    """Read-only, memory-mapped view of a packed brand index.
+
+    Lookups hash the brand id into an open-addressed slot table, so the cost
+    is one or two probes regardless of how many brands the file holds. Only
+    the pages actually touched are read from disk.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self.mtime_ns = os.fstat(f.fileno()).st_mtime_ns  # when the build started
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._n_slots, self._count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{self.path} is not a brand index")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, brand_id: object) -> bool:
+        return isinstance(brand_id, str) and self.raw(brand_id) is not None
+
+    def _record(self, slot: int) -> Tuple[int, int, int]:
+        h, off, length = _SLOT.unpack_from(self._mm, _HEADER.size + slot * _SLOT.size)
+        return h, off, length
+
+    def raw(self, brand_id: str) -> bytes | None:
+        """Validated brand JSON as stored, or None when the id is not indexed."""
+        h = _key_hash(brand_id)
+        key = brand_id.encode("utf-8")
+        i = h & (self._n_slots - 1)
+        while True:
+            slot_hash, off, length = self._record(i)
+            if not length:
+                return None
+            if slot_hash == h:
+                (klen,) = _KEYLEN.unpack_from(self._mm, off)
+                start = off + _KEYLEN.size
+                if self._mm[start : start + klen] == key:
+                    return self._mm[start + klen : off + length]
+            i = (i + 1) & (self._n_slots - 1)
+
+    def get(self, brand_id: str) -> BrandConfig | None:
+        payload = self.raw(brand_id)
+        return None if payload is None else BrandConfig.model_validate_json(payload)
+
+    def ids(self) -> Iterator[str]:
+        for i in range(self._n_slots):
+            _, off, length = self._record(i)
+            if length:
+                (klen,) = _KEYLEN.unpack_from(self._mm, off)
+                start = off + _KEYLEN.size
+                yield self._mm[start : start + klen].decode("utf-8")
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+_index: BrandIndex | None = None
+_index_stamp: Tuple[int, int] | None = None
+_index_lock = threading.Lock()
+
+
+def open_brand_index() -> BrandIndex | None:
+    """Index at `MAIL_AGENT_BRAND_INDEX`, reopened when the file is rebuilt."""
+    global _index, _index_stamp
+    path = settings.MAIL_AGENT_BRAND_INDEX
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_ino)
+    if _index is not None and stamp == _index_stamp:
+        return _index
+    with _index_lock:
+        if _index is None or stamp != _index_stamp:
+            # The old map stays valid for readers still holding it; it is
+            # released once they drop their reference.
+            _index, _index_stamp = BrandIndex(path), stamp
+        return _index
+"""Packed, memory-mapped brand index for large multi-tenant deployments.
+
+`python cli.py brands-index` validates every `brands/<id>/brand.json` once
+and packs the normalized configs into a single file:
+
+    header   magic, slot count, brand count
+    slots    open-addressed table of (key hash, offset, length)
+    records  brand id + validated JSON
+
+`open_brand_index()` maps it read-only; `BrandIndex.get` costs a hash, a probe
+or two and a pydantic parse of already-validated JSON, independent of the
+number of brands. Brands missing from the index still load from `brands/`,
+and so do brands whose brand.json is newer than the index (its mtime is the
+build start), so edits take effect without a rebuild.
+"""
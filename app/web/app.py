@@ -1,46 +1,266 @@
 from __future__ import annotations
+from contextlib import asynccontextmanager
 from pydantic import BaseModel
-from app.agents.interpret import interpret_instructions
-from fastapi import FastAPI, Query
+from app.agents.interpret import interpret_cached
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
 from app.agents.draft_agent import DraftAgent
 from app.agents.types import DraftRequest, DraftResponse
-from app.mail.types import PreviewResponse, SendResult
-from app.mail.workflow import preview as wf_preview, deliver as wf_deliver
+from app.mail.jobs import get_delivery_jobs, shutdown_delivery_jobs
+from app.mail.sessions import close_session_store, get_session_store
+from app.mail.executor import Overloaded, get_cpu_executor, shutdown_cpu_executor
+from app.mail.render_engine import shutdown_render_engine
+from app.mail.types import DeliveryJobState, PreviewResponse, SendResult
+from app.mail.types import SessionPreview, SessionState
+from app.mail.workflow import adeliver as wf_deliver, apreview as wf_preview
+from app.mail.workflow import apreview_key, delta_bases, preview_etag, preview_fields
+from app.web.compression import install_compression
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
 from app.web.cors import install_cors
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, Tuple
+import asyncio
+import json
 
 
-app = FastAPI(title="Mail Agent Tools - Draft API")
+@asynccontextmanager
+async def _lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    from app.config.settings import settings
+
+    if settings.MAIL_AGENT_WARMUP:
+        # Pay template/brand/inliner start-up before the first request, not during it.
+        from app.templating.render import warm_up
+
+        warm_up()
+    watcher = None
+    if settings.MAIL_AGENT_ASSET_POLL_S > 0:
+        from app.templating.assets import AssetWatcher
+
+        watcher = AssetWatcher()
+        watcher.start(settings.MAIL_AGENT_ASSET_POLL_S)
+    yield
+    if watcher is not None:
+        watcher.stop()
+    shutdown_delivery_jobs()
+    close_session_store()
+    shutdown_cpu_executor()
+    shutdown_render_engine()
+
+
+app = FastAPI(title="Mail Agent Tools - Draft API", lifespan=_lifespan)
 install_cors(app)
+install_compression(app)
 _agent = DraftAgent()
 
 
+@app.exception_handler(Overloaded)
+async def _overloaded(_request: Request, exc: Overloaded) -> JSONResponse:
+    return JSONResponse(
+        status_code=429, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
 @app.get("/health")
 def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/health/load")
+def health_load() -> dict[str, int]:
+    """CPU executor occupancy: workers, capacity, in_flight, queued, completed, rejected."""
+    return get_cpu_executor().stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint() -> PlainTextResponse:
+    """Prometheus text format: stage latency histograms, error and byte counters, cache stats."""
+    from app.metrics import metrics, render_prometheus
+
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="metrics are disabled")
+    return PlainTextResponse(
+        render_prometheus(metrics), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.post("/draft", response_model=DraftResponse)
 def draft(req: DraftRequest) -> DraftResponse:
     return _agent.draft(req)
 
 
-@app.post("/mail/preview", response_model=PreviewResponse)
-def mail_preview(req: DraftRequest) -> PreviewResponse:
-    data = wf_preview(req)
-    return PreviewResponse(**data)
+FIELDS_QUERY = Query(
+    default=None,
+    description="Comma-separated projection, e.g. subject,text,plan,html_len,word_count",
+)
+
+
+SINCE_QUERY = Query(
+    default=None, description="`hash` of the previous preview; returns a delta against it"
+)
+
+
+IF_NONE_MATCH = Header(
+    default=None, description="ETag of a preview already held; 304 when it is still current"
+)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison (RFC 9110, 13.1.2).
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+async def _preview_data(
+    req: DraftRequest,
+    fields: str | None,
+    since: str | None,
+    response: Response | None = None,
+    if_none_match: str | None = None,
+    scope: str = "",
+) -> Dict[str, Any]:
+    """Preview as a dict; with `response`, also sets its ETag and honors If-None-Match."""
+    wanted = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    try:
+        key = await apreview_key(req)
+        if response is not None:
+            delta = since is not None and since in delta_bases
+            etag = preview_etag(key, wanted, since, scope, delta)
+            if if_none_match and _etag_matches(if_none_match, etag):
+                # Decided from the request hash alone; nothing is drafted or rendered.
+                raise HTTPException(status_code=304, headers={"ETag": etag})
+        data = await wf_preview(req, fields=wanted, since=since, key=key)
+        if response is not None:
+            if ("delta" in data) != delta:
+                # The base was evicted (or stored) while rendering; tag what was sent.
+                etag = preview_etag(key, wanted, since, scope, delta="delta" in data)
+            response.headers["ETag"] = etag
+        return data
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+
+
+async def _preview(
+    req: DraftRequest,
+    fields: str | None,
+    since: str | None = None,
+    response: Response | None = None,
+    if_none_match: str | None = None,
+) -> PreviewResponse:
+    return PreviewResponse(**await _preview_data(req, fields, since, response, if_none_match))
+
+
+@app.post("/mail/preview", response_model=PreviewResponse, response_model_exclude_none=True)
+async def mail_preview(
+    req: DraftRequest,
+    response: Response,
+    fields: str | None = FIELDS_QUERY,
+    if_none_match: str | None = IF_NONE_MATCH,
+) -> PreviewResponse:
+    return await _preview(req, fields, None, response, if_none_match)
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """A `StreamingResponse` whose iterator is still reading the request body.
+
+    The stock one also drains `receive` to watch for a disconnect, which would
+    swallow body chunks; here a client that went away surfaces on `send`.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError as e:
+            raise ClientDisconnect() from e
+
+
+@app.post("/mail/preview/batch", response_class=_DuplexStreamingResponse)
+async def mail_preview_batch(
+    request: Request, fields: str | None = FIELDS_QUERY
+) -> _DuplexStreamingResponse:
+    """Previews for an NDJSON body or JSON array of `DraftRequest`s, streamed as NDJSON.
+
+    One line per item, `{"index", "preview"}` or `{"index", "error"}`, in
+    completion order.
+    """
+    from app.config.settings import settings
+    from app.mail.batch import preview_batch
+
+    wanted = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    try:
+        preview_fields(wanted)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    lines = preview_batch(
+        request.stream(),
+        wanted,
+        chunk_size=settings.MAIL_AGENT_BATCH_CHUNK,
+        parallel=settings.MAIL_AGENT_BATCH_PARALLEL,
+        max_item_bytes=settings.MAIL_AGENT_BATCH_MAX_ITEM_BYTES,
+    )
+    return _DuplexStreamingResponse(lines, media_type="application/x-ndjson")
 
 
 @app.post("/mail/deliver", response_model=SendResult)
-def mail_deliver(
+async def mail_deliver(
     req: DraftRequest,
     mode: str | None = Query(default=None, pattern="^(draft|send)$"),
 ) -> SendResult:
-    data = wf_deliver(req, force_action=mode)
+    data = await wf_deliver(req, force_action=mode)
     return SendResult(**data)
 
 
+@app.post(
+    "/mail/deliver/jobs",
+    status_code=202,
+    response_model=DeliveryJobState,
+    response_model_exclude_none=True,
+)
+async def mail_deliver_jobs(
+    reqs: list[DraftRequest],
+    response: Response,
+    mode: str | None = Query(default=None, pattern="^(draft|send)$"),
+) -> DeliveryJobState:
+    """Queue `reqs` for background delivery and acknowledge with the job id."""
+    try:
+        job = get_delivery_jobs().submit(reqs, mode)
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+    response.headers["Location"] = f"/mail/deliver/jobs/{job.job_id}"
+    return DeliveryJobState(**job.snapshot(items=False))
+
+
+async def _sse(events: AsyncIterator[Tuple[str, Dict[str, Any]]]) -> AsyncIterator[str]:
+    async for event, data in events:
+        yield f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+@app.get(
+    "/mail/deliver/jobs/{job_id}",
+    response_model=DeliveryJobState,
+    response_model_exclude_none=True,
+)
+async def mail_deliver_job(
+    job_id: str, accept: str | None = Header(default=None)
+) -> DeliveryJobState | StreamingResponse:
+    """Job status with per-item results; `Accept: text/event-stream` follows it live.
+
+    The event stream sends `item` for every finished item, `progress` with the
+    counts, and a final `done`.
+    """
+    try:
+        job = get_delivery_jobs().get(job_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0]) from e
+    if accept and "text/event-stream" in accept:
+        return StreamingResponse(
+            _sse(job.events()),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    return DeliveryJobState(**job.snapshot())
+
+
 @app.get("/version")
 def version() -> dict[str, str]:
     try:
@@ -105,21 +325,29 @@ def draft_iterate(base: DraftRequest, updates: DraftUpdate) -> DraftResponse:
     return _agent.draft(req2)
 
 
-@app.post("/draft/iterate/preview", response_model=PreviewResponse)
-def draft_iterate_preview(base: DraftRequest, updates: DraftUpdate) -> PreviewResponse:
+@app.post(
+    "/draft/iterate/preview", response_model=PreviewResponse, response_model_exclude_none=True
+)
+async def draft_iterate_preview(
+    base: DraftRequest,
+    updates: DraftUpdate,
+    response: Response,
+    fields: str | None = FIELDS_QUERY,
+    since: str | None = SINCE_QUERY,
+    if_none_match: str | None = IF_NONE_MATCH,
+) -> PreviewResponse:
     req2 = _apply_updates(base, updates)
-    data = wf_preview(req2)
-    return PreviewResponse(**data)
+    return await _preview(req2, fields, since, response, if_none_match)
 
 
 @app.post("/mail/iterate/deliver", response_model=SendResult)
-def mail_iterate_deliver(
+async def mail_iterate_deliver(
     base: DraftRequest,
     updates: DraftUpdate,
     mode: str = "draft",
 ) -> SendResult:
     req2 = _apply_updates(base, updates)
-    data = wf_deliver(req2, force_action=mode)
+    data = await wf_deliver(req2, force_action=mode)
     return SendResult(**data)
 
 
@@ -127,29 +355,163 @@ class NLUpdate(BaseModel):
     instructions: str
 
 
-@app.post("/draft/iterate/nl", response_model=PreviewResponse)
-def draft_iterate_nl(base: DraftRequest, updates: NLUpdate) -> PreviewResponse:
-    parsed = interpret_instructions(updates.instructions)
+@app.post("/draft/iterate/nl", response_model=PreviewResponse, response_model_exclude_none=True)
+async def draft_iterate_nl(
+    base: DraftRequest,
+    updates: NLUpdate,
+    response: Response,
+    fields: str | None = FIELDS_QUERY,
+    since: str | None = SINCE_QUERY,
+    if_none_match: str | None = IF_NONE_MATCH,
+) -> PreviewResponse:
+    parsed = interpret_cached(updates.instructions)
     req2 = _apply_updates(base, DraftUpdate(**parsed))
-    data = wf_preview(req2)
-    return PreviewResponse(**data)
+    return await _preview(req2, fields, since, response, if_none_match)
 
 
 @app.post("/mail/iterate/nl-deliver", response_model=SendResult)
-def mail_iterate_nl_deliver(
+async def mail_iterate_nl_deliver(
     base: DraftRequest, updates: NLUpdate, mode: str = "draft"
 ) -> SendResult:
-    parsed = interpret_instructions(updates.instructions)
+    parsed = interpret_cached(updates.instructions)
     req2 = _apply_updates(base, DraftUpdate(**parsed))
-    data = wf_deliver(req2, force_action=mode)
+    data = await wf_deliver(req2, force_action=mode)
+    return SendResult(**data)
+
+
+# ---------- Sessions: iterate against server-side revisions ----------
+REVISION_QUERY = Query(
+    default=None, ge=1, description="Session revision to use; the latest by default"
+)
+
+
+async def _session_request(session_id: str, revision: int | None) -> tuple[int, DraftRequest]:
+    # The store is SQLite behind a lock: keep it off the event loop.
+    try:
+        return await asyncio.to_thread(get_session_store().get, session_id, revision)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0]) from e
+
+
+def _session_state(session_id: str) -> SessionState:
+    try:
+        info = get_session_store().info(session_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0]) from e
+    return SessionState(session_id=session_id, revision=info.latest, first_revision=info.first)
+
+
+async def _session_revise(
+    session_id: str,
+    revision: int | None,
+    updates: DraftUpdate,
+    fields: str | None,
+    since: str | None,
+) -> SessionPreview:
+    _, base = await _session_request(session_id, revision)
+    req2 = _apply_updates(base, updates)
+    # Render before recording, so a failing update does not become a revision.
+    data = await _preview_data(req2, fields, since)
+    try:
+        number = await asyncio.to_thread(get_session_store().append, session_id, req2)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0]) from e
+    return SessionPreview(**data, session_id=session_id, revision=number)
+
+
+@app.post("/sessions", response_model=SessionState)
+def session_create(req: DraftRequest) -> SessionState:
+    info = get_session_store().create(req)
+    return SessionState(
+        session_id=info.session_id, revision=info.latest, first_revision=info.first
+    )
+
+
+@app.get("/sessions/{session_id}", response_model=SessionState)
+def session_get(session_id: str) -> SessionState:
+    return _session_state(session_id)
+
+
+@app.delete("/sessions/{session_id}")
+def session_delete(session_id: str) -> dict[str, str]:
+    if not get_session_store().delete(session_id):
+        raise HTTPException(status_code=404, detail=f"unknown or expired session {session_id}")
+    return {"status": "deleted"}
+
+
+@app.get(
+    "/sessions/{session_id}/preview",
+    response_model=SessionPreview,
+    response_model_exclude_none=True,
+)
+async def session_preview(
+    session_id: str,
+    response: Response,
+    revision: int | None = REVISION_QUERY,
+    fields: str | None = FIELDS_QUERY,
+    since: str | None = SINCE_QUERY,
+    if_none_match: str | None = IF_NONE_MATCH,
+) -> SessionPreview:
+    number, req = await _session_request(session_id, revision)
+    scope = f"{session_id}/{number}"
+    data = await _preview_data(req, fields, since, response, if_none_match, scope)
+    return SessionPreview(**data, session_id=session_id, revision=number)
+
+
+@app.post(
+    "/sessions/{session_id}/updates",
+    response_model=SessionPreview,
+    response_model_exclude_none=True,
+)
+async def session_update(
+    session_id: str,
+    updates: DraftUpdate,
+    revision: int | None = REVISION_QUERY,
+    fields: str | None = FIELDS_QUERY,
+    since: str | None = SINCE_QUERY,
+) -> SessionPreview:
+    return await _session_revise(session_id, revision, updates, fields, since)
+
+
+@app.post(
+    "/sessions/{session_id}/nl", response_model=SessionPreview, response_model_exclude_none=True
+)
+async def session_update_nl(
+    session_id: str,
+    updates: NLUpdate,
+    revision: int | None = REVISION_QUERY,
+    fields: str | None = FIELDS_QUERY,
+    since: str | None = SINCE_QUERY,
+) -> SessionPreview:
+    parsed = interpret_cached(updates.instructions)
+    return await _session_revise(session_id, revision, DraftUpdate(**parsed), fields, since)
+
+
+@app.post("/sessions/{session_id}/deliver", response_model=SendResult)
+async def session_deliver(
+    session_id: str,
+    revision: int | None = REVISION_QUERY,
+    mode: str | None = Query(default=None, pattern="^(draft|send)$"),
+) -> SendResult:
+    _, req = await _session_request(session_id, revision)
+    data = await wf_deliver(req, force_action=mode)
     return SendResult(**data)
 """FastAPI web API for the Mail Agent.
 
 This module exposes endpoints to:
 - draft: Produce a subject/body draft from a `DraftRequest`.
-- mail/preview: Render the brand template and return HTML/Text plus a dry-run plan.
+- metrics: Per-stage latency histograms and counters in Prometheus text format.
+- mail/preview: Render the brand template and return HTML/Text plus a dry-run plan
+  (`fields=` narrows the response and skips the HTML stage when it is not asked for;
+  previews carry an ETag and `If-None-Match` answers 304 without rendering).
+- mail/preview/batch: Stream NDJSON previews for many requests over one connection.
 - mail/deliver: Create a Gmail draft or send immediately.
-- draft/iterate*, mail/iterate*: Apply structured or NL updates to iterate on content.
+- mail/deliver/jobs: Deliver a list of requests in the background; poll the job for
+  per-item status or follow it as Server-Sent Events.
+- draft/iterate*, mail/iterate*: Apply structured or NL updates to iterate on content
+  (`since=<previous hash>` on the preview variants returns a delta).
+- sessions/*: Keep the request server-side as numbered revisions; post updates or NL
+  instructions by `session_id`, preview any held revision and deliver by revision.
 
 It keeps request/response shapes small and deterministic so the API is easy to
 consume by other agents and systems.
@@ -5,6 +5,7 @@ import subprocess
 from pathlib import Path
 import sys
 
+from app.config.settings import settings
 from app.tools.brand_loader import load_brand, BrandNotFound
 
 BRANDS_DIR = Path("brands")
@@ -64,6 +65,28 @@ def cmd_check(run_all: bool, do_tests: bool, do_lint: bool, do_types: bool) -> i
     return rc
 
 
+def cmd_templates_compile(target: str, as_dir: bool) -> int:
+    from app.templating.env import compile_templates
+
+    try:
+        names = compile_templates(target, zip=not as_dir)
+    except Exception as e:
+        print(f"Template compilation failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Compiled {len(names)} templates to {target}")
+    return 0
+
+
+def cmd_brands_index(target: str) -> int:
+    from app.tools.brand_index import build_brand_index
+
+    count, errors = build_brand_index(target, BRANDS_DIR)
+    for err in errors:
+        print(f"Skipped: {err}", file=sys.stderr)
+    print(f"Indexed {count} brands to {target}")
+    return 1 if errors else 0
+
+
 def main() -> int:
     p = argparse.ArgumentParser(prog="mail-agent")
     sub = p.add_subparsers(dest="cmd", required=True)
@@ -81,6 +104,13 @@ def main() -> int:
     pc.add_argument("--lint", action="store_true", help="Run ruff only")
     pc.add_argument("--types", action="store_true", help="Run mypy only")
 
+    pt = sub.add_parser("templates-compile", help="Precompile Jinja templates for fast cold starts")
+    pt.add_argument("--out", default=None, help="Artifact path (default: settings)")
+    pt.add_argument("--dir", action="store_true", help="Write a directory instead of a zip")
+
+    pb = sub.add_parser("brands-index", help="Pack all brands into a memory-mapped index")
+    pb.add_argument("--out", default=None, help="Index path (default: settings)")
+
     args = p.parse_args()
     if args.cmd == "brand-validate":
         return cmd_brand_validate(args.brand_id)
@@ -88,13 +118,19 @@ def main() -> int:
         return cmd_brand_init(args.brand_id, args.force)
     if args.cmd == "check":
         return cmd_check(args.all, args.tests, args.lint, args.types)
+    if args.cmd == "templates-compile":
+        return cmd_templates_compile(args.out or settings.MAIL_AGENT_TEMPLATES_COMPILED, args.dir)
+    if args.cmd == "brands-index":
+        return cmd_brands_index(args.out or settings.MAIL_AGENT_BRAND_INDEX)
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main())
-"""Project maintenance CLI (brands, checks).
+"""Project maintenance CLI (brands, checks, build steps).
 
-Provides helpers to validate and initialize brand configs and to run
-lint/type/tests in one command during development.
+Provides helpers to validate and initialize brand configs, to run
+lint/type/tests in one command during development, and to build the
+artifacts the runtime loads when present: precompiled Jinja templates and
+the packed brand index.
 """
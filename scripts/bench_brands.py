@@ -0,0 +1,65 @@
+"""Brand lookup cost vs number of brands: per-file loading vs the packed index.
+
+Run from the repo root:
+    python scripts/bench_brands.py [--sizes 100 1000 20000] [--n 2000]
+
+Each lookup is a cache miss (a campaign touching more brands than fit in
+memory), so this measures the cost of reading and parsing one brand.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable, List
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.tools.brand_index import BrandIndex, build_brand_index
+from app.tools.brand_loader import load_brand
+
+
+def make_brands(root: Path, count: int) -> List[str]:
+    ids = [f"tenant-{i:06d}" for i in range(count)]
+    for brand_id in ids:
+        (root / brand_id).mkdir(parents=True)
+        data = {"name": brand_id, "links": {"website": f"https://{brand_id}.test/"}}
+        (root / brand_id / "brand.json").write_text(json.dumps(data), encoding="utf-8")
+    return ids
+
+
+def per_lookup_us(fn: Callable[[str], object], ids: List[str], n: int) -> float:
+    picks = [random.choice(ids) for _ in range(n)]
+    t0 = time.perf_counter()
+    for brand_id in picks:
+        fn(brand_id)
+    return (time.perf_counter() - t0) * 1e6 / n
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(prog="bench_brands")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 20000])
+    p.add_argument("--n", type=int, default=2000)
+    args = p.parse_args()
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            brands = Path(tmp) / "brands"
+            ids = make_brands(brands, size)
+            build_brand_index(Path(tmp) / "brands.idx", brands)
+            index = BrandIndex(Path(tmp) / "brands.idx")
+            files = statistics.median(
+                per_lookup_us(lambda b, d=brands: load_brand.__wrapped__(b, d), ids, args.n)
+                for _ in range(3)
+            )
+            packed = statistics.median(per_lookup_us(index.get, ids, args.n) for _ in range(3))
+            index.close()
+        print(f"{size:>7} brands  files={files:7.1f}us  index={packed:7.1f}us")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
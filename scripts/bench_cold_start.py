@@ -0,0 +1,72 @@
+"""First-request latency of a fresh process, with and without the template artifact.
+
+Run from the repo root:
+    python scripts/bench_cold_start.py [--runs 5]
+
+Each run starts a new interpreter, imports the workflow and times the first
+`preview` (templates compiled or loaded, brand parsed, inliner imported).
+"""
+
+from __future__ import annotations
+from pathlib import Path
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = Path(__file__).resolve().parents[1]
+
+PROBE = """
+import time
+t0 = time.perf_counter()
+from app.agents.types import DraftRequest, Recipient
+from app.mail.workflow import preview
+t1 = time.perf_counter()
+preview(DraftRequest(recipient=Recipient(email="a@example.com"), purpose="welcome"))
+t2 = time.perf_counter()
+print(f"{(t1 - t0) * 1e3:.1f} {(t2 - t1) * 1e3:.1f}")
+"""
+
+
+def sample(artifact: str, runs: int) -> tuple[list[float], list[float]]:
+    env = dict(os.environ, MAIL_AGENT_TEMPLATES_COMPILED=artifact)
+    imports, firsts = [], []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=ROOT,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        imports.append(float(out[0]))
+        firsts.append(float(out[1]))
+    return imports, firsts
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(prog="bench_cold_start")
+    p.add_argument("--runs", type=int, default=5)
+    args = p.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact = str(Path(tmp) / "templates.zip")
+        subprocess.run(
+            [sys.executable, "cli.py", "templates-compile", "--out", artifact],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+        )
+        for label, path in (("source templates", ""), ("compiled artifact", artifact)):
+            imports, firsts = sample(path, args.runs)
+            print(
+                f"{label:<18} import={statistics.median(imports):7.1f}ms "
+                f"first_preview={statistics.median(firsts):7.1f}ms"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
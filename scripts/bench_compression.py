@@ -0,0 +1,102 @@
+"""Bytes on the wire and latency trade-off of compressed preview responses.
+
+Run from the repo root:
+    python scripts/bench_compression.py [--n 200] [--mbps 10 100 1000]
+
+Builds `/mail/preview` response bodies for a few typical requests against
+every brand in `brands/`, then reports, per available encoding, the mean
+body size, compress and decompress time, and the estimated time to deliver
+one response (compress + transfer + decompress) at each link speed.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable, Dict, List
+import argparse
+import gzip
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.agents.types import DraftRequest, Recipient
+from app.mail.types import PreviewResponse
+from app.mail.workflow import preview
+from app.web.compression import CODECS
+
+CONTEXTS: List[Dict[str, object]] = [
+    {"cta_text": "Visit CodeRoad", "cta_url": "https://coderoad.com/"},
+    {"bullets": ["Explore docs", "Book a demo", "See pricing"], "long_form": True},
+    {"tone": "warm", "subject": "Welcome aboard", "bullets": ["Join the forum"]},
+]
+
+
+def _decoders() -> Dict[str, Callable[[bytes], bytes]]:
+    dec: Dict[str, Callable[[bytes], bytes]] = {"gzip": gzip.decompress}
+    if "zstd" in CODECS:
+        import zstandard
+
+        dec["zstd"] = zstandard.ZstdDecompressor().decompress
+    if "br" in CODECS:
+        import brotli
+
+        dec["br"] = brotli.decompress
+    return dec
+
+
+def bodies() -> List[bytes]:
+    out = []
+    for brand in sorted(p.parent.name for p in Path("brands").glob("*/brand.json")):
+        for ctx in CONTEXTS:
+            req = DraftRequest(
+                recipient=Recipient(email="pat@example.com", name="Pat"),
+                purpose="welcome",
+                brand_id=brand,
+                context=ctx,
+            )
+            body = PreviewResponse(**preview(req)).model_dump_json(exclude_none=True)
+            out.append(body.encode("utf-8"))
+    return out
+
+
+def timed_us(fn: Callable[[bytes], bytes], data: bytes, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn(data)
+    return (time.perf_counter() - t0) * 1e6 / n
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(prog="bench_compression")
+    p.add_argument("--n", type=int, default=200)
+    p.add_argument("--mbps", type=float, nargs="+", default=[10.0, 100.0, 1000.0])
+    args = p.parse_args()
+
+    samples = bodies()
+    decoders = _decoders()
+    rows = [("identity", statistics.mean(len(b) for b in samples), 0.0, 0.0)]
+    for name, codec in CODECS.items():
+        packed = [codec(b) for b in samples]
+        rows.append(
+            (
+                name,
+                statistics.mean(len(b) for b in packed),
+                statistics.mean(timed_us(codec, b, args.n) for b in samples),
+                statistics.mean(timed_us(decoders[name], b, args.n) for b in packed),
+            )
+        )
+
+    links = "".join(f"{f'@{m:g}Mbit/s':>14}" for m in args.mbps)
+    print(f"{len(samples)} preview bodies")
+    print(f"{'encoding':<10}{'bytes':>9}{'ratio':>7}{'comp us':>9}{'decomp us':>10}{links}")
+    raw = rows[0][1]
+    for name, size, comp, decomp in rows:
+        wire = "".join(
+            f"{comp + size * 8 / m + decomp:>12.0f}us" for m in args.mbps  # bits / (Mbit/s) = us
+        )
+        print(f"{name:<10}{size:>9.0f}{raw / size:>6.1f}x{comp:>9.0f}{decomp:>10.0f}{wire}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
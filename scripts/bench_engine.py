@@ -0,0 +1,64 @@
+"""Throughput of in-process rendering vs the process-pool render engine.
+
+Run from the repo root:
+    python scripts/bench_engine.py [--n 2000] [--threads 8] [--processes 4]
+
+Mirrors the API: several request threads calling `workflow.render` at once.
+"""
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Tuple
+import argparse
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.agents.draft_agent import DraftAgent
+from app.agents.types import DraftRequest, DraftResponse, Recipient
+from app.mail.render_engine import RenderEngine
+from app.mail.workflow import render_local
+
+
+def requests(n: int) -> list[Tuple[DraftRequest, DraftResponse]]:
+    out = []
+    for i in range(n):
+        req = DraftRequest(
+            recipient=Recipient(email=f"user{i}@example.com", name=f"User {i}"),
+            purpose="welcome",
+            context={"bullets": [f"Tip {i}", "Explore docs"], "cta_text": "Start"},
+        )
+        out.append((req, DraftAgent().draft(req)))
+    return out
+
+
+def run(
+    label: str, fn: Callable[[DraftRequest, DraftResponse], object], n: int, threads: int
+) -> None:
+    work = requests(n)
+    with ThreadPoolExecutor(threads) as tp:
+        list(tp.map(lambda rd: fn(*rd), work[: threads * 2]))  # warm-up
+        t0 = time.perf_counter()
+        list(tp.map(lambda rd: fn(*rd), work))
+        dt = time.perf_counter() - t0
+    print(f"{label:<22} {n / dt:8.0f} renders/s  ({dt * 1e3 / n:.2f} ms each)")
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(prog="bench_engine")
+    p.add_argument("--n", type=int, default=2000)
+    p.add_argument("--threads", type=int, default=8)
+    p.add_argument("--processes", type=int, default=4)
+    args = p.parse_args()
+    run("in-process", render_local, args.n, args.threads)
+    engine = RenderEngine(processes=args.processes, max_queue=args.threads * 2)
+    try:
+        run(f"pool x{args.processes}", engine.render, args.n, args.threads)
+    finally:
+        engine.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
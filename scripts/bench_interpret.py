@@ -0,0 +1,71 @@
+"""Microbenchmark for the NL instruction interpreter and purpose normalization.
+
+Run from the repo root:
+    python scripts/bench_interpret.py [--n 2000]
+
+Prints mean time per call over a corpus of realistic instructions.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable
+import argparse
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.agents.interpret import (
+    InterpretCache,
+    interpret_instructions,
+    normalize_purpose,
+)
+
+CORPUS = [
+    "make it more excited",
+    "a little more friendly please",
+    "add bullets: Book a demo; See pricing; set cta text: Start trial",
+    "set cta url: https://coderoad.com/start",
+    "replace bullets: One, Two; remove cta",
+    "subject: Your CodeRoad account is ready",
+    "make it shorter and more concise",
+    "tone: formal",
+    "more professional, less casual",
+    "make it more helpful, over 50 words",
+    "this is for a QA engineer, list their responsibilities",
+    "set purpose: newsletter",
+    "expand on the onboarding steps",
+    "drop bullets and no button",
+    "warmer and more personal",
+    "Thanks, looks great — send it as is",
+    "can you fix the typo in the second paragraph?",
+    "use the customer's first name in the greeting",
+    "clear bullets; add bullets: Invite your team, Connect GitHub",
+    "make the subject line punchier",
+]
+PURPOSES = [
+    "welcome", "Weekly digest", "promo offer", "cold intro", "policy update",
+    "planned downtime", "product updates", "quarterly review", "", "announcement",
+]
+
+
+def per_call_us(fn: Callable[[str], object], inputs: list[str], n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        for s in inputs:
+            fn(s)
+    return (time.perf_counter() - t0) * 1e6 / (n * len(inputs))
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(prog="bench_interpret")
+    p.add_argument("--n", type=int, default=2000)
+    args = p.parse_args()
+    print(f"interpret_instructions  {per_call_us(interpret_instructions, CORPUS, args.n):6.2f}us")
+    cache = InterpretCache(maxsize=256)
+    print(f"interpret (memoized)     {per_call_us(cache.get_or_interpret, CORPUS, args.n):6.2f}us")
+    print(f"normalize_purpose       {per_call_us(normalize_purpose, PURPOSES, args.n):6.2f}us")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+"""Micro-benchmarks for the render path.
+
+Run from the repo root:
+    python scripts/bench_render.py [--n 500] [--case NAME ...]
+
+Each case prints mean/p50/p95 latency per call in microseconds.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable, Dict, List
+import argparse
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config.settings import settings
+from app.templating.env import jinja_env, render_template
+from app.templating.render import render_generic_email, render_generic_email_many
+
+TEMPLATE = "families/generic/generic_v1.html.j2"
+CONTEXT: Dict[str, object] = {
+    "brand": {
+        "name": "CodeRoad",
+        "primary": "#6B21A8",
+        "content_width_px": 600,
+        "button_radius_px": 6,
+        "logo_url": None,
+        "footer_html": "",
+        "unsubscribe": {"required_for": [], "url": None},
+    },
+    "subject": "Welcome to CodeRoad",
+    "preheader": "Hello!",
+    "body_text": "Hello!\n\nThis is a short paragraph.\nAnd a second line.",
+    "cta_text": "Visit CodeRoad",
+    "cta_url": "https://coderoad.com/",
+    "purpose": "welcome",
+    "footer_html": "<p>© CodeRoad</p>",
+    "signature_html": "",
+}
+
+
+def jinja_fresh_env() -> None:
+    """Previous behaviour: new Environment, template re-read and re-compiled per render."""
+    jinja_env().get_template(TEMPLATE).render(**CONTEXT)
+
+
+def jinja_shared_env() -> None:
+    render_template(TEMPLATE, CONTEXT)
+
+
+def render_email() -> None:
+    render_generic_email(
+        subject="Welcome to CodeRoad",
+        body_text=str(CONTEXT["body_text"]),
+        brand_id="default",
+        purpose="welcome",
+        variables={"cta_text": "Visit CodeRoad", "cta_url": "https://coderoad.com/"},
+    )
+
+
+def render_email_full_inline() -> None:
+    """Premailer over the whole document on every render."""
+    settings.MAIL_AGENT_INLINE_MODE = "full"
+    try:
+        render_email()
+    finally:
+        settings.MAIL_AGENT_INLINE_MODE = "skeleton"
+
+
+BATCH = [
+    (f"Welcome {i}", f"Hi #{i},\n\nThanks for joining.\nSee you soon.", {"cta_text": "Go"})
+    for i in range(1000)
+]
+
+
+def loop_x1000() -> None:
+    for subject, body, variables in BATCH:
+        render_generic_email(
+            subject=subject, body_text=body, purpose="welcome", variables=variables
+        )
+
+
+def many_x1000() -> None:
+    for _ in render_generic_email_many(BATCH, purpose="welcome"):
+        pass
+
+
+CASES: Dict[str, Callable[[], None]] = {
+    "jinja_fresh_env": jinja_fresh_env,
+    "jinja_shared_env": jinja_shared_env,
+    "render_email": render_email,
+    "render_email_full_inline": render_email_full_inline,
+    "loop_x1000": loop_x1000,
+    "many_x1000": many_x1000,
+}
+
+
+def bench(fn: Callable[[], None], n: int) -> List[float]:
+    fn()  # warm-up
+    samples: List[float] = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return samples
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(prog="bench_render")
+    p.add_argument("--n", type=int, default=500)
+    p.add_argument("--case", action="append", choices=sorted(CASES))
+    args = p.parse_args()
+    for name in args.case or list(CASES):
+        s = sorted(bench(CASES[name], args.n))
+        print(
+            f"{name:<24} mean={statistics.fmean(s):9.1f}us "
+            f"p50={s[len(s) // 2]:9.1f}us p95={s[int(len(s) * 0.95)]:9.1f}us"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
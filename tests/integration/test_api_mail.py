@@ -35,6 +35,20 @@ async def test_mail_preview_roundtrip(anyio_backend: str) -> None:
         assert "Agent-Sent" in " ".join(data["plan"]["labels"])
 
 
+async def test_mail_preview_field_projection(anyio_backend: str) -> None:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post(
+            "/mail/preview", json=PREVIEW_PAYLOAD, params={"fields": "subject,text,word_count"}
+        )
+        assert r.status_code == 200
+        data = r.json()
+        assert set(data) == {"subject", "text", "word_count"}
+        assert data["word_count"] == len(data["text"].split())
+        bad = await ac.post("/mail/preview", json=PREVIEW_PAYLOAD, params={"fields": "nope"})
+        assert bad.status_code == 422
+
+
 SEND_PAYLOAD = dict(PREVIEW_PAYLOAD)  # deliver uses same DraftRequest shape
 
 
@@ -60,3 +74,111 @@ async def test_mail_deliver_roundtrip(anyio_backend: str, monkeypatch: pytest.Mo
         assert data["id"]
         assert data["to"] == SEND_PAYLOAD["recipient"]["email"]
         assert "Welcome" in data["subject"]
+
+
+async def test_mail_preview_sheds_load_with_429(
+    anyio_backend: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from app.mail.executor import Overloaded
+
+    class Saturated:
+        async def run(self, *_args: Any) -> Any:
+            raise Overloaded("CPU queue full (68 admitted)", retry_after=3)
+
+    monkeypatch.setattr(wf, "get_cpu_executor", Saturated)
+    monkeypatch.setattr(wf, "preview_cache", wf.PreviewCache(max_entries=0, max_bytes=0))
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post("/mail/preview", json=PREVIEW_PAYLOAD)
+        assert r.status_code == 429
+        assert r.headers["retry-after"] == "3"
+        load = (await ac.get("/health/load")).json()
+        assert {"in_flight", "queued", "capacity", "rejected"} <= set(load)
+
+
+async def test_mail_preview_etag_short_circuits_rendering(
+    anyio_backend: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post("/mail/preview?fields=subject,text", json=PREVIEW_PAYLOAD)
+        etag = r.headers["etag"]
+        assert r.status_code == 200 and etag.startswith('"')
+
+        def no_render(*_args: Any) -> Any:
+            raise AssertionError("a 304 must not draft or render")
+
+        monkeypatch.setattr(wf, "generate", no_render)
+        monkeypatch.setattr(wf, "preview_cache", wf.PreviewCache(max_entries=0, max_bytes=0))
+        headers = {"If-None-Match": f'W/"other", {etag}'}
+        url = "/mail/preview?fields=text,subject"
+        r = await ac.post(url, json=PREVIEW_PAYLOAD, headers=headers)
+        assert r.status_code == 304 and r.headers["etag"] == etag and r.content == b""
+
+        # A different projection or request is a different representation.
+        monkeypatch.undo()
+        r = await ac.post("/mail/preview?fields=subject", json=PREVIEW_PAYLOAD, headers=headers)
+        assert r.status_code == 200 and r.headers["etag"] != etag
+
+
+async def test_mail_preview_is_compressed_when_accepted(anyio_backend: str) -> None:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        headers = {"Accept-Encoding": "gzip"}
+        r = await ac.post("/mail/preview", json=PREVIEW_PAYLOAD, headers=headers)
+        assert r.headers["content-encoding"] == "gzip"
+        assert "Visit CodeRoad" in r.json()["html"]
+        assert r.headers["etag"].startswith('W/"')
+
+
+async def test_mail_preview_batch_streams_ndjson(anyio_backend: str) -> None:
+    import json
+
+    bad_brand = {**PREVIEW_PAYLOAD, "brand_id": "no-such-brand"}
+    body = "\n".join(json.dumps(x) for x in (PREVIEW_PAYLOAD, {"purpose": 1}, bad_brand))
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post("/mail/preview/batch?fields=subject,text", content=body)
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        lines = {x["index"]: x for x in map(json.loads, r.text.splitlines())}
+        assert set(lines[0]["preview"]) == {"subject", "text"}
+        assert lines[1]["error"]["status"] == 422
+        assert lines[2]["error"]["status"] == 404
+
+        r = await ac.post("/mail/preview/batch?fields=nope", content=body)
+        assert r.status_code == 422
+
+
+async def test_metrics_expose_stage_histograms(anyio_backend: str) -> None:
+    wf.preview_cache.clear()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post("/mail/preview", json=PREVIEW_PAYLOAD)
+        assert r.status_code == 200
+        r = await ac.get("/metrics")
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = r.text
+        for stage in ("draft", "render"):
+            assert f'mail_agent_stage_seconds_count{{stage="{stage}"}}' in body
+        assert 'mail_agent_rendered_bytes_total{part="html"}' in body
+        assert "mail_agent_cache_preview_misses_total" in body
+
+
+async def test_full_render_queue_answers_429(
+    anyio_backend: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from app.mail.render_engine import RenderQueueFull
+
+    class FullEngine:
+        def render(self, *_args: Any) -> Any:
+            raise RenderQueueFull("render queue full (1 running, 0 queued)", 2)
+
+    monkeypatch.setattr(wf, "get_render_engine", lambda: FullEngine())
+    monkeypatch.setattr(wf, "preview_cache", wf.PreviewCache(max_entries=0, max_bytes=0))
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post("/mail/preview", json=PREVIEW_PAYLOAD)
+    assert r.status_code == 429 and r.headers["retry-after"] == "2"
+    assert "render queue full" in r.json()["detail"]
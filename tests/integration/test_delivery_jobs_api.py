@@ -0,0 +1,46 @@
+from __future__ import annotations
+from typing import Any
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.web.app import app
+import app.mail.workflow as wf  # for monkeypatching
+
+pytestmark = [pytest.mark.anyio, pytest.mark.parametrize("anyio_backend", ["asyncio"])]
+
+
+def _payload(email: str) -> dict[str, Any]:
+    return {"recipient": {"email": email}, "purpose": "welcome", "brand_id": "default"}
+
+
+async def test_deliver_job_ack_status_and_events(
+    anyio_backend: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def fake_send(**kwargs: Any) -> dict[str, Any]:
+        return {"status": kwargs["force_action"], "id": "m-1", "labels_applied": ["Label_1"]}
+
+    monkeypatch.setattr(wf, "draft_or_send_message", fake_send, raising=False)
+    reqs = [_payload(f"u{i}@example.com") for i in range(3)]
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post("/mail/deliver/jobs?mode=draft", json=reqs)
+        assert r.status_code == 202
+        ack = r.json()
+        assert ack["total"] == 3 and "items" not in ack
+        assert r.headers["location"] == f"/mail/deliver/jobs/{ack['job_id']}"
+
+        r = await ac.get(r.headers["location"], headers={"Accept": "text/event-stream"})
+        assert r.headers["content-type"].startswith("text/event-stream")
+        names = [line[7:] for line in r.text.splitlines() if line.startswith("event: ")]
+        assert names.count("item") == 3 and names[-1] == "done"
+
+        r = await ac.get(f"/mail/deliver/jobs/{ack['job_id']}")
+        state = r.json()
+        assert state["status"] == "done" and state["counts"]["done"] == 3
+        emails = [p["recipient"]["email"] for p in reqs]
+        assert [i["result"]["to"] for i in state["items"]] == emails
+        assert state["items"][0]["result"]["status"] == "draft"
+
+        r = await ac.get("/mail/deliver/jobs/nope")
+        assert r.status_code == 404
@@ -0,0 +1,72 @@
+from __future__ import annotations
+from typing import Any
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.web.app import app
+import app.mail.workflow as wf  # for monkeypatching
+
+pytestmark = [pytest.mark.anyio, pytest.mark.parametrize("anyio_backend", ["asyncio"])]
+
+BASE_REQ: dict[str, Any] = {
+    "recipient": {"email": "pat@example.com", "name": "Pat"},
+    "purpose": "welcome",
+    "brand_id": "default",
+    "context": {"bullets": ["Explore docs"], "cta_text": "Visit CodeRoad"},
+}
+
+
+async def test_session_iterates_by_revision(
+    anyio_backend: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    sent: list[dict[str, Any]] = []
+
+    def fake_send(**kwargs: Any) -> dict[str, Any]:
+        sent.append(kwargs)
+        return {"status": "draft", "id": "m-1", "labels_applied": ["Label_1"]}
+
+    monkeypatch.setattr(wf, "draft_or_send_message", fake_send, raising=False)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post("/sessions", json=BASE_REQ)
+        assert r.status_code == 200
+        sid = r.json()["session_id"]
+        assert r.json()["revision"] == 1
+
+        r = await ac.post(f"/sessions/{sid}/updates", json={"bullets_add": ["Contact support"]})
+        assert r.status_code == 200
+        assert r.json()["revision"] == 2 and "Contact support" in r.json()["text"]
+
+        r = await ac.post(
+            f"/sessions/{sid}/nl?fields=text", json={"instructions": "set cta text: Subscribe"}
+        )
+        assert r.json()["revision"] == 3
+        assert set(r.json()) == {"text", "session_id", "revision"}
+        assert "Contact support" in r.json()["text"] and "Subscribe" in r.json()["text"]
+
+        # Branch from revision 1: the update applies to that request, not the latest.
+        r = await ac.post(f"/sessions/{sid}/updates?revision=1", json={"cta_text": "Book"})
+        assert r.json()["revision"] == 4 and "Contact support" not in r.json()["text"]
+
+        r = await ac.get(f"/sessions/{sid}/preview?revision=2&fields=subject")
+        assert r.json()["revision"] == 2
+
+        r = await ac.post(f"/sessions/{sid}/deliver?revision=3&mode=draft")
+        assert r.status_code == 200
+        assert "Subscribe" in sent[-1]["text_body"]
+
+        assert (await ac.delete(f"/sessions/{sid}")).status_code == 200
+        assert (await ac.get(f"/sessions/{sid}/preview")).status_code == 404
+
+
+async def test_unknown_session_and_revision(anyio_backend: str) -> None:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        r = await ac.post("/sessions/nope/updates", json={"tone": "warm"})
+        assert r.status_code == 404
+        sid = (await ac.post("/sessions", json=BASE_REQ)).json()["session_id"]
+        assert (await ac.get(f"/sessions/{sid}/preview?revision=7")).status_code == 404
+        # A rejected update is not recorded as a revision.
+        r = await ac.post(f"/sessions/{sid}/updates?fields=bogus", json={"tone": "warm"})
+        assert r.status_code == 422
+        assert (await ac.get(f"/sessions/{sid}")).json()["revision"] == 1
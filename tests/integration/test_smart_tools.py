@@ -0,0 +1,39 @@
+from __future__ import annotations
+import httpx
+import pytest
+from httpx import ASGITransport
+
+from app.web.app import app
+
+pytest.importorskip("google.adk")  # adk_app imports its agent on package import
+
+from adk_app.tools import mail_tools, smart_tools
+
+pytestmark = [pytest.mark.anyio, pytest.mark.parametrize("anyio_backend", ["asyncio"])]
+
+
+async def test_smart_preview_reports_html_len_without_html(
+    anyio_backend: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+    monkeypatch.setattr(mail_tools, "_client", client)
+    monkeypatch.delenv("INCLUDE_HTML_IN_PREVIEW", raising=False)
+    out = await smart_tools.smart_preview({"email": "pat@example.com", "purpose": "welcome"})
+    assert out["ok"] is True
+    assert isinstance(out["html_len"], int) and out["html_len"] > 0
+    assert "html" not in out
+
+
+
+async def test_client_advertises_only_what_httpx_decodes(anyio_backend: str) -> None:
+    import importlib.util
+
+    def installed(*modules: str) -> bool:
+        return any(importlib.util.find_spec(m) is not None for m in modules)
+
+    codecs = mail_tools.HEADERS["Accept-Encoding"].split(", ")
+    assert codecs[-1] == "gzip"
+    assert ("zstd" in codecs) == installed("zstandard")
+    assert ("br" in codecs) == installed("brotli", "brotlicffi")
@@ -0,0 +1,62 @@
+from __future__ import annotations
+from pathlib import Path
+import json
+import os
+import pytest
+from app.config.settings import settings
+from app.templating import assets
+from app.templating.env import templates_version
+
+
+def _touch(p: Path, text: str) -> None:
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(text, encoding="utf-8")
+    st = p.stat()
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))  # beat coarse mtimes
+
+
+def test_watcher_swaps_changed_brands_and_templates(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "MAIL_AGENT_WARMUP", False)
+    brands, tpls = tmp_path / "brands", tmp_path / "tpl"
+    _touch(brands / "acme" / "brand.json", json.dumps({"name": "Acme"}))
+    _touch(tpls / "a.html.j2", "a")
+    watcher = assets.AssetWatcher(brands, tpls)
+    assert watcher.poll() is None
+
+    version, tpl_version = assets.asset_version(), templates_version()
+    _touch(brands / "acme" / "brand.json", json.dumps({"name": "Acme 2"}))
+    _touch(brands / "new" / "brand.json", json.dumps({"name": "New"}))
+    change = watcher.poll()
+    assert change is not None
+    assert change.brands == ("acme", "new") and not change.templates
+    assert assets.asset_version() == change.version == version + 1
+    assert templates_version() == tpl_version
+
+    (tpls / "a.html.j2").unlink()
+    change = watcher.poll()
+    assert change is not None and change.templates and change.brands == ()
+    assert templates_version() == tpl_version + 1
+    assert watcher.poll() is None
+
+
+def test_brand_edit_evicts_only_that_brand(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.templating.brand_bundle import load_brand_bundle
+
+    monkeypatch.setattr(settings, "MAIL_AGENT_WARMUP", True)
+    monkeypatch.setattr(settings, "MAIL_AGENT_BRAND_INDEX", "")
+    brands = tmp_path / "brands"
+    _touch(brands / "acme" / "brand.json", json.dumps({"name": "Acme"}))
+    _touch(brands / "other" / "brand.json", json.dumps({"name": "Other"}))
+    watcher = assets.AssetWatcher(brands, tmp_path / "tpl")
+    acme, other = load_brand_bundle("acme", brands), load_brand_bundle("other", brands)
+
+    _touch(brands / "acme" / "logo.png", "not watched")
+    assert watcher.poll() is None
+    _touch(brands / "acme" / "brand.json", json.dumps({"name": "Acme 2"}))
+    change = watcher.poll()
+    assert change is not None and change.brands == ("acme",)
+    assert load_brand_bundle("other", brands) is other
+    rewarmed = load_brand_bundle("acme", brands)
+    assert rewarmed is not acme and rewarmed.config.name == "Acme 2"
@@ -0,0 +1,34 @@
+from __future__ import annotations
+import threading
+import pytest
+from app.agents.draft_agent import DraftAgent
+from app.agents.types import DraftRequest, DraftResponse, Recipient
+
+pytestmark = [pytest.mark.anyio, pytest.mark.parametrize("anyio_backend", ["asyncio"])]
+
+
+def _req(name: str) -> DraftRequest:
+    recipient = Recipient(email=f"{name}@example.com", name=name)
+    return DraftRequest(recipient=recipient, purpose="welcome")
+
+
+class ThreadRecordingAgent(DraftAgent):
+    def __init__(self) -> None:
+        self.threads: set[int] = set()
+
+    def generate(self, req: DraftRequest) -> DraftResponse:
+        self.threads.add(threading.get_ident())
+        return super().generate(req)
+
+
+async def test_blocking_generate_runs_off_the_loop(anyio_backend: str) -> None:
+    agent = ThreadRecordingAgent()
+    draft = await agent.agenerate(_req("Pat"))
+    assert draft == DraftAgent().draft(_req("Pat"))
+    assert threading.get_ident() not in agent.threads
+
+
+async def test_agenerate_many_keeps_input_order(anyio_backend: str) -> None:
+    reqs = [_req(n) for n in ("Ann", "Bob", "Cy")]
+    drafts = await DraftAgent().agenerate_many(reqs)
+    assert drafts == [DraftAgent().draft(r) for r in reqs]
@@ -0,0 +1,45 @@
+from __future__ import annotations
+from pathlib import Path
+import json
+import pytest
+from app.templating.brand_bundle import load_brand_bundle
+
+
+def write_brand(tmp: Path, brand_id: str, data: dict[str, object]) -> Path:
+    d = tmp / "brands" / brand_id
+    d.mkdir(parents=True, exist_ok=True)
+    p = d / "brand.json"
+    p.write_text(json.dumps(data), encoding="utf-8")
+    return p
+
+
+def test_bundle_precompiles_snippets_and_resolves_cta(tmp_path: Path) -> None:
+    data: dict[str, object] = {
+        "name": "Acme",
+        "links": {"website": "https://acme.test/"},
+        "footer_html": "<p>© {{ brand.name }} • {{ subject }}</p>",
+    }
+    write_brand(tmp_path, "acme", data)
+    bundle = load_brand_bundle("acme", base_dir=tmp_path / "brands")
+    assert bundle.default_cta_url == "https://acme.test/"
+    assert bundle.signature is None
+    assert bundle.footer is not None
+    assert bundle.footer.render(brand=bundle.attrs, subject="Hi") == "<p>© Acme • Hi</p>"
+    assert load_brand_bundle("acme", base_dir=tmp_path / "brands") is bundle
+
+
+def test_bundle_snapshot_is_read_only(tmp_path: Path) -> None:
+    write_brand(tmp_path, "ro", {"name": "RO"})
+    attrs = load_brand_bundle("ro", base_dir=tmp_path / "brands").attrs
+    assert attrs.unsubscribe.required_for == ["newsletter", "outreach"]
+    with pytest.raises(AttributeError):
+        attrs.name = "Other"  # type: ignore[misc]
+
+
+def test_bundle_version_tracks_content(tmp_path: Path) -> None:
+    write_brand(tmp_path, "v1", {"name": "Same"})
+    write_brand(tmp_path, "v2", {"name": "Same"})
+    write_brand(tmp_path, "v3", {"name": "Different"})
+    base = tmp_path / "brands"
+    assert load_brand_bundle("v1", base).version == load_brand_bundle("v2", base).version
+    assert load_brand_bundle("v1", base).version != load_brand_bundle("v3", base).version
@@ -0,0 +1,113 @@
+from __future__ import annotations
+from pathlib import Path
+import json
+import os
+import pytest
+from app.config.settings import settings
+from app.templating import brand_bundle
+from app.templating.assets import AssetWatcher
+from app.templating.brand_bundle import BundleCache, build_brand_bundle
+from app.tools.brand_index import BrandIndex, build_brand_index, open_brand_index
+from app.tools.brand_loader import BrandNotFound, load_brand
+
+
+def _write(brands: Path, brand_id: str, data: dict[str, object]) -> None:
+    (brands / brand_id).mkdir(parents=True)
+    (brands / brand_id / "brand.json").write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_index_round_trips_validated_brands(tmp_path: Path) -> None:
+    brands = tmp_path / "brands"
+    for i in range(50):
+        _write(brands, f"tenant-{i}", {"name": f"Tenant {i}", "primary": "#123456"})
+    _write(brands, "broken", {"name": "Broken", "primary": "blue"})
+
+    count, errors = build_brand_index(tmp_path / "brands.idx", brands)
+    assert count == 50 and len(errors) == 1 and "broken" in errors[0]
+
+    index = BrandIndex(tmp_path / "brands.idx")
+    try:
+        assert len(index) == 50 and sorted(index.ids()) == sorted(f"tenant-{i}" for i in range(50))
+        assert index.get("tenant-7") == load_brand.__wrapped__("tenant-7", brands)
+        assert index.get("broken") is None and "nope" not in index
+    finally:
+        index.close()
+
+
+def test_bundles_come_from_index_and_cache_is_memory_bounded(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    brands = tmp_path / "brands"
+    _write(brands, "acme", {"name": "Acme"})
+    _write(brands, "zeta", {"name": "Zeta"})
+    build_brand_index(tmp_path / "brands.idx", brands)
+    monkeypatch.setattr(settings, "MAIL_AGENT_BRAND_INDEX", str(tmp_path / "brands.idx"))
+    index = open_brand_index()
+    assert index is not None and open_brand_index() is index
+
+    cfg = index.get("acme")
+    assert cfg is not None
+    one = brand_bundle._bundle_cost(build_brand_bundle("acme", cfg))
+    cache = BundleCache(max_bytes=one + one // 2)  # room for a single bundle
+    monkeypatch.setattr(brand_bundle, "bundle_cache", cache)
+    (tmp_path / "elsewhere").mkdir()
+    monkeypatch.chdir(tmp_path / "elsewhere")  # no brands/ here: must come from the index
+
+    assert brand_bundle.load_brand_bundle("acme").attrs.name == "Acme"
+    assert brand_bundle.load_brand_bundle("zeta").attrs.name == "Zeta"
+    brand_bundle.load_brand_bundle("zeta")
+    assert cache.stats() == {
+        "entries": 1,
+        "bytes": one,
+        "hits": 1,
+        "misses": 2,
+        "evictions": 1,
+    }
+
+
+def test_preview_runs_from_index_only(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.agents.types import DraftRequest, Recipient
+    from app.mail import workflow
+
+    brands = tmp_path / "brands"
+    _write(brands, "acme", {"name": "Acme", "footer_html": "<p>Acme Inc.</p>"})
+    build_brand_index(tmp_path / "brands.idx", brands)
+    monkeypatch.setattr(settings, "MAIL_AGENT_BRAND_INDEX", str(tmp_path / "brands.idx"))
+    monkeypatch.setattr(brand_bundle, "bundle_cache", BundleCache(max_bytes=1 << 20))
+    load_brand.cache_clear()
+    deploy = tmp_path / "deploy"  # templates but no brands/ tree: only the index knows acme
+    deploy.mkdir()
+    for shipped in ("templates", "build"):  # build/ may hold precompiled templates
+        if Path(shipped).exists():
+            (deploy / shipped).symlink_to(Path(shipped).resolve())
+    monkeypatch.chdir(deploy)
+
+    req = DraftRequest(
+        recipient=Recipient(email="pat@example.com", name="Pat"), purpose="welcome", brand_id="acme"
+    )
+    out = workflow.preview(req)
+    assert "Acme Inc." in out["html"] and out["subject"] and out["text"]
+
+
+def test_brand_edits_after_indexing_win(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    brands = Path("brands")
+    _write(brands, "acme", {"name": "Acme"})
+    _write(brands, "gone", {"name": "Gone"})
+    build_brand_index("brands.idx", brands)
+    monkeypatch.setattr(settings, "MAIL_AGENT_BRAND_INDEX", "brands.idx")
+    monkeypatch.setattr(brand_bundle, "bundle_cache", BundleCache(max_bytes=1 << 20))
+    monkeypatch.setattr(settings, "MAIL_AGENT_WARMUP", False)
+    load_brand.cache_clear()
+    assert brand_bundle.load_brand_bundle("acme").config.name == "Acme"
+    watcher = AssetWatcher(brands, tmp_path / "templates")
+
+    (brands / "acme" / "brand.json").write_text(json.dumps({"name": "Acme 2"}), "utf-8")
+    index_mtime = (tmp_path / "brands.idx").stat().st_mtime_ns
+    os.utime(brands / "acme" / "brand.json", ns=(index_mtime + 10**9, index_mtime + 10**9))
+    (brands / "gone" / "brand.json").unlink()
+    change = watcher.poll()
+    assert change is not None and change.brands == ("acme", "gone")
+    assert brand_bundle.load_brand_bundle("acme").config.name == "Acme 2"
+    with pytest.raises(BrandNotFound):
+        brand_bundle.load_brand_bundle("gone")
@@ -0,0 +1,62 @@
+from __future__ import annotations
+from typing import AsyncIterator
+import gzip
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.requests import Request
+
+from app.web.compression import CompressionMiddleware, negotiate
+
+pytestmark = [pytest.mark.anyio, pytest.mark.parametrize("anyio_backend", ["asyncio"])]
+
+OFFERED = ["zstd", "br", "gzip"]
+BIG = {"html": "<td style='padding:0'>x</td>" * 200}
+
+
+def test_negotiate_honours_quality_and_server_order(anyio_backend: str) -> None:
+    assert negotiate("gzip, deflate, br, zstd", OFFERED) == "zstd"
+    assert negotiate("gzip;q=1, br;q=0.5", OFFERED) == "gzip"
+    assert negotiate("*;q=0.1, zstd;q=0", OFFERED) == "br"
+    assert negotiate("identity, deflate", OFFERED) is None
+    assert negotiate("gzip;q=0", ["gzip"]) is None
+
+
+async def _big(_request: Request) -> JSONResponse:
+    return JSONResponse(BIG, headers={"ETag": '"abc"'})
+
+
+async def _small(_request: Request) -> JSONResponse:
+    return JSONResponse({"status": "ok"})
+
+
+async def _stream(_request: Request) -> StreamingResponse:
+    async def lines() -> AsyncIterator[bytes]:
+        for i in range(3):
+            yield b'{"i": %d}\n' % i * 200
+
+    return StreamingResponse(lines(), media_type="application/json")
+
+
+APP = Starlette(routes=[Route("/big", _big), Route("/small", _small), Route("/stream", _stream)])
+APP.add_middleware(CompressionMiddleware, minimum_size=1024, codecs={"gzip": gzip.compress})
+
+
+async def test_only_large_single_body_json_is_compressed(anyio_backend: str) -> None:
+    async with AsyncClient(transport=ASGITransport(app=APP), base_url="http://test") as ac:
+        r = await ac.get("/big", headers={"Accept-Encoding": "gzip"})
+        assert r.headers["content-encoding"] == "gzip"
+        assert int(r.headers["content-length"]) < len(r.content) / 5
+        assert r.json() == BIG  # decoded transparently
+        assert r.headers["etag"] == 'W/"abc"' and r.headers["vary"] == "Accept-Encoding"
+
+        r = await ac.get("/big", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in r.headers and r.headers["etag"] == '"abc"'
+
+        r = await ac.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in r.headers
+
+        r = await ac.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in r.headers and r.text.count("\n") == 600
@@ -0,0 +1,72 @@
+from __future__ import annotations
+import asyncio
+import threading
+import pytest
+from app.mail.executor import CpuExecutor, Overloaded
+
+pytestmark = [pytest.mark.anyio, pytest.mark.parametrize("anyio_backend", ["asyncio"])]
+
+
+async def test_admission_is_bounded_and_observable(anyio_backend: str) -> None:
+    executor = CpuExecutor(workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        jobs = [asyncio.create_task(executor.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        stats = executor.stats()
+        assert (stats["in_flight"], stats["queued"]) == (1, 1)
+
+        with pytest.raises(Overloaded) as exc:
+            await executor.run(sum, [1, 2])
+        assert exc.value.retry_after >= 1 and executor.stats()["rejected"] == 1
+
+        release.set()
+        assert await asyncio.gather(*jobs) == [True, True]
+        assert await executor.run(sum, [1, 2]) == 3
+        stats = executor.stats()
+        assert (stats["in_flight"], stats["queued"], stats["completed"]) == (0, 0, 3)
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+async def test_cancelled_queued_job_frees_its_slot(anyio_backend: str) -> None:
+    executor = CpuExecutor(workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        running = asyncio.create_task(executor.run(release.wait, 5))
+        queued = asyncio.create_task(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        await asyncio.sleep(0.01)
+        assert executor.stats()["queued"] == 0
+        release.set()
+        await running
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+async def test_brand_miss_resolves_preview_key_off_the_loop(
+    anyio_backend: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from app.agents.types import DraftRequest, Recipient
+    from app.mail import workflow
+    from app.templating import brand_bundle
+
+    threads: list[int] = []
+    real_key = workflow.preview_key
+
+    def recording_key(req: DraftRequest) -> str:
+        threads.append(threading.get_ident())
+        return real_key(req)
+
+    monkeypatch.setattr(workflow, "preview_key", recording_key)
+    monkeypatch.setattr(brand_bundle, "bundle_cache", brand_bundle.BundleCache(1 << 20))
+    req = DraftRequest(recipient=Recipient(email="pat@example.com"), purpose="welcome")
+    loop_thread = threading.get_ident()
+
+    first = await workflow.apreview_key(req)  # bundle not compiled yet: worker thread
+    assert threads[-1] != loop_thread
+    assert await workflow.apreview_key(req) == first  # compiled: stays on the loop
+    assert threads[-1] == loop_thread
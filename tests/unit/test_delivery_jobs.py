@@ -0,0 +1,106 @@
+from __future__ import annotations
+from typing import Any, Iterator
+import threading
+
+import pytest
+
+from app.agents.types import DraftRequest, Recipient
+from app.mail.executor import Overloaded
+from app.mail.jobs import DeliveryJobs
+import app.mail.workflow as wf  # for monkeypatching
+
+
+def _req(email: str) -> DraftRequest:
+    return DraftRequest(recipient=Recipient(email=email), purpose="welcome")
+
+
+@pytest.fixture
+def jobs() -> Iterator[DeliveryJobs]:
+    runner = DeliveryJobs(workers=2, max_jobs=2, max_items=10, ttl_s=60)
+    yield runner
+    runner.shutdown()
+
+
+def test_job_delivers_every_item_and_reuses_gmail(
+    jobs: DeliveryJobs, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    reuse: set[int] = set()
+
+    def fake_send(**kwargs: Any) -> dict[str, Any]:
+        reuse.add(id(kwargs["reuse"]))
+        if kwargs["to"].startswith("bad"):
+            raise RuntimeError("rejected")
+        return {"status": "draft", "id": kwargs["to"], "labels_applied": []}
+
+    monkeypatch.setattr(wf, "draft_or_send_message", fake_send, raising=False)
+    emails = ["a@example.com", "bad@example.com", "c@example.com"]
+    job = jobs.submit([_req(e) for e in emails])
+    assert job.wait(5)
+
+    snap = job.snapshot()
+    assert snap["status"] == "done" and snap["finished"] is not None
+    assert snap["counts"] == {"queued": 0, "running": 0, "done": 2, "failed": 1}
+    assert [i["status"] for i in snap["items"]] == ["done", "failed", "done"]
+    assert snap["items"][0]["result"]["to"] == "a@example.com"
+    assert "rejected" in snap["items"][1]["error"]
+    assert len(reuse) == 1  # one GmailReuse for the whole job
+
+
+def test_limits(jobs: DeliveryJobs, monkeypatch: pytest.MonkeyPatch) -> None:
+    release = threading.Event()
+
+    def slow_send(**kwargs: Any) -> dict[str, Any]:
+        release.wait(5)
+        return {"status": "draft", "id": "m", "labels_applied": []}
+
+    monkeypatch.setattr(wf, "draft_or_send_message", slow_send, raising=False)
+    with pytest.raises(ValueError):
+        jobs.submit([_req("a@example.com")] * 11)
+    first = jobs.submit([_req("a@example.com")])
+    second = jobs.submit([_req("b@example.com")])
+    with pytest.raises(Overloaded):
+        jobs.submit([_req("c@example.com")])
+    release.set()
+    assert first.wait(5) and second.wait(5)
+    # Finished jobs make room for new ones, oldest first.
+    jobs.submit([])
+    with pytest.raises(KeyError):
+        jobs.get(first.job_id)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("anyio_backend", ["asyncio"])
+async def test_events_end_with_done(
+    anyio_backend: str, jobs: DeliveryJobs, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def fake_send(**kwargs: Any) -> dict[str, Any]:
+        return {"status": "draft", "id": "m", "labels_applied": []}
+
+    monkeypatch.setattr(wf, "draft_or_send_message", fake_send, raising=False)
+    job = jobs.submit([_req(f"u{i}@example.com") for i in range(5)])
+    events = [e async for e in job.events()]
+    assert sorted(data["index"] for name, data in events if name == "item") == list(range(5))
+    assert events[-2][0] == "progress" and events[-2][1]["counts"]["done"] == 5
+    assert events[-1][0] == "done" and events[-1][1]["status"] == "done"
+
+
+def test_shutdown_fails_items_not_started(monkeypatch: pytest.MonkeyPatch) -> None:
+    started, release = threading.Event(), threading.Event()
+
+    def slow_send(**kwargs: Any) -> dict[str, Any]:
+        started.set()
+        release.wait(5)
+        return {"status": "draft", "id": "m", "labels_applied": []}
+
+    monkeypatch.setattr(wf, "draft_or_send_message", slow_send, raising=False)
+    runner = DeliveryJobs(workers=1, max_jobs=1, max_items=10, ttl_s=60)
+    job = runner.submit([_req(f"u{i}@example.com") for i in range(3)])
+    assert started.wait(5)
+    threading.Timer(0.05, release.set).start()
+    runner.shutdown()
+
+    assert job.wait(0)
+    snap = job.snapshot()
+    assert snap["status"] == "done"
+    assert snap["counts"] == {"queued": 0, "running": 0, "done": 1, "failed": 2}
+    assert all("shut down" in item["error"] for item in snap["items"][1:])
@@ -0,0 +1,72 @@
+from __future__ import annotations
+from typing import Any
+import pytest
+from app.agents.interpret import (
+    QA_RESPONSIBILITIES,
+    InterpretCache,
+    interpret_instructions,
+    normalize_purpose,
+)
+
+
+@pytest.mark.parametrize(
+    "instr, expected",
+    [
+        (
+            "add bullets: Book a demo; See pricing; set cta text: Start trial; "
+            "set cta url: https://coderoad.com/start",
+            {
+                "bullets_add": ["Book a demo", "See pricing", "set cta text: Start trial",
+                                "set cta url: https://coderoad.com/start"],
+                "cta_text": "Start",
+                "cta_url": "https://coderoad.com/start",
+            },
+        ),
+        ("replace bullets: One, Two; remove cta",
+         {"bullets_replace": ["One", "Two", "remove cta"], "cta_text": "", "cta_url": ""}),
+        ("a little more friendly", {"tone": "warm", "long_form": True}),
+        ("make it short, more professional",
+         {"tone": "professional", "long_form": False}),
+        ("this is for a QA engineer", {"bullets_replace": QA_RESPONSIBILITIES}),
+        ("subjectone: calm", {"tone": "calm", "long_form": True}),  # keywords may overlap
+        ("Looks great, send it", {}),
+    ],
+)  # fmt: skip
+def test_interpret_instructions(instr: str, expected: dict[str, Any]) -> None:
+    assert interpret_instructions(instr) == expected
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("", "welcome"),
+        ("Product updates", "newsletter"),  # "updates" outranks notice's "update"
+        ("policy update", "notice"),
+        ("cold intro promo", "promo"),  # earlier category wins regardless of position
+        ("planned downtime", "maintenance"),
+        ("Quarterly Review", "quarterly review"),
+    ],
+)
+def test_normalize_purpose(raw: str, expected: str) -> None:
+    assert normalize_purpose(raw) == expected
+
+
+def test_interpret_cache_folds_keyword_only_instructions() -> None:
+    cache = InterpretCache(maxsize=8)
+    first = cache.get_or_interpret("make it more  helpful")
+    assert cache.get_or_interpret(" Make it MORE\thelpful ") is first
+    assert cache.stats() == {"entries": 3, "hits": 1, "misses": 1}
+    assert dict(first) == {
+        k: tuple(v) if isinstance(v, list) else v
+        for k, v in interpret_instructions("make it more helpful").items()
+    }
+    with pytest.raises(TypeError):
+        first["tone"] = "casual"  # type: ignore[index]
+
+
+def test_interpret_cache_keys_verbatim_instructions_exactly() -> None:
+    cache = InterpretCache(maxsize=8)
+    assert cache.get_or_interpret("subject: Hello")["subject"] == "Hello"
+    assert cache.get_or_interpret("SUBJECT: HELLO")["subject"] == "HELLO"
+    assert cache.get_or_interpret("subject: Hello ")["subject"] == "Hello"
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 2}
@@ -0,0 +1,66 @@
+from __future__ import annotations
+import threading
+
+import pytest
+
+from app.metrics import BUCKETS, Registry, render_prometheus
+
+
+def test_shards_sum_across_threads() -> None:
+    reg = Registry()
+
+    def work() -> None:
+        for _ in range(1000):
+            reg.observe("stage", 0.002)
+            reg.inc("things", part="a")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    hist, counters = reg.snapshot()
+    assert sum(hist["stage"][:-1]) == 4000
+    assert hist["stage"][-1] == pytest.approx(8.0)
+    assert counters[("things", (("part", "a"),))] == 4000
+
+
+def test_timed_records_errors_and_disabled_is_a_no_op() -> None:
+    reg = Registry()
+
+    @reg.timed("boom")
+    def boom() -> None:
+        raise KeyError("x")
+
+    with pytest.raises(KeyError):
+        boom()
+    with pytest.raises(ValueError), reg.timer("ctx"):
+        raise ValueError("y")
+    _, counters = reg.snapshot()
+    assert counters[("errors", (("stage", "boom"), ("type", "KeyError")))] == 1
+    assert counters[("errors", (("stage", "ctx"), ("type", "ValueError")))] == 1
+
+    off = Registry(enabled=False)
+
+    def fn() -> int:
+        return 1
+
+    assert off.timed("fn")(fn) is fn
+    off.observe("fn", 1.0)
+    assert off.snapshot() == ({}, {})
+
+
+def test_prometheus_text_is_cumulative() -> None:
+    reg = Registry()
+    reg.observe("render", BUCKETS[0])  # bounds are inclusive
+    reg.observe("render", 0.003)
+    reg.observe("render", 99.0)
+    reg.inc("rendered_bytes", 10, part="html")
+    lines = render_prometheus(reg).splitlines()
+    first = f'mail_agent_stage_seconds_bucket{{stage="render",le="{BUCKETS[0]!r}"}} 1'
+    assert first in lines
+    assert 'mail_agent_stage_seconds_bucket{stage="render",le="0.005"} 2' in lines
+    assert 'mail_agent_stage_seconds_bucket{stage="render",le="+Inf"} 3' in lines
+    assert 'mail_agent_stage_seconds_count{stage="render"} 3' in lines
+    assert 'mail_agent_rendered_bytes_total{part="html"} 10' in lines
+    assert "# TYPE mail_agent_cache_preview_hits_total counter" in lines
@@ -0,0 +1,104 @@
+from __future__ import annotations
+from typing import Any, AsyncIterator, List
+import json
+
+import pytest
+
+from app.agents.types import DraftRequest, Recipient
+from app.mail.batch import BatchInputError, iter_json_items, preview_batch
+from app.mail.workflow import preview, preview_many
+
+# Async tests run with anyio, pinned to asyncio (avoid Trio deps)
+on_asyncio = [pytest.mark.anyio, pytest.mark.parametrize("anyio_backend", ["asyncio"])]
+
+
+async def _chunks(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+async def _items(data: bytes, size: int = 7, max_item_bytes: int = 4096) -> List[Any]:
+    return [x async for x in iter_json_items(_chunks(data, size), max_item_bytes)]
+
+
+def _req(brand: str = "default", name: str = "Pat") -> DraftRequest:
+    return DraftRequest(
+        recipient=Recipient(email="pat@example.com", name=name), purpose="welcome", brand_id=brand
+    )
+
+
+@pytest.mark.parametrize("size", [1, 3, 64])
+@on_asyncio[0]
+@on_asyncio[1]
+async def test_items_from_ndjson_and_array_in_any_chunking(anyio_backend: str, size: int) -> None:
+    objs = [{"a": 1}, {"b": "zoë ✓"}, {"c": [1, {"d": "}"}]}]
+    ndjson = "\n".join(json.dumps(o, ensure_ascii=False) for o in objs).encode() + b"\n"
+    array = b" [\n  " + ",\n  ".join(json.dumps(o, ensure_ascii=False) for o in objs).encode()
+    assert await _items(ndjson, size) == objs
+    assert await _items(array + b"\n]", size) == objs
+
+
+@on_asyncio[0]
+@on_asyncio[1]
+async def test_items_stop_at_invalid_json(anyio_backend: str) -> None:
+    got = await _items(b'{"a": 1}\n{"b": \n{"c": 3}\n')
+    assert got[0] == {"a": 1}
+    assert isinstance(got[1], BatchInputError) and len(got) == 2
+
+    got = await _items(b'[{"a": 1}, 2]')
+    assert isinstance(got[1], BatchInputError)
+
+    got = await _items(b'{"a": "' + b"x" * 100 + b'"}', max_item_bytes=32)
+    assert len(got) == 1 and isinstance(got[0], BatchInputError)
+
+
+@on_asyncio[0]
+@on_asyncio[1]
+async def test_syntax_error_reported_at_its_newline(anyio_backend: str) -> None:
+    async def source() -> AsyncIterator[bytes]:
+        yield b'{"a": bad}\n{"b": 1'
+        raise AssertionError("read past the bad line")
+
+    for array in (False, True):
+        data = [x async for x in iter_json_items(_prefixed(source(), array), 4096)]
+        assert len(data) == 1 and isinstance(data[0], BatchInputError)
+
+
+async def _prefixed(chunks: AsyncIterator[bytes], array: bool) -> AsyncIterator[bytes]:
+    if array:
+        yield b"["
+    async for chunk in chunks:
+        yield chunk
+
+
+def test_preview_many_matches_preview_and_isolates_failures() -> None:
+    reqs = [_req(name="Ada"), _req(brand="no-such-brand"), _req(name="Lin")]
+    out = preview_many(reqs, ["subject", "html", "text"])
+    assert isinstance(out[1], Exception)
+    for i in (0, 2):
+        single = preview(reqs[i], ["subject", "html", "text"])
+        assert {k: out[i][k] for k in ("subject", "html", "text")} == {  # type: ignore[index]
+            k: single[k] for k in ("subject", "html", "text")
+        }
+
+
+@on_asyncio[0]
+@on_asyncio[1]
+async def test_preview_batch_reports_every_index(anyio_backend: str) -> None:
+    body = b"\n".join(
+        [
+            _req(name="Ada").model_dump_json().encode(),
+            b'{"purpose": "welcome"}',
+            _req(brand="no-such-brand").model_dump_json().encode(),
+            _req(name="Lin").model_dump_json().encode(),
+        ]
+    )
+    lines = [
+        json.loads(line)
+        async for line in preview_batch(_chunks(body, 50), ["subject"], chunk_size=2, parallel=2)
+    ]
+    by_index = {line["index"]: line for line in lines}
+    assert sorted(by_index) == [0, 1, 2, 3]
+    assert by_index[1]["error"]["status"] == 422
+    assert by_index[2]["error"]["status"] == 404
+    assert by_index[0]["preview"]["subject"] and by_index[3]["preview"]["subject"]
@@ -0,0 +1,63 @@
+from __future__ import annotations
+import pytest
+from app.agents.types import DraftRequest, Recipient
+from app.mail import workflow
+from app.mail.workflow import CachedPreview, PreviewCache
+from app.templating.env import invalidate_templates
+
+
+def _req(**ctx: object) -> DraftRequest:
+    return DraftRequest(
+        recipient=Recipient(email="pat@example.com", name="Pat"), purpose="welcome", context=ctx
+    )
+
+
+def test_identical_requests_are_served_from_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = PreviewCache(max_entries=8, max_bytes=1 << 20)
+    monkeypatch.setattr(workflow, "preview_cache", cache)
+    first = workflow.preview(_req(cta_text="Go"))
+    second = workflow.preview(_req(cta_text="Go"))
+    assert first == second
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    workflow.preview(_req(cta_text="Other"))
+    assert cache.stats()["misses"] == 2
+
+
+def test_key_is_canonical_and_tracks_template_version() -> None:
+    a = workflow.preview_key(_req(a=1, b=2))
+    assert a == workflow.preview_key(_req(b=2, a=1))
+    invalidate_templates()
+    assert workflow.preview_key(_req(a=1, b=2)) != a
+
+
+def test_lru_eviction_respects_entry_and_byte_bounds() -> None:
+    cache = PreviewCache(max_entries=2, max_bytes=25)
+    entry = CachedPreview("s", "h" * 5, "t" * 4, {})  # size 10
+    cache.put("a", entry)
+    cache.put("b", entry)
+    assert cache.get("a") is entry  # "b" becomes least recently used
+    cache.put("c", entry)
+    assert cache.get("b") is None
+    assert cache.stats()["entries"] == 2 and cache.stats()["evictions"] == 1
+    cache.put("big", CachedPreview("s", "h" * 30, "", {}))
+    assert cache.get("big") is None
+
+
+def test_projection_skips_html_until_it_is_requested(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(workflow, "preview_cache", PreviewCache(8, 1 << 20))
+    full_render = workflow.render
+    calls: list[int] = []
+    monkeypatch.setattr(workflow, "render", lambda r, d: calls.append(1) or full_render(r, d))
+
+    lean = workflow.preview(_req(cta_text="Go"), fields=["subject", "text", "word_count"])
+    assert set(lean) == {"subject", "text", "word_count"} and not calls
+
+    full = workflow.preview(_req(cta_text="Go"), fields=["text", "html", "html_len"])
+    assert calls == [1] and full["text"] == lean["text"]
+    assert full["html_len"] == len(full["html"]) > 0
+    assert lean["word_count"] == len(lean["text"].split())
+
+
+def test_unknown_projection_fields_are_rejected() -> None:
+    with pytest.raises(ValueError, match="bogus"):
+        workflow.preview(_req(), fields=["subject", "bogus"])
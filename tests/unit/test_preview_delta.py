@@ -0,0 +1,79 @@
+from __future__ import annotations
+import pytest
+from app.agents.types import DraftRequest, Recipient
+from app.mail import workflow
+from app.mail.delta import DeltaBases, apply_delta, content_hash, diff_content
+
+
+def _req(**ctx: object) -> DraftRequest:
+    return DraftRequest(
+        recipient=Recipient(email="pat@example.com", name="Pat"), purpose="welcome", context=ctx
+    )
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        (
+            {"subject": "a", "text": "x\ny\nz", "html": "<p>x</p><p>y</p>"},
+            {"subject": "b", "text": "x\nY\nz\nw", "html": "<p>x</p><p>Y</p><br>"},
+        ),
+        ({"text": "same"}, {"text": "same"}),
+        ({"text": "only text"}, {"text": "only text", "html": "<p>new</p>"}),
+        ({"text": "a\r\nb\n"}, {"text": "a\r\nc"}),
+        ({"text": "t", "html": "<p>old</p>"}, {"text": "t"}),
+    ],
+)
+def test_apply_delta_round_trips(old: dict[str, str], new: dict[str, str]) -> None:
+    assert apply_delta(old, diff_content(old, new)) == new
+
+
+def test_workflow_returns_delta_against_known_base(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(workflow, "delta_bases", DeltaBases(8, 1 << 20))
+    fields = ["subject", "text", "html", "hash"]
+    first = workflow.preview(_req(cta_text="Go", bullets=["One", "Two"]), fields=fields)
+    content = {k: first[k] for k in ("subject", "text", "html")}
+    assert first["hash"] == content_hash(content)
+
+    second = workflow.preview(_req(cta_text="Go", bullets=["One", "Three"]), since=first["hash"])
+    assert second["base"] == first["hash"] and "html" not in second and "text" not in second
+    full = workflow.preview(_req(cta_text="Go", bullets=["One", "Three"]))
+    assert apply_delta(content, second["delta"]) == {k: full[k] for k in content}
+    assert second["hash"] == full["hash"]
+
+    unknown = workflow.preview(_req(cta_text="Go"), since="not-a-known-hash")
+    assert "delta" not in unknown and "html" in unknown
+
+
+def test_default_previews_keep_no_delta_base(monkeypatch: pytest.MonkeyPatch) -> None:
+    bases = DeltaBases(8, 1 << 20)
+    monkeypatch.setattr(workflow, "delta_bases", bases)
+    workflow.preview(_req(cta_text="Go"))
+    assert bases.stats()["entries"] == 0
+    workflow.preview(_req(cta_text="Go"), fields=["subject", "hash"])
+    assert bases.stats()["entries"] == 1
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        ({"subject": "a", "text": "x\ny", "html": "<p>x</p>"}, {"subject": "a", "text": "x\nz"}),
+        ({"text": "one"}, {"text": "one", "html": "<b>two</b><i>three</i>"}),
+    ],
+)
+def test_adk_apply_delta_matches_server(old: dict[str, str], new: dict[str, str]) -> None:
+    client = pytest.importorskip("adk_app.tools.delta")
+    delta = diff_content(old, new)
+    assert client.apply_delta(old, delta) == apply_delta(old, delta) == new
+
+
+def test_etag_tells_delta_from_full_answer(monkeypatch: pytest.MonkeyPatch) -> None:
+    bases = DeltaBases(8, 1 << 20)
+    monkeypatch.setattr(workflow, "delta_bases", bases)
+    key = workflow.preview_key(_req(cta_text="Go"))
+    full = workflow.preview_etag(key, None, "base-hash")  # base not held: full fields
+    bases.put("base-hash", {"text": "old"})
+    delta = workflow.preview_etag(key, None, "base-hash")
+    assert full != delta
+    assert workflow.preview_etag(key, None, "base-hash", delta=False) == full
+    assert bases.stats()["hits"] == 0  # the lookup is a peek
@@ -0,0 +1,95 @@
+from __future__ import annotations
+from typing import List, Sequence
+import asyncio
+import pytest
+from app.agents.draft_agent import DraftAgent
+from app.agents.providers import chain as chain_module
+from app.agents.providers.chain import HedgedProviderChain
+from app.agents.providers.fake_provider import SlowFakeProvider
+from app.agents.providers.seed_provider import SeedProvider
+from app.agents.types import DraftRequest, DraftResponse, Recipient
+from app.config.settings import settings
+import app.mail.workflow as wf  # for monkeypatching
+
+pytestmark = [pytest.mark.anyio, pytest.mark.parametrize("anyio_backend", ["asyncio"])]
+
+REQ = DraftRequest(recipient=Recipient(email="pat@example.com", name="Pat"), purpose="welcome")
+
+
+class Failing(SeedProvider):
+    async def agenerate(self, req: DraftRequest) -> DraftResponse:
+        raise RuntimeError("upstream 503")
+
+    async def agenerate_many(self, reqs: Sequence[DraftRequest]) -> List[DraftResponse]:
+        raise RuntimeError("upstream 503")
+
+
+async def test_fast_primary_serves(anyio_backend: str) -> None:
+    chain = HedgedProviderChain(SlowFakeProvider(0.0, 0.0), deadline_s=1.0, hedge_after_s=0.5)
+    draft, served = await chain.agenerate_traced(REQ)
+    assert served.path == "primary" and draft == SeedProvider().generate(REQ)
+
+
+async def test_slow_primary_is_hedged(anyio_backend: str) -> None:
+    chain = HedgedProviderChain(
+        SlowFakeProvider(5.0, 0.0),
+        hedge=SlowFakeProvider(0.0, 0.0),
+        deadline_s=1.0,
+        hedge_after_s=0.02,
+    )
+    _, served = await chain.agenerate_traced(REQ)
+    assert served.path == "hedge" and served.latency_s < 0.5
+
+
+async def test_deadline_falls_back_to_deterministic_draft(anyio_backend: str) -> None:
+    chain = HedgedProviderChain(
+        SlowFakeProvider(5.0, 0.0), fallback=DraftAgent(), deadline_s=0.05, hedge_after_s=0.01
+    )
+    draft, served = await chain.agenerate_traced(REQ)
+    assert served == served._replace(path="fallback", reason="deadline")
+    assert served.latency_s < 0.5 and draft == DraftAgent().draft(REQ)
+    assert chain.stats() == {"primary": 0, "hedge": 0, "fallback": 1}
+
+
+async def test_errors_hedge_immediately_then_fall_back(anyio_backend: str) -> None:
+    chain = HedgedProviderChain(Failing(), deadline_s=5.0, hedge_after_s=1.0)
+    _, served = await chain.agenerate_traced(REQ)
+    assert served.path == "fallback" and served.latency_s < 0.5
+    assert served.reason is not None and "primary" in served.reason and "hedge" in served.reason
+
+
+class Stalled(SeedProvider):
+    async def agenerate(self, req: DraftRequest) -> DraftResponse:
+        await asyncio.sleep(5)
+        return self.generate(req)
+
+
+def _use_provider(monkeypatch: pytest.MonkeyPatch, spec: str) -> wf.PreviewCache:
+    monkeypatch.setattr(settings, "MAIL_AGENT_DRAFT_PROVIDER", spec)
+    monkeypatch.setattr(settings, "MAIL_AGENT_DRAFT_DEADLINE_S", 0.05)
+    monkeypatch.setattr(settings, "MAIL_AGENT_DRAFT_HEDGE_AFTER_S", 0.0)
+    monkeypatch.setattr(chain_module, "_chain", None)
+    cache = wf.PreviewCache(max_entries=8, max_bytes=1 << 20)
+    monkeypatch.setattr(wf, "preview_cache", cache)
+    return cache
+
+
+async def test_previews_draft_through_configured_provider(
+    anyio_backend: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = _use_provider(monkeypatch, "app.agents.providers.seed_provider:SeedProvider")
+    out = await wf.apreview(REQ, fields=["subject", "text"])
+    assert out["subject"] == SeedProvider().generate(REQ).subject
+    assert cache.stats()["entries"] == 1
+    sync = await asyncio.to_thread(wf.preview, REQ.model_copy(update={"purpose": "update"}))
+    assert sync["subject"] == "Update: For Pat" and cache.stats()["entries"] == 2
+
+
+async def test_fallback_previews_are_not_cached(
+    anyio_backend: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = _use_provider(monkeypatch, f"{__name__}:Stalled")
+    out = await wf.apreview(REQ, fields=["subject", "text"])
+    assert out["subject"] == DraftAgent().draft(REQ).subject
+    assert cache.stats()["entries"] == 0
+    assert chain_module.get_draft_chain() is not None
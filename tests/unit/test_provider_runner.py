@@ -0,0 +1,46 @@
+from __future__ import annotations
+from typing import List, Sequence
+import asyncio
+import pytest
+from app.agents.providers.fake_provider import SlowFakeProvider
+from app.agents.providers.runner import ProviderRunner
+from app.agents.providers.seed_provider import SeedProvider
+from app.agents.types import DraftRequest, DraftResponse, Recipient
+
+pytestmark = [pytest.mark.anyio, pytest.mark.parametrize("anyio_backend", ["asyncio"])]
+
+
+def _reqs(n: int) -> List[DraftRequest]:
+    return [
+        DraftRequest(
+            recipient=Recipient(email=f"u{i}@example.com", name=f"U{i}"), purpose="welcome"
+        )
+        for i in range(n)
+    ]
+
+
+async def test_seed_provider_async_matches_sync(anyio_backend: str) -> None:
+    seed, reqs = SeedProvider(), _reqs(3)
+    assert await seed.agenerate(reqs[0]) == seed.generate(reqs[0])
+    assert await seed.agenerate_many(reqs) == [seed.generate(r) for r in reqs]
+
+
+async def test_runner_batches_and_bounds_in_flight(anyio_backend: str) -> None:
+    provider = SlowFakeProvider(latency_s=0.01, per_item_s=0.0)
+    runner = ProviderRunner(provider, max_in_flight=2, max_batch=10, batch_window_s=0.005)
+    reqs = _reqs(45)
+    out = await runner.generate_many(reqs)
+    assert out == [SeedProvider().generate(r) for r in reqs]
+    stats = runner.stats()
+    assert stats["batches"] == provider.calls == 5
+    assert stats["peak_in_flight"] == 2 and stats["in_flight"] == 0
+
+
+async def test_batch_failure_fails_each_request(anyio_backend: str) -> None:
+    class Broken(SeedProvider):
+        async def agenerate_many(self, reqs: Sequence[DraftRequest]) -> List[DraftResponse]:
+            raise RuntimeError("model unavailable")
+
+    runner = ProviderRunner(Broken(), batch_window_s=0.0)
+    results = await asyncio.gather(*(runner.generate(r) for r in _reqs(3)), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,33 @@
+from __future__ import annotations
+import pytest
+from app.agents.draft_agent import DraftAgent
+from app.agents.types import DraftRequest, Recipient
+from app.mail.render_engine import RenderEngine, RenderQueueFull
+from app.mail.workflow import render_local
+
+REQ = DraftRequest(
+    recipient=Recipient(email="pat@example.com", name="Pat"),
+    purpose="welcome",
+    context={"cta_text": "Visit CodeRoad", "cta_url": "https://coderoad.com/"},
+)
+
+
+def test_process_pool_render_matches_in_process() -> None:
+    draft = DraftAgent().draft(REQ)
+    engine = RenderEngine(processes=1, max_queue=0)  # 0: no queue, the worker still runs
+    try:
+        assert engine.render(REQ, draft) == render_local(REQ, draft)
+    finally:
+        engine.shutdown()
+
+
+def test_render_rejected_when_queue_is_full() -> None:
+    engine = RenderEngine(processes=1, max_queue=1, queue_timeout=0)
+    try:
+        # Occupy the worker and the single queue slot.
+        for _ in range(2):
+            assert engine._slots.acquire(blocking=False)
+        with pytest.raises(RenderQueueFull):
+            engine.render(REQ, DraftAgent().draft(REQ))
+    finally:
+        engine.shutdown()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+from typing import Any
+import pytest
+from app.config.settings import settings
+from app.templating import render
+from app.templating.brand_bundle import BrandBundle, build_brand_bundle
+from app.tools.brand_loader import BrandConfig
+
+FOOTERS = [
+    "<p>© {{ brand.name }} • {{ subject }}</p>",
+    "<p>Acme</p>\n<p><a href='https://acme.test/?a=1&b=2'>Site</a></p>",
+    "<p>Unclosed © {{ brand.name }}",
+    "plain text footer",
+]
+
+
+def _use_brand(monkeypatch: pytest.MonkeyPatch, footer: str) -> BrandBundle:
+    cfg = BrandConfig(
+        name="Acme",
+        footer_html=footer,
+        unsubscribe={"required_for": ["newsletter"], "url": "https://acme.test/u"},
+    )
+    bundle = build_brand_bundle("acme-fragments", cfg)
+    monkeypatch.setattr(render, "load_brand_bundle", lambda brand_id: bundle)
+    return bundle
+
+
+def _render(**variables: Any) -> tuple[str, str]:
+    return render.render_generic_email(
+        subject=str(variables.pop("subject", "Hello")),
+        body_text="Hi Pat,\n\nThanks for joining.",
+        brand_id="acme-fragments",
+        purpose=str(variables.pop("purpose", "welcome")),
+        variables=variables,
+    )
+
+
+@pytest.mark.parametrize("footer", FOOTERS)
+@pytest.mark.parametrize("purpose", ["welcome", "newsletter"])
+def test_footer_fragment_splice_matches_full_inlining(
+    footer: str, purpose: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _use_brand(monkeypatch, footer)
+    monkeypatch.setattr(settings, "MAIL_AGENT_INLINE_MODE", "full")
+    expected = _render(purpose=purpose, cta_text="Go")
+    monkeypatch.setattr(settings, "MAIL_AGENT_INLINE_MODE", "skeleton")
+    assert _render(purpose=purpose, cta_text="Go") == expected
+
+
+def test_iteration_recomputes_only_changed_fragments(monkeypatch: pytest.MonkeyPatch) -> None:
+    _use_brand(monkeypatch, FOOTERS[0])
+    _render(bullets=["A"], tone="warm", cta_text="Go")
+    inlined: list[str] = []
+    original = render.inline_css
+    monkeypatch.setattr(render, "inline_css", lambda h: inlined.append(h) or original(h))
+    hits = render.snippet_cache.hits
+
+    _render(bullets=["A", "B"], tone="formal", cta_text="Start")  # body/button change only
+    assert inlined == []
+    assert render.snippet_cache.hits == hits + 1  # footer reads brand/subject, not bullets
+
+    _render(subject="New subject", bullets=["A", "B"], tone="formal", cta_text="Start")
+    assert len(inlined) == 1  # only the footer fragment is re-inlined
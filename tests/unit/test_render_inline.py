@@ -0,0 +1,42 @@
+from __future__ import annotations
+from typing import Any
+import pytest
+from app.config.settings import settings
+from app.templating.render import render_generic_email
+
+CASES: list[dict[str, Any]] = [
+    {
+        "subject": "Welcome",
+        "body_text": "Hello!\n\nShort paragraph.\nSecond line.",
+        "variables": {},
+    },
+    {
+        "subject": "Café — we’re live",
+        "body_text": "Hi Zoë,\n\n• Explore docs\n• Book a demo\n\n\n\nBest,\nThe Team",
+        "variables": {"cta_text": "Start trial", "cta_url": "https://coderoad.com/start?x=1#y"},
+    },
+    {"subject": "No body", "body_text": "", "variables": {"cta_text": "Go"}},
+    {"subject": "Tone", "body_text": "x", "variables": {"tone": "formal", "bullets": ["A", "B"]}},
+    {"subject": "Long", "body_text": "x", "variables": {"long_form": True, "cta_text": ""}},
+    {"subject": "Indent", "body_text": "a\n  b\t\nc  \n\nd", "variables": {}},
+    # The following are not splice-safe and must fall back to full inlining
+    {"subject": "Tom & Jerry <3", "body_text": "a < b && c > d", "variables": {}},
+    {"subject": "Blank", "body_text": "a\n   \nb", "variables": {"preheader": 'say "hi"'}},
+    {
+        "subject": "Url",
+        "body_text": "x",
+        "variables": {"cta_text": "Go", "cta_url": "https://x/é a"},
+    },
+]
+
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("purpose", ["welcome", "newsletter"])
+def test_skeleton_inlining_matches_full_premailer(
+    case: dict[str, Any], purpose: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    kwargs: dict[str, Any] = dict(case, brand_id="default", purpose=purpose)
+    monkeypatch.setattr(settings, "MAIL_AGENT_INLINE_MODE", "full")
+    expected = render_generic_email(**kwargs)
+    monkeypatch.setattr(settings, "MAIL_AGENT_INLINE_MODE", "skeleton")
+    assert render_generic_email(**kwargs) == expected
@@ -0,0 +1,45 @@
+from __future__ import annotations
+from typing import Any, Iterator
+from app.templating.render import RenderItem, render_generic_email, render_generic_email_many
+
+
+def _items(n: int) -> list[tuple[str, str, dict[str, Any]]]:
+    return [
+        (
+            f"Subject {i}",
+            f"Hi #{i}\n\nLine {i}",
+            {"cta_text": "Go", "tone": "warm" if i % 2 else None},
+        )
+        for i in range(n)
+    ]
+
+
+def test_many_matches_single_renders_in_order() -> None:
+    items = _items(5)
+    expected = [
+        render_generic_email(subject=s, body_text=b, purpose="welcome", variables=v)
+        for s, b, v in items
+    ]
+    assert list(render_generic_email_many(items, purpose="welcome")) == expected
+
+
+def test_many_accepts_per_item_overrides() -> None:
+    item = RenderItem("Hello", "Body", {"cta_text": "Go"}, brand_id="default", purpose="newsletter")
+    [got] = render_generic_email_many([item], purpose="welcome")
+    assert got == render_generic_email(
+        subject="Hello", body_text="Body", purpose="newsletter", variables={"cta_text": "Go"}
+    )
+
+
+def test_many_consumes_input_lazily() -> None:
+    pulled: list[int] = []
+
+    def source() -> Iterator[tuple[str, str, dict[str, Any]]]:
+        for i, item in enumerate(_items(100)):
+            pulled.append(i)
+            yield item
+
+    results = render_generic_email_many(source())
+    next(results)
+    next(results)
+    assert len(pulled) == 2
@@ -0,0 +1,87 @@
+from __future__ import annotations
+from typing import Any
+import pytest
+from app.templating.brand_bundle import build_brand_bundle
+from app.templating.env import render_template
+from app.templating.render import (
+    GENERIC_TEMPLATE,
+    inline_css,
+    render_plain_text,
+    to_plain_text,
+)
+from app.tools.brand_loader import BrandConfig
+
+BRANDS: dict[str, BrandConfig] = {
+    "plain": BrandConfig(name="CodeRoad", footer_html="<p>© CodeRoad</p>"),
+    "logo": BrandConfig(
+        name="Logo Co",
+        logo_url="https://cdn.test/logo.png",
+        footer_html="<p>Logo Co • <a href='https://x.test'>Site</a></p>\n<p>  Street 1 </p>",
+        unsubscribe={"required_for": ["newsletter"], "url": "https://x.test/u"},
+    ),
+    "nofooter": BrandConfig(name="Bare", footer_html=None),
+}
+
+CONTENT: list[dict[str, Any]] = [
+    {
+        "subject": "Welcome",
+        "body_text": "Hello!\n\nShort paragraph.\nSecond line.",
+        "cta_text": "Go",
+    },
+    {
+        "subject": "  Café  ",
+        "body_text": "Hi\n\n• A\n• B\n\n\n  \n\nBest,\nThe Team",
+        "cta_text": "",
+    },
+    {"subject": "", "body_text": "", "cta_text": "Start trial"},
+]
+
+
+@pytest.mark.parametrize("brand_key", sorted(BRANDS))
+@pytest.mark.parametrize("content", CONTENT)
+@pytest.mark.parametrize("purpose", ["welcome", "newsletter"])
+def test_plain_text_matches_html_extraction(
+    brand_key: str, content: dict[str, Any], purpose: str
+) -> None:
+    bundle = build_brand_bundle(brand_key, BRANDS[brand_key])
+    context: dict[str, Any] = dict(
+        content,
+        brand=bundle.attrs,
+        preheader="p",
+        cta_url="https://coderoad.com/",
+        purpose=purpose,
+        footer_html=bundle.config.footer_html,
+        signature_html=None,
+    )
+    html = inline_css(render_template(GENERIC_TEMPLATE, context))
+    assert render_plain_text(context) == to_plain_text(html)
+
+
+def test_plain_text_defers_to_html_parse_for_markup() -> None:
+    bundle = build_brand_bundle("plain", BRANDS["plain"])
+    context: dict[str, Any] = {
+        "brand": bundle.attrs,
+        "subject": "Tom &amp; Jerry",
+        "body_text": "x",
+        "cta_text": "",
+        "cta_url": "#",
+        "purpose": "welcome",
+        "footer_html": "",
+    }
+    assert render_plain_text(context) is None
+
+
+@pytest.mark.parametrize("preheader", ['a">b', "x>y", "tab\there", "plain 'quotes'"])
+def test_plain_text_matches_for_any_preheader(preheader: str) -> None:
+    bundle = build_brand_bundle("plain", BRANDS["plain"])
+    context: dict[str, Any] = dict(
+        CONTENT[0],
+        brand=bundle.attrs,
+        preheader=preheader,
+        cta_url="https://coderoad.com/",
+        purpose="welcome",
+        footer_html=bundle.config.footer_html,
+        signature_html=None,
+    )
+    html = inline_css(render_template(GENERIC_TEMPLATE, context))
+    assert render_plain_text(context) in (None, to_plain_text(html))
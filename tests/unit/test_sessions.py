@@ -0,0 +1,74 @@
+from __future__ import annotations
+from pathlib import Path
+import pytest
+from app.agents.types import DraftRequest, Recipient
+from app.mail.sessions import SessionStore
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _req(**ctx: object) -> DraftRequest:
+    return DraftRequest(recipient=Recipient(email="pat@example.com"), context=ctx)
+
+
+def _store(clock: Clock, path: str = "", **kw: int) -> SessionStore:
+    opts = {"max_sessions": 8, "max_revisions": 8, **kw}
+    return SessionStore(ttl_s=60, path=path, clock=clock, **opts)
+
+
+def test_revisions_are_numbered_and_copied() -> None:
+    store = _store(Clock())
+    sid = store.create(_req(v=1)).session_id
+    _, req = store.get(sid)
+    req.context["v"] = 2
+    assert store.append(sid, req) == 2
+    assert store.get(sid, 1)[1].context == {"v": 1}  # the caller's edit did not leak back
+    assert store.get(sid) == (2, req)
+    with pytest.raises(KeyError):
+        store.get(sid, 3)
+
+
+def test_history_ttl_and_lru_bounds() -> None:
+    clock = Clock()
+    store = _store(clock, max_sessions=2, max_revisions=2)
+    a = store.create(_req()).session_id
+    for v in range(3):
+        store.append(a, _req(v=v))
+    assert tuple(store.info(a)[1:]) == (3, 4)
+
+    b = store.create(_req()).session_id
+    store.get(a)  # a is now the most recently used
+    store.create(_req())
+    assert store.info(a).latest == 4
+    with pytest.raises(KeyError):
+        store.info(b)
+
+    clock.now += 61
+    with pytest.raises(KeyError):
+        store.get(a)
+    assert store.stats()["evictions"] == 1 and store.stats()["expirations"] == 1
+
+
+def test_sqlite_sessions_survive_restarts_until_they_expire(tmp_path: Path) -> None:
+    clock = Clock()
+    db = str(tmp_path / "sessions.db")
+    store = _store(clock, db, max_revisions=2)
+    sid = store.create(_req(v=0)).session_id
+    store.append(sid, _req(v=1))
+    store.append(sid, _req(v=2))
+    store.close()
+
+    reopened = _store(clock, db)
+    assert reopened.get(sid, 2)[1].context == {"v": 1}
+    assert tuple(reopened.info(sid)[1:]) == (2, 3)
+    clock.now += 61
+    reopened.create(_req())  # purges expired rows
+    reopened.close()
+    with pytest.raises(KeyError):
+        _store(clock, db).get(sid)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+from pathlib import Path
+import pytest
+from app.config.settings import settings
+from app.templating import env as tenv
+
+
+def test_shared_env_reuses_compiled_templates() -> None:
+    env = tenv.shared_env()
+    assert tenv.shared_env() is env
+    tpl = env.get_template("families/generic/generic_v1.html.j2")
+    assert env.get_template("families/generic/generic_v1.html.j2") is tpl
+
+
+def test_invalidate_templates_rebuilds_env_and_bumps_version() -> None:
+    env = tenv.shared_env()
+    before = tenv.templates_version()
+    tenv.invalidate_templates()
+    assert tenv.templates_version() == before + 1
+    assert tenv.shared_env() is not env
+
+
+def test_bytecode_cache_persists_to_disk(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "MAIL_AGENT_JINJA_BYTECODE_DIR", str(tmp_path / "bcc"))
+    monkeypatch.setattr(settings, "MAIL_AGENT_TEMPLATES_COMPILED", "")
+    tenv.invalidate_templates()
+    try:
+        tenv.render_template("partials/button.html.j2", {"brand": {}, "cta_text": "Go"})
+        assert any((tmp_path / "bcc").iterdir())
+    finally:
+        monkeypatch.undo()
+        tenv.invalidate_templates()
+
+
+def test_compiled_artifact_is_loaded_and_renders_identically(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ctx = {"brand": {"primary": "#123456"}, "cta_text": "Go", "cta_url": "https://x.test/"}
+    monkeypatch.setattr(settings, "MAIL_AGENT_TEMPLATES_COMPILED", "")
+    tenv.invalidate_templates()
+    expected = tenv.render_template("partials/button.html.j2", ctx)
+
+    artifact = tmp_path / "templates.zip"
+    names = tenv.compile_templates(artifact)
+    assert "families/generic/generic_v1.html.j2" in names
+    monkeypatch.setattr(settings, "MAIL_AGENT_TEMPLATES_COMPILED", str(artifact))
+    tenv.invalidate_templates()
+    try:
+        tpl = tenv.shared_env().get_template("partials/button.html.j2")
+        assert str(artifact) in (tpl.filename or "")
+        assert tpl.render(**ctx) == expected
+    finally:
+        monkeypatch.undo()
+        tenv.invalidate_templates()